@@ -1,6 +1,47 @@
-import bpy
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
+import enum
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import operator
 import os
 import re
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+
+try:
+    import bpy
+except ImportError:  # 命令行转换和代理贴图的工作进程中没有 bpy，只用到不调用 bpy 的部分
+    bpy = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+# 生成代理贴图时按顺序尝试的缩放库；都没有时只能处理8位PNG
+try:
+    import OpenImageIO as oiio  # Blender 4.x 自带
+except ImportError:
+    oiio = None
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
 
 
 bl_info = {
@@ -14,110 +55,1607 @@ bl_info = {
 }
 
 
+VECTOR_SEPARATORS = re.compile(r'[^\d.-]')
+
 def parse_vector(vector_str):
-    cleaned = re.sub(r'[^\d.-]', ' ', vector_str)
+    if isinstance(vector_str, (list, tuple)):  # 结构化格式中已经是数值
+        return [float(x) for x in vector_str]
+    cleaned = VECTOR_SEPARATORS.sub(' ', vector_str)
     return [float(x) for x in cleaned.split()]
 
-def parse_material_info(file_path):
-    """解析材质信息文件，返回材质属性字典。"""
-    materials = {}
-    current_material = None
-    current_shader = None
-    color_correction_skip = False  # 跳过标志
+def parse_assignment(line):
+    """解析 "Assignment: 对象名 -> 材质名" 行，返回 (对象名, 材质名)。"""
+    value = line.split(":", 1)[1].strip()
+    obj_name, _, mat_name = value.rpartition(" -> ")
+    return obj_name.strip(), mat_name.strip()
+
+# 导出文件中块的分割符：着色器块和材质通道段都以它结束
+SECTION_SEPARATOR = "#####"
+# 出现在 "Material Name:" 之前、属于下一个材质的头部字段
+MATERIAL_HEADER_KEYS = ("Object Name", "Parent Name", "Material")
+# 通道链接之后需要加上通道名前缀的着色器字段
+SHADER_KEY_PREFIXES = ('Shader Name', 'Shader Type', 'Image Texture', 'Gradient', 'Color')
+# 文本格式中改变解析状态或需要转换值的键，其余键直接写入材质
+TEXT_STRUCTURE_KEYS = frozenset(("Material Name", "Shader Name", "Gradient Ramp") + MATERIAL_HEADER_KEYS)
+
+# 结构化导出格式（见 Cinema_Omat.EXPORT_FORMAT）
+EXPORT_FORMAT_NAME = "octane-material"
+SUPPORTED_FORMAT_VERSION = 3
+BINARY_MAGIC = b"OMATB"
+# 导出目录中可能的文件名，存在多个时使用最新的一个
+EXPORT_FILE_NAMES = ("octane_material_info.jsonl", "octane_material_info.omatb", "octane_material_info.txt")
+# 命令行批量转换时，目录中按扩展名识别的导出文件（可带压缩后缀）
+EXPORT_FILE_EXTENSIONS = (".jsonl", ".omatb", ".txt")
+
+# 材质计划文件（见 convert_exports）：JSON Lines，头部记录之后每行一个材质计划或对象-材质对应关系。
+# 计划与插件版本相关（指纹包含版本号），版本不同时需要重新转换
+PLAN_FORMAT_NAME = "octane-material-plan"
+PLAN_FORMAT_VERSION = 1
+PLAN_FILE_SUFFIX = ".plan.jsonl"
+# 批量转换的进程数；解析和生成计划是CPU密集的
+PLAN_WORKERS = os.cpu_count() or 1
+# Cinema_Omat.COMPRESSION_SUFFIXES，压缩后的导出文件名为 EXPORT_FILE_NAMES 加上这些后缀
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def open_export_file(file_path, mode='rb'):
+    """打开导出文件，gzip / zstd 压缩的文件按文件头识别并透明解压。mode 为 'rb' 或 'r'。"""
+    file = open(file_path, 'rb')
+    head = file.read(4)
+    file.seek(0)
+    if head.startswith(GZIP_MAGIC):
+        file = gzip.GzipFile(fileobj=file, mode='rb')
+    elif head == ZSTD_MAGIC:
+        if zstd is None:
+            file.close()
+            raise ValueError("Export is zstd-compressed but no zstd module is available")
+        if hasattr(zstd.ZstdDecompressor, "stream_reader"):  # zstandard
+            file = io.BufferedReader(zstd.ZstdDecompressor().stream_reader(file, closefd=True))
+        else:
+            # compression.zstd 的 ZstdDecompressor 没有 stream_reader；按路径打开的 ZstdFile 自己关闭文件
+            file.close()
+            file = zstd.ZstdFile(file_path, 'rb')
+    if mode == 'r':
+        return io.TextIOWrapper(file, encoding='utf-8')
+    return file
+
+def detect_export_format(file_path):
+    """根据文件开头（解压后）判断格式：'binary'、'jsonl' 或 'text'。"""
+    with open_export_file(file_path) as file:
+        head = file.read(len(BINARY_MAGIC))
+    if head == BINARY_MAGIC:
+        return "binary"
+    if head.lstrip().startswith(b"{"):
+        return "jsonl"
+    return "text"
+
+def check_export_header(header):
+    if not isinstance(header, dict) or header.get("format") != EXPORT_FORMAT_NAME:
+        raise ValueError("Not an Octane material export: missing format header")
+    version = header.get("version", 0)
+    if version > SUPPORTED_FORMAT_VERSION:
+        raise ValueError(f"Export format version {version} is newer than supported version {SUPPORTED_FORMAT_VERSION}")
+
+class BinaryRecordDecoder:
+    """Cinema_Omat.BinaryRecordEncoder 的解码器，字符串索引表在整个文件内累积。"""
+
+    def __init__(self, file):
+        self.file = file
+        self.strings = []
+
+    def read_varint(self, data=None, pos=0):
+        result = 0
+        shift = 0
+        while True:
+            if data is None:
+                byte = self.file.read(1)
+                if not byte:
+                    return None, pos
+                byte = byte[0]
+            else:
+                byte = data[pos]
+                pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result, pos
+            shift += 7
+
+    def __iter__(self):
+        while True:
+            length, _ = self.read_varint()
+            if length is None:
+                return
+            data = self.file.read(length)
+            value, _ = self.decode(data, 0)
+            yield value
+
+    def decode(self, data, pos):
+        tag = data[pos:pos + 1]
+        pos += 1
+        if tag == b"N":
+            return None, pos
+        if tag == b"T":
+            return True, pos
+        if tag == b"F":
+            return False, pos
+        if tag == b"i":
+            return struct.unpack_from("<q", data, pos)[0], pos + 8
+        if tag == b"d":
+            return struct.unpack_from("<d", data, pos)[0], pos + 8
+        if tag == b"s":
+            length, pos = self.read_varint(data, pos)
+            value = data[pos:pos + length].decode('utf-8')
+            self.strings.append(value)
+            return value, pos + length
+        if tag == b"r":
+            index, pos = self.read_varint(data, pos)
+            return self.strings[index], pos
+        if tag == b"l":
+            count, pos = self.read_varint(data, pos)
+            items = []
+            for _ in range(count):
+                item, pos = self.decode(data, pos)
+                items.append(item)
+            return items, pos
+        if tag == b"m":
+            count, pos = self.read_varint(data, pos)
+            items = {}
+            for _ in range(count):
+                key, pos = self.decode(data, pos)
+                items[key], pos = self.decode(data, pos)
+            return items, pos
+        raise ValueError(f"Unknown binary tag {tag!r} in export file")
+
+# Octane通道 -> Principled BSDF 输入
+CHANNEL_MAPPING = {
+    'Diffuse': 'Base Color',
+    'Roughness': 'Roughness',
+    'Normal': 'Normal',
+    'Bump': 'Normal',
+    'Displacement': 'Displacement',
+    'Opacity': 'Alpha',
+    'Metalness': 'Metallic',
+    'Emission': 'Emission',
+    'Transmission': 'Transmission'
+}
+
+# MaterialRecord.channels 的下标
+Channel = enum.IntEnum('Channel', [(name.upper(), index) for index, name in enumerate(CHANNEL_MAPPING)])
+CHANNELS_BY_NAME = {name: Channel[name.upper()] for name in CHANNEL_MAPPING}
+# 属性字典中通道键的后缀 -> ChannelRecord 的字段
+CHANNEL_FIELDS = {
+    'Color': 'color',
+    'Float': 'float',
+    'Link': 'link',
+    'Shader Name': 'shader_name',
+    'Shader Type': 'shader_type',
+    'Image Texture File': 'image',
+    'Color (Link)': 'link_color',
+    'Gradient Ramp': 'gradient_ramp',
+    'Gradient Image Path': 'gradient_image',
+}
+# 文本格式中 "Use ..." 开关的值
+FLAG_VALUES = {"True": True, "False": False, "None": None}
+
+def decode_color(value):
+    # 文本格式中的颜色几乎都是 c4d.Vector 的 repr，直接拆分比正则表达式快
+    if isinstance(value, str) and value.startswith("Vector(") and value.endswith(")"):
+        try:
+            return tuple(map(float, value[7:-1].split(",")))
+        except ValueError:
+            pass
+    return tuple(parse_vector(value))
+
+def decode_float(value):
+    """无法解码的值原样保留，使用时再报错，与解析时不解码的行为一致。"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+# 解析时解码一次的字段
+FIELD_DECODERS = {'color': decode_color, 'link_color': decode_color, 'float': decode_float}
+# 属性字典中的通道键（如 "Diffuse Float"）-> (通道下标, ChannelRecord 字段, 解码函数)
+CHANNEL_KEYS = {f"{name} {suffix}": (index, field, FIELD_DECODERS.get(field))
+                for name, index in CHANNELS_BY_NAME.items() for suffix, field in CHANNEL_FIELDS.items()}
+
+class ChannelRecord:
+    """一个通道解析后的数据，颜色和浮点已解码；导出中没有的字段为 None。"""
+    __slots__ = tuple(CHANNEL_FIELDS.values())
+
+    def __init__(self):
+        self.color = None
+        self.float = None
+        self.link = None
+        self.shader_name = None
+        self.shader_type = None
+        self.image = None
+        self.link_color = None
+        self.gradient_ramp = None
+        self.gradient_image = None
+
+    def values(self):
+        return CHANNEL_VALUES(self)
+
+    def __eq__(self, other):
+        return isinstance(other, ChannelRecord) and self.values() == other.values()
+
+    __hash__ = None
+
+CHANNEL_VALUES = operator.attrgetter(*ChannelRecord.__slots__)
+
+class MaterialRecord:
+    """
+    一个材质解析后的数据。通道按 Channel 下标存为 ChannelRecord（没有数据的通道为 None），
+    对象名、类型、"Use ..." 开关等其余字段放在 extra 中。
+    as_dict() 和 get() 提供旧的属性字典视图（键如 "Diffuse Image Texture File"）。
+    """
+    __slots__ = ('name', 'channels', 'extra')
+
+    def __init__(self, name):
+        self.name = name
+        self.channels = [None] * len(Channel)
+        self.extra = {}
+
+    def channel(self, index):
+        """返回通道记录，不存在时创建。"""
+        record = self.channels[index]
+        if record is None:
+            record = self.channels[index] = ChannelRecord()
+        return record
+
+    def set(self, key, value):
+        """按属性字典的键设置字段，通道字段在这里解码。"""
+        target = CHANNEL_KEYS.get(key)
+        if target is None:
+            self.set_extra(key, value)
+            return
+        index, field, decoder = target
+        record = self.channels[index]
+        if record is None:
+            record = self.channels[index] = ChannelRecord()
+        setattr(record, field, value if decoder is None else decoder(value))
+
+    def set_channel_field(self, channel_name, suffix, value):
+        self.set(f"{channel_name} {suffix}", value)
+
+    def set_extra(self, key, value):
+        if isinstance(value, str) and key.startswith("Use "):
+            value = FLAG_VALUES.get(value, value)
+        self.extra[sys.intern(key)] = value
+
+    def get(self, key, default=None):
+        target = CHANNEL_KEYS.get(key)
+        if target is None:
+            return self.extra.get(key, default)
+        record = self.channels[target[0]]
+        value = None if record is None else getattr(record, target[1])
+        return default if value is None else value
+
+    def as_dict(self):
+        properties = dict(self.extra)
+        for name, record in zip(CHANNEL_MAPPING, self.channels):
+            if record is None:
+                continue
+            for suffix, value in zip(CHANNEL_FIELDS, record.values()):
+                if value is not None:
+                    properties[f"{name} {suffix}"] = value
+        return properties
+
+    def __eq__(self, other):
+        return (isinstance(other, MaterialRecord) and self.name == other.name
+                and self.extra == other.extra and self.channels == other.channels)
+
+    __hash__ = None
+
+def shader_record_fields(channel, shader):
+    """把着色器记录的数据写到通道记录上。"""
+    channel.shader_name = shader.get("name", "")
+    channel.shader_type = shader.get("type")
+    # ColorCorrection 的输入只贡献贴图、颜色和渐变
+    for source in (shader, shader.get("input")):
+        if not source:
+            continue
+        if source.get("image"):
+            channel.image = source["image"]
+        if source.get("color") is not None:
+            channel.link_color = decode_color(source["color"])
+        if source.get("gradient_ramp"):
+            channel.gradient_ramp = source["gradient_ramp"]
+        if source.get("gradient_image"):
+            channel.gradient_image = source["gradient_image"]
+
+def resolve_shader_refs(shader, shaders):
+    """
+    版本2的导出中着色器写成单独的 "shader" 记录，材质和着色器的输入以 {"ref": id} 引用它们。
+    返回引用对应的记录；shader 的输入是引用时就地替换。
+    """
+    if "ref" in shader:
+        if shader["ref"] not in shaders:
+            raise ValueError(f"Unknown shader reference {shader['ref']}")
+        return shaders[shader["ref"]]
+    link = shader.get("input")
+    if isinstance(link, dict) and "ref" in link:
+        shader["input"] = resolve_shader_refs(link, shaders)
+    return shader
+
+def record_to_properties(record, shaders=None):
+    """record_to_material 结果的属性字典视图。"""
+    return record_to_material(record, shaders).as_dict()
 
-    with open(file_path, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+def record_to_material(record, shaders=None):
+    """
+    把结构化的材质记录转换为 MaterialRecord。
+    shaders 为整个文件内 "shader" 记录的 id -> 记录表，用于解析着色器引用。
+    """
+    if shaders is None:
+        shaders = {}
+    emission = record.get("emission") or {}
+    if emission.get("link"):
+        emission["link"] = resolve_shader_refs(emission["link"], shaders)
+    for data in (record.get("channels") or {}).values():
+        if data.get("link"):
+            data["link"] = resolve_shader_refs(data["link"], shaders)
+
+    material = MaterialRecord(record.get("name"))
+    extra = material.extra
+    extra["Object Name"] = record.get("object")
+    extra["Parent Name"] = record.get("parent")
+    extra["Type"] = f"{record.get('type')} ({record.get('type_name', 'Unknown')})"
+
+    extra["Use Emission"] = emission.get("enabled")
+    if emission.get("shader"):
+        extra["Emission Shader"] = emission["shader"]
+    if emission.get("mode"):
+        extra["Emission Type"] = emission["mode"].capitalize()
+
+    for channel_name, data in (record.get("channels") or {}).items():
+        material.set_extra(f"Use {channel_name}", data.get("use"))
+        index = CHANNELS_BY_NAME.get(channel_name)
+        if index is None:
+            continue  # 导出脚本的通道都在 CHANNEL_MAPPING 中，其他通道不参与导入
+        channel = None
+        if data.get("color") is not None:
+            channel = material.channel(index)
+            channel.color = decode_color(data["color"])
+        if data.get("float") is not None:
+            channel = channel or material.channel(index)
+            channel.float = decode_float(data["float"])
+        link = data.get("link")
+        if link:
+            channel = channel or material.channel(index)
+            channel.link = link.get("name", "")
+            shader_record_fields(channel, link)
+
+    universal = record.get("universal")
+    if universal:
+        extra["Specular Map Float"] = universal.get("specular_map_float")
+        extra["Specular Float"] = universal.get("specular_float")
+        extra["Parameter 2639"] = universal.get("parameter_2639")
+        extra["Index"] = universal.get("index")
+
+    return material
+
+def iter_structured_records(file_path, export_format):
+    """解析 JSON Lines 或二进制导出文件，每个记录只解码一次。"""
+    if export_format == "binary":
+        file = open_export_file(file_path)
+        file.read(len(BINARY_MAGIC))
+        records = iter(BinaryRecordDecoder(file))
+    else:
+        file = open_export_file(file_path, 'r')
+        records = (json.loads(line) for line in file if line.strip())
+
+    shaders = {}
+    with file:
+        check_export_header(next(records, None))
+        for record in records:
+            kind = record.get("kind")
+            if kind == "material":
+                yield "material", record["name"], record_to_material(record, shaders)
+            elif kind == "shader":
+                shaders[record["id"]] = resolve_shader_refs(record, shaders)
+            elif kind == "assignment":
+                yield "assignment", record["object"], record["material"], record.get("object_id")
+
+def iter_material_records(file_path):
+    """
+    解析导出文件，自动识别结构化格式（JSON Lines / 二进制）和旧的文本格式。
+    产出 ("material", 材质名, MaterialRecord) 和 ("assignment", 对象名, 材质名, 对象ID)。
+    """
+    export_format = detect_export_format(file_path)
+    if export_format == "text":
+        return iter_text_records(file_path)
+    return iter_structured_records(file_path, export_format)
+
+def decode_flag(value):
+    return FLAG_VALUES.get(value, value)
+
+def plain_text_key(key):
+    """
+    文本格式中着色器块之外的键如何写入 MaterialRecord：通道字段返回 CHANNEL_KEYS 中的
+    (通道下标, 字段, 解码函数)，其余字段返回 (None, extra 的键, 解码函数)。
+    链接、着色器字段和改变解析状态的键与当前通道有关，返回 False。
+    """
+    if 'Link' in key or key.startswith(SHADER_KEY_PREFIXES) or key in TEXT_STRUCTURE_KEYS:
+        return False
+    target = CHANNEL_KEYS.get(key)
+    if target is not None:
+        return target
+    return None, sys.intern(key), decode_flag if key.startswith("Use ") else None
+
+def iter_text_records(file_path):
+    """
+    逐行解析文本格式材质信息文件的生成器，内存占用与文件大小无关。
+
+    用 "#####" 跟踪着色器块的嵌套：每个 "Shader Name:" 打开一层，分割符关闭最内层；
+    不在着色器块内的分割符结束当前通道段。ColorCorrection 等嵌套着色器（第二层及以下）
+    只取贴图路径、颜色和渐变（色标或图像路径），记到所属通道上。
+    """
+    header = {}
+    plain_keys = {}  # 键 -> plain_text_key(键)
+    material = None
+    current_shader = None  # 当前通道名，例如 Diffuse
+    depth = 0  # 着色器块的嵌套层数
+    in_assignments = False
+    # 文本格式没有对象ID：导出时每个对象的行是连续的，连续的同名行编为同一个ID
+    last_object = None
+    object_id = -1
+
+    with open_export_file(file_path, 'r') as file:
+        for raw_line in file:
+            line = raw_line.strip()
+
+            # 对象-材质对应关系段
+            if in_assignments:
+                if line == SECTION_SEPARATOR:
+                    in_assignments = False
+                elif line.startswith("Assignment:"):
+                    obj_name, mat_name = parse_assignment(line)
+                    if obj_name != last_object:
+                        last_object = obj_name
+                        object_id += 1
+                    yield "assignment", obj_name, mat_name, object_id
+                continue
+
+            # 键中没有冒号，第一个 ": " 就是键值分隔；没有它的是空行、分割符和段标题
+            key, sep, value = line.partition(": ")
+            if not sep:
+                if line == SECTION_SEPARATOR:
+                    if depth:
+                        depth -= 1
+                    else:
+                        current_shader = None
+                elif line == "Material Assignments:":
+                    if material is not None:
+                        yield "material", material.name, material
+                        material = None
+                    header = {}
+                    in_assignments = True
+                continue
+            value = value.lstrip()
+
+            if material is not None and not depth:
+                # 最常见的情况：着色器块之外的普通键，按缓存的目标直接写入，与 material.set 结果相同
+                target = plain_keys.get(key)
+                if target is None:
+                    target = plain_keys[key] = plain_text_key(key)
+                if target:
+                    index, field, decoder = target
+                    if decoder is not None:
+                        value = decoder(value)
+                    if index is None:
+                        material.extra[field] = value
+                    else:
+                        setattr(material.channels[index] or material.channel(index), field, value)
+                    continue
+
+            if key == "Gradient Ramp":
+                value = json.loads(value)  # 色标数据，与结构化格式中的 "gradient_ramp" 相同
 
             # 匹配Material行
-            if line.startswith("Material Name:"):
-                current_material = line.split(":", 1)[1].strip()
-                materials[current_material] = {}
+            if key == "Material Name":
+                if material is not None:
+                    yield "material", material.name, material
+                material = MaterialRecord(value)
+                for header_key, header_value in header.items():
+                    material.set_extra(header_key, header_value)
+                header = {}
                 current_shader = None
-                color_correction_skip = False
-            elif current_material:
-                if ": " in line:
-                    key, value = line.split(":", 1)
-                    key = key.strip()
-                    value = value.strip()
-
-                    if 'Link' in key:
-                        current_shader = key.split()[0]
-                        materials[current_material][key] = value
-                    elif current_shader and (key.startswith('Shader Name') or key.startswith('Shader Type') or key.startswith('Image Texture') or key.startswith('Gradient') or key.startswith('Color')):
-                        materials[current_material][f"{current_shader} {key}"] = value
-                    else:
-                        materials[current_material][key] = value
-
-                    # 检查ColorCorrection节点，如果匹配则向下跳4行获取ImageTexture、颜色或向下跳9行获取渐变信息
-                    if line.startswith("Shader Name: ColorCorrection"):
-                        color_correction_skip = True
-                        i += 4  # 跳过4行获取ImageTexture或颜色信息
-                        texture_line = lines[i].strip()
-
-                        # 如果存在ImageTexture节点
-                        if texture_line.startswith("Image Texture File:"):
-                            image_texture_file = texture_line.split(":", 1)[1].strip()
-                            materials[current_material][f"{current_shader} Image Texture File"] = image_texture_file
-                        # 否则尝试解析颜色信息
-                        elif texture_line.startswith("Color:"):
-                            color_value = texture_line.split(":", 1)[1].strip()
-                            materials[current_material][f"{current_shader} Color (Link)"] = color_value
-                        # 如果存在渐变，则向下跳9行
-                        elif texture_line.startswith("Gradient:"):
-                            i += 9  # 跳过9行获取渐变信息
-                            gradient_value_line = lines[i].strip()
-                            if gradient_value_line.startswith("Gradient Image Path:"):
-                                gradient_path = gradient_value_line.split(":", 1)[1].strip()
-                                materials[current_material][f"{current_shader} Gradient Image Path"] = gradient_path
-
-                        color_correction_skip = False
-                        i += 1  # 移动到下一个有效行继续解析
-                        continue
+                depth = 0
+                continue
+            if key in MATERIAL_HEADER_KEYS:
+                if material is not None:
+                    yield "material", material.name, material
+                    material = None
+                header[key] = value
+                continue
+            if material is None:
+                continue
 
-                elif color_correction_skip:
-                    # 检查当前行是否包含ImageTexture、颜色或渐变的文件路径
-                    if line.startswith("Image Texture File:"):
-                        materials[current_material][f"{current_shader} Image Texture File"] = line.split(":", 1)[1].strip()
-                    elif line.startswith("Color:"):
-                        materials[current_material][f"{current_shader} Color (Link)"] = line.split(":", 1)[1].strip()
-                    elif line.startswith("Gradient Image Path:"):
-                        materials[current_material][f"{current_shader} Gradient Image Path"] = line.split(":", 1)[1].strip()
-                    color_correction_skip = False
+            if key == "Shader Name":
+                depth += 1
+            if depth >= 2:
+                # 嵌套着色器（如ColorCorrection的输入）：只保留贴图、颜色和渐变
+                if key == "Image Texture File":
+                    material.set_channel_field(current_shader, key, value)
+                elif key == "Color":
+                    material.set_channel_field(current_shader, "Color (Link)", value)
+                elif key in ("Gradient Ramp", "Gradient Image Path"):
+                    material.set_channel_field(current_shader, key, value)
+                continue
 
-            i += 1
+            if 'Link' in key:
+                # 着色器块内部的链接（如 Color Correction Link）不切换通道
+                if depth == 0:
+                    current_shader = key.split()[0]
+                    material.set(key, value)
+            elif current_shader and key.startswith(SHADER_KEY_PREFIXES):
+                material.set_channel_field(current_shader, key, value)
+            else:
+                material.set(key, value)
+
+    if material is not None:
+        yield "material", material.name, material
+
+def iter_material_info(file_path):
+    """逐个产出 (材质名, MaterialRecord)。"""
+    for record in iter_material_records(file_path):
+        if record[0] == "material":
+            yield record[1], record[2]
 
+def parse_material_info(file_path, assignments=None):
+    """
+    解析材质信息文件，返回 {材质名: MaterialRecord}；需要旧的属性字典时用 MaterialRecord.as_dict()。
+    如果传入 assignments 列表，文件末尾的对象-材质对应关系会以 (对象名, 材质名, 对象ID) 追加到其中；
+    对象ID 在一个导出文件内区分同名的对象，旧的导出中没有时为 None。
+    """
+    materials = {}
+    for record in iter_material_records(file_path):
+        if record[0] == "material":
+            materials[record[1]] = record[2]
+        elif assignments is not None:
+            assignments.append(record[1:])
     return materials
 
-def create_texture_node(nodes, links, principled, input_name, image_path):
+# 增量导入：材质上保存的自定义属性和导入器管理的节点名称
+FINGERPRINT_PROPERTY = "omat_fingerprint"
+CHANNEL_FINGERPRINTS_PROPERTY = "omat_channel_fingerprints"
+INPUT_DEFAULTS_PROPERTY = "omat_input_defaults"
+PRINCIPLED_NODE_NAME = "Principled BSDF"
+OUTPUT_NODE_NAME = "Material Output"
+CHANNEL_NODE_PREFIX = "Octane "
+
+# C4D 色标的插值方式（GRADIENT_INTERPOLATION_*）-> ColorRamp.interpolation
+GRADIENT_INTERPOLATIONS = {
+    0: 'CARDINAL',  # CUBICKNOT
+    1: 'CARDINAL',  # CUBICBIAS
+    2: 'EASE',  # SMOOTHKNOT
+    3: 'LINEAR',  # LINEARKNOT
+    4: 'LINEAR',  # LINEAR
+    5: 'CONSTANT',  # NONE
+}
+
+# 新材质是否通过复制同形状的原型创建（比逐个 nodes.new 快得多）
+USE_MATERIAL_TEMPLATES = True
+
+# 预取贴图信息（存在性、文件头）时的线程数，网络共享盘上主要在等待I/O
+PREFETCH_WORKERS = 16
+
+# C4D 导出脚本写入的目录
+EXPORT_DIR = os.path.join(os.path.expanduser('~'), 'Documents', 'chche')
+
+# 贴图在本机找不到时搜索的目录；导出文件所在目录总会被加入
+TEXTURE_SEARCH_ROOTS = []
+# 贴图文件名索引的缓存文件，按目录修改时间失效
+TEXTURE_INDEX_PATH = os.path.join(EXPORT_DIR, 'texture_index.json')
+TEXTURE_INDEX_VERSION = 2
+
+# 代理贴图：图像节点使用缩小到这些尺寸（最长边像素）的副本，最终渲染前可切回原图
+TEXTURE_PROXY_SIZES = (1024, 2048)
+# 代理按原图内容哈希和尺寸缓存在这里，超过上限时按最近使用时间淘汰
+PROXY_CACHE_DIR = os.path.join(EXPORT_DIR, 'proxies')
+PROXY_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+PROXY_INDEX_NAME = 'proxy_index.json'
+PROXY_INDEX_VERSION = 1
+# 生成代理的进程数；缩放是CPU密集的，线程受GIL限制
+PROXY_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# 用代理加载的图像上记录原图和代理路径的自定义属性
+PROXY_SOURCE_PROPERTY = "omat_full_path"
+PROXY_PATH_PROPERTY = "omat_proxy_path"
+# 导入器新加载的图像上的标记；导入结束后只删除带标记且已没有用户的图像
+CREATED_PROPERTY = "omat_created"
+RELEASE_ORPHAN_IMAGES = True
+
+# 材质库：收录的导出文件中每个材质的计划、使用它的对象和贴图，按需只导入其中一部分
+LIBRARY_PATH = os.path.join(EXPORT_DIR, 'material_library.sqlite')
+# 2: objects 表增加 object_id
+LIBRARY_VERSION = 2
+
+# 后台导入时每个计时器事件中应用材质的时间预算（毫秒）
+FRAME_BUDGET_MS = 30
+
+# Live Link：C4D 通过本机TCP推送有变化的材质记录（Cinema_Omat.LiveLinkSender）
+LIVE_LINK_HOST = "127.0.0.1"
+LIVE_LINK_PORT = 52375
+LIVE_LINK_POLL = 0.05  # 主线程计时器间隔（秒）
+LIVE_LINK_PREFETCH_POLL = 0.005  # 后台预取贴图期间的计时器间隔
+LIVE_LINK_DEBOUNCE = 0.15  # 最后一个记录到达后再等待的时间，合并连续的编辑
+LIVE_LINK_MAX_DELAY = 0.5  # 持续有记录到达时，最早的记录最多等待这么久
+
+# 导入报告中列出的最慢材质数量
+SLOWEST_MATERIALS_REPORTED = 5
+
+# 比较图像路径时是否忽略大小写（Windows共享盘上导出的路径大小写经常不一致）
+CASE_INSENSITIVE_PATHS = False
+
+# 导入后把材质分配到 bpy.data.objects 中对应对象的材质槽
+ASSIGN_OBJECT_MATERIALS = True
+# 导出的对象名在Blender中找不到时的匹配规则（见 object_name_key）
+OBJECT_NAME_RULES = ('EXACT', 'SUFFIX', 'LOOSE', 'PATTERN')
+OBJECT_NAME_RULE = 'SUFFIX'
+# 'PATTERN' 规则从对象名中删除的部分（正则表达式）
+OBJECT_NAME_PATTERN = r'\.\d{3,}$'
+# 最多打印多少个找不到的对象名
+UNMATCHED_OBJECTS_REPORTED = 10
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024.0
+
+# 预取得到的贴图信息；width/height/channels 无法从文件头读出时为 None
+TextureInfo = collections.namedtuple("TextureInfo", "path resolved exists format width height channels")
+
+# JPEG 中携带图像尺寸的SOF标记
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# PNG 颜色类型 -> 解码后的通道数；调色板（3）展开为RGB
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+PNG_PALETTE = 3
+
+def read_jpeg_size(file):
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        while marker[1] == 0xFF:
+            marker = marker[1:] + file.read(1)
+        code = marker[1]
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+        length = struct.unpack('>H', file.read(2))[0]
+        if code in JPEG_SOF_MARKERS:
+            _, height, width, channels = struct.unpack('>BHHB', file.read(6))
+            return width, height, channels
+        file.seek(length - 2, 1)
+
+def read_image_header(path):
+    """读取图像文件头，返回 (格式, 宽, 高, 通道数)；无法识别时只按扩展名给出格式。"""
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    try:
+        with open(path, 'rb') as file:
+            head = file.read(32)
+            if head.startswith(PNG_SIGNATURE):
+                width, height = struct.unpack('>II', head[16:24])
+                channels = PNG_CHANNELS.get(head[25], 4)
+                return 'PNG', width, height, channels
+            if head[:2] == b'\xff\xd8':
+                size = read_jpeg_size(file)
+                if size:
+                    return ('JPEG',) + size
+            elif head[:2] == b'BM':
+                width, height = struct.unpack('<ii', head[18:26])
+                bits = struct.unpack('<H', head[28:30])[0]
+                return 'BMP', width, abs(height), bits // 8
+            elif ext == 'tga' and len(head) >= 18:
+                width, height = struct.unpack('<HH', head[12:16])
+                return 'TARGA', width, height, head[16] // 8
+    except (OSError, struct.error, IndexError):
+        pass
+    return (ext.upper() or None), None, None, None
+
+def probe_texture(path, abs_path, resolver=None):
+    """在工作线程中运行：只做文件系统操作，不调用 bpy。"""
+    resolved = os.path.realpath(abs_path)
+    if not os.path.exists(resolved):
+        relocated = resolver.resolve(path) if resolver is not None else None
+        if relocated is None:
+            return TextureInfo(path, resolved, False, None, None, None, None)
+        resolved = os.path.realpath(relocated)
+    return TextureInfo(path, resolved, True, *read_image_header(resolved))
+
+def collect_texture_paths(plans):
+    """收集所有材质计划引用的贴图和渐变图像路径。"""
+    paths = set()
+    for plan in plans:
+        for channel in plan["channels"].values():
+            if channel["kind"] == 'texture':
+                paths.add(channel["value"])
+    return paths
+
+def texture_jobs(paths):
+    """为每个路径准备预取参数；bpy.path.abspath 只能在主线程调用，先展开 // 相对路径。"""
+    return [(path, bpy.path.abspath(path)) for path in paths]
+
+def probe_textures(jobs, max_workers=PREFETCH_WORKERS, resolver=None):
+    """并行检查贴图是否存在并读取文件头，返回 {路径: TextureInfo}。可在后台线程中调用。"""
+    if not jobs:
+        return {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        infos = pool.map(lambda job: probe_texture(job[0], job[1], resolver), jobs)
+        return {info.path: info for info in infos}
+
+def texture_basename(path):
+    """导出文件中可能是Windows路径，两种分隔符都要处理；按小写匹配。"""
+    return re.split(r'[\\/]', path)[-1].lower()
+
+def scan_texture_root(root, excluded=()):
+    """用 os.scandir 遍历一个搜索目录，跳过 excluded 中的目录，返回 (目录 -> mtime_ns, 文件名 -> [路径])。"""
+    dirs = {}
+    files = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            dirs[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path not in excluded:
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        files.setdefault(entry.name.lower(), []).append(entry.path)
+        except OSError:
+            continue
+    return dirs, files
+
+def texture_root_changed(dirs):
+    for directory, mtime in dirs.items():
+        try:
+            if os.stat(directory).st_mtime_ns != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+class TextureResolver:
+    """
+    为在本机不存在的贴图路径按文件名查找替代文件。
+    索引在第一次找不到贴图时才建立：每个搜索目录只扫描一次，索引写入 TEXTURE_INDEX_PATH；
+    目录修改时间变化时才重新扫描。excluded 中的目录（默认为代理贴图缓存）不扫描。
+    同名文件有多个时取与原路径末尾目录最相近的一个，并记入 ambiguous。
+    """
+
+    def __init__(self, roots, index_path=TEXTURE_INDEX_PATH, excluded=(PROXY_CACHE_DIR,)):
+        self.excluded = sorted({os.path.realpath(path) for path in excluded})
+        self.roots = []
+        for root in roots:
+            root = os.path.realpath(bpy.path.abspath(root))
+            if root not in self.roots and root not in self.excluded and os.path.isdir(root):
+                self.roots.append(root)
+        self.index_path = index_path
+        self.index = None  # 文件名 -> [路径]，首次 resolve 时建立
+        self.index_seconds = None  # 建立索引的耗时
+        self.lock = threading.Lock()
+        self.rescanned = []
+        self.resolved = {}  # 原路径 -> 找到的路径
+        self.ambiguous = {}  # 原路径 -> 所有候选
+        self.unresolved = set()
+
+    def load_cache(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("version") != TEXTURE_INDEX_VERSION:
+            return {}
+        return cache.get("roots", {})
+
+    def save_cache(self, roots):
+        try:
+            index_dir = os.path.dirname(self.index_path)
+            os.makedirs(index_dir, exist_ok=True)
+            # 索引文件所在的目录（默认为导出目录）通常也是搜索目录：先创建文件再记下目录的修改时间，
+            # 否则第一次写入索引就改变了目录的修改时间，下次导入又会重新扫描
+            open(self.index_path, 'a').close()
+            real_dir = os.path.realpath(index_dir)
+            for entry in roots.values():
+                if real_dir in entry["dirs"]:
+                    entry["dirs"][real_dir] = os.stat(real_dir).st_mtime_ns
+            with open(self.index_path, 'w', encoding='utf-8') as file:
+                json.dump({"version": TEXTURE_INDEX_VERSION, "roots": roots}, file)
+        except OSError as e:
+            print(f"Warning: Could not write texture index: {e}")
+
+    def build_index(self):
+        cached = self.load_cache()
+        roots = {}
+        for root in self.roots:
+            entry = cached.get(root)
+            if entry is None or entry.get("excluded") != self.excluded or texture_root_changed(entry["dirs"]):
+                dirs, files = scan_texture_root(root, frozenset(self.excluded))
+                entry = {"dirs": dirs, "files": files, "excluded": self.excluded}
+                self.rescanned.append(root)
+            roots[root] = entry
+        if self.rescanned:
+            cached.update(roots)
+            self.save_cache(cached)
+
+        self.index = {}
+        for root in self.roots:
+            for name, paths in roots[root]["files"].items():
+                self.index.setdefault(name, []).extend(paths)
+
+    def ensure_index(self):
+        with self.lock:
+            if self.index is None:
+                start = time.perf_counter()
+                self.build_index()
+                self.index_seconds = time.perf_counter() - start
+        return self.index
+
+    def resolve(self, path):
+        """返回替代文件的路径，找不到时返回 None。可在工作线程中调用。"""
+        candidates = self.ensure_index().get(texture_basename(path))
+        if not candidates:
+            self.unresolved.add(path)
+            return None
+        if len(candidates) == 1:
+            match = candidates[0]
+        else:
+            # 比较原路径与候选路径从末尾开始相同的目录层数
+            parts = [part.lower() for part in re.split(r'[\\/]', path)][::-1]
+            def shared_suffix(candidate):
+                count = 0
+                for a, b in zip(parts, (part.lower() for part in re.split(r'[\\/]', candidate)[::-1])):
+                    if a != b:
+                        break
+                    count += 1
+                return count
+            match = max(sorted(candidates), key=shared_suffix)
+            self.ambiguous[path] = candidates
+        self.resolved[path] = match
+        return match
+
+    def summary(self):
+        return (f"Relocated textures: {len(self.resolved)} found, {len(self.ambiguous)} ambiguous, "
+                f"{len(self.unresolved)} not found in {len(self.roots)} search roots")
+
+    def report_ambiguous(self):
+        for path, candidates in self.ambiguous.items():
+            print(f"Warning: Ambiguous texture '{path}', using '{self.resolved[path]}' of:")
+            for candidate in candidates:
+                print(f"    {candidate}")
+
+def file_sha1(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def proxy_file_name(digest, size, source):
+    return f"{digest}_{size}{os.path.splitext(source)[1].lower()}"
+
+def unfilter_png_row(filter_type, row, prev, bpp):
+    """还原一行PNG过滤。None / Sub / Up 用 map 和 accumulate 整行处理，Average / Paeth 只能逐字节。"""
+    if filter_type == 0:
+        return row
+    if filter_type == 2:
+        return bytes(map(operator.and_, map(operator.add, row, prev), itertools.repeat(255)))
+    out = bytearray(row)
+    if filter_type == 1:
+        for c in range(bpp):
+            out[c::bpp] = bytes(map(operator.and_, itertools.accumulate(row[c::bpp]), itertools.repeat(255)))
+    elif filter_type == 3:
+        for i in range(len(out)):
+            left = out[i - bpp] if i >= bpp else 0
+            out[i] = (out[i] + ((left + prev[i]) >> 1)) & 255
+    elif filter_type == 4:
+        for i in range(len(out)):
+            a, c = (out[i - bpp], prev[i - bpp]) if i >= bpp else (0, 0)
+            b = prev[i]
+            p = a + b - c
+            pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            out[i] = (out[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 255
+    else:
+        raise ValueError(f"Invalid PNG filter type {filter_type}")
+    return bytes(out)
+
+def read_png_header(file):
+    """读取到 IHDR 为止，返回 (宽, 高, 位深, 颜色类型, 隔行)；不是PNG时返回 None。"""
+    if file.read(8) != PNG_SIGNATURE:
+        return None
+    length, kind = struct.unpack('>I4s', file.read(8))
+    if kind != b'IHDR':
+        return None
+    width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', file.read(length))
+    file.read(4)  # CRC
+    return width, height, depth, color_type, interlace
+
+def iter_png_rows(file, width, channels):
+    """边解压 IDAT 边逐行还原，整张图像的像素不会同时留在内存中。"""
+    stride = width * channels
+    decompressor = zlib.decompressobj()
+    buffer = b''
+    prev = bytes(stride)
+    while True:
+        length, kind = struct.unpack('>I4s', file.read(8))
+        data = file.read(length)
+        file.read(4)  # CRC
+        if kind == b'IEND':
+            return
+        if kind != b'IDAT':
+            continue
+        buffer += decompressor.decompress(data)
+        offset = 0
+        while len(buffer) - offset > stride:
+            prev = unfilter_png_row(buffer[offset], buffer[offset + 1:offset + 1 + stride], prev, channels)
+            yield prev
+            offset += stride + 1
+        buffer = buffer[offset:]
+
+def box_downscale_rows(rows, width, channels, factor):
+    """按 factor x factor 的块取平均，每攒够 factor 行输出一行；不足一块的右边和下边像素丢弃。"""
+    out_width = width // factor
+    span = out_width * factor * channels
+    step = factor * channels
+    count = factor * factor
+    block = []
+    for row in rows:
+        block.append(row)
+        if len(block) < factor:
+            continue
+        out = bytearray(out_width * channels)
+        for c in range(channels):
+            sums = itertools.repeat(count // 2, out_width)  # 四舍五入
+            for line in block:
+                for dx in range(factor):
+                    sums = map(operator.add, sums, line[dx * channels + c:span:step])
+            out[c::channels] = bytes(map(operator.floordiv, sums, itertools.repeat(count)))
+        yield bytes(out)
+        block = []
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def write_png(path, width, height, color_type, rows):
+    compressor = zlib.compressobj(6)
+    with open(path, 'wb') as file:
+        file.write(PNG_SIGNATURE + png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)))
+        for row in rows:
+            data = compressor.compress(b'\x00' + row)
+            if data:
+                file.write(png_chunk(b'IDAT', data))
+        file.write(png_chunk(b'IDAT', compressor.flush()) + png_chunk(b'IEND', b''))
+
+def downscale_png(source, target, size):
+    """没有缩放库时的后备：只处理8位、非隔行、非调色板的PNG，按整数倍做盒式缩小。"""
+    with open(source, 'rb') as file:
+        header = read_png_header(file)
+        if header is None:
+            return False
+        width, height, depth, color_type, interlace = header
+        # 调色板行里是索引而不是颜色，不能直接做盒式平均
+        channels = PNG_CHANNELS.get(color_type) if color_type != PNG_PALETTE else None
+        factor = -(-max(width, height) // size)
+        if depth != 8 or channels is None or interlace or factor <= 1 or min(width, height) < factor:
+            return False
+        rows = box_downscale_rows(iter_png_rows(file, width, channels), width, channels, factor)
+        write_png(target, width // factor, height // factor, color_type, rows)
+    return True
+
+def proxy_dimensions(width, height, size):
+    scale = size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def downscale_with_oiio(source, target, size):
+    buf = oiio.ImageBuf(source)
+    spec = buf.spec()
+    if max(spec.width, spec.height) <= size:
+        return False
+    width, height = proxy_dimensions(spec.width, spec.height, size)
+    resized = oiio.ImageBufAlgo.resize(buf, roi=oiio.ROI(0, width, 0, height, 0, 1, 0, spec.nchannels))
+    if not resized.write(target):
+        raise OSError(resized.geterror())
+    return True
+
+def downscale_with_pil(source, target, size):
+    with PILImage.open(source) as img:
+        if max(img.size) <= size:
+            return False
+        img.thumbnail((size, size))
+        img.save(target)
+    return True
+
+def downscale_texture(source, target, size):
+    """把 source 缩小到最长边不超过 size 写入 target；不需要或无法缩小时返回 False。"""
+    if oiio is not None:
+        return downscale_with_oiio(source, target, size)
+    if PILImage is not None:
+        return downscale_with_pil(source, target, size)
+    return downscale_png(source, target, size)
+
+def make_texture_proxy(source, size, cache_dir, digest=None):
+    """
+    在工作进程中运行，不调用 bpy。返回 (原图路径, 内容哈希, 代理路径)，
+    原图不大于 size 或无法缩小时代理路径为 None。同内容的代理已存在时直接复用。
+    """
+    if digest is None:
+        digest = file_sha1(source)
+    target = os.path.join(cache_dir, proxy_file_name(digest, size, source))
+    if os.path.exists(target):
+        os.utime(target, None)
+        return source, digest, target
+    # 临时文件保留扩展名，缩放库按它选择写出格式
+    base, ext = os.path.splitext(target)
+    temp = f"{base}.{os.getpid()}.tmp{ext}"
+    try:
+        if not downscale_texture(source, temp, size):
+            return source, digest, None
+        os.replace(temp, target)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return source, digest, target
+
+class TextureProxyCache:
+    """
+    按内容寻址的代理贴图缓存。文件名由原图内容的 SHA-1 和目标尺寸组成，跨导入、跨路径复用；
+    原图的哈希连同大小和修改时间记在索引中，未变化的大贴图不必每次重新读取。
+    缺少的代理在进程池中生成，目录超过 max_bytes 时按最近使用时间淘汰。
+    """
+
+    def __init__(self, size, cache_dir=PROXY_CACHE_DIR, max_bytes=PROXY_CACHE_MAX_BYTES, workers=PROXY_WORKERS):
+        self.size = size
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.index_path = os.path.join(cache_dir, PROXY_INDEX_NAME)
+        self.cancelled = threading.Event()
+        self.proxies = {}  # 原图路径 -> 代理路径
+        self.generated = 0
+        self.reused = 0
+        self.full_size = 0  # 不大于目标尺寸或无法缩小，保持原图
+        self.failed = {}  # 原图路径 -> 错误
+        self.evicted = 0
+
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != PROXY_INDEX_VERSION:
+            return {}
+        return index.get("files", {})
+
+    def save_index(self, files):
+        try:
+            with open(self.index_path, 'w', encoding='utf-8') as file:
+                json.dump({"version": PROXY_INDEX_VERSION, "files": files}, file)
+        except OSError as e:
+            print(f"Warning: Could not write texture proxy index: {e}")
+
+    def build(self, infos, keep=()):
+        """
+        为 infos（TextureInfo）中大于目标尺寸的贴图准备代理，返回 {原图路径: 代理路径}。
+        不调用 bpy，可在后台线程中运行；keep 为场景中仍在使用、淘汰时要保留的代理。
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = self.load_index()
+        jobs = {}
+        for info in infos:
+            source = info.resolved
+            if not info.exists or source in self.proxies or source in jobs:
+                continue
+            if info.width and max(info.width, info.height) <= self.size:
+                self.full_size += 1
+                continue
+            try:
+                stat = os.stat(source)
+            except OSError:
+                continue
+            entry = files.get(source)
+            digest = None
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                digest = entry["sha1"]
+                if self.size in entry["full_size"]:
+                    self.full_size += 1
+                    continue
+                target = os.path.join(self.cache_dir, proxy_file_name(digest, self.size, source))
+                if os.path.exists(target):
+                    os.utime(target, None)  # 刷新使用时间，供LRU淘汰参考
+                    self.proxies[source] = target
+                    self.reused += 1
+                    continue
+            jobs[source] = (stat, digest)
+
+        if jobs:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                futures = {pool.submit(make_texture_proxy, source, self.size, self.cache_dir, digest): source
+                           for source, (_, digest) in jobs.items()}
+                for future in concurrent.futures.as_completed(futures):
+                    if self.cancelled.is_set():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        break
+                    source = futures[future]
+                    try:
+                        _, digest, target = future.result()
+                    except Exception as e:
+                        self.failed[source] = str(e)
+                        continue
+                    stat = jobs[source][0]
+                    entry = files.get(source)
+                    if not entry or entry["sha1"] != digest:
+                        entry = files[source] = {"sha1": digest, "full_size": []}
+                    entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+                    if target is None:
+                        entry["full_size"].append(self.size)
+                        self.full_size += 1
+                    else:
+                        self.proxies[source] = target
+                        self.generated += 1
+            self.save_index(files)
+
+        self.evicted = self.evict(set(keep))
+        return dict(self.proxies)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def evict(self, keep=()):
+        """按使用时间从旧到新删除代理直到目录大小不超过上限，本次导入和 keep 中的代理不会删除。"""
+        in_use = set(self.proxies.values()) | set(keep)
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name != PROXY_INDEX_NAME and '.tmp' not in entry.name:
+                stat = entry.stat()
+                total += stat.st_size
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in in_use:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def summary(self):
+        return (f"Texture proxies ({self.size}px): {self.generated} generated, {self.reused} reused, "
+                f"{self.full_size} kept at full size, {len(self.failed)} failed, {self.evicted} evicted")
+
+def proxy_paths_in_use():
+    """场景中用代理加载的图像所引用的代理文件，淘汰缓存时保留。"""
+    return {img[PROXY_PATH_PROPERTY] for img in bpy.data.images if PROXY_PATH_PROPERTY in img}
+
+def set_texture_resolution(full_resolution):
+    """把用代理加载的图像切换到原图（或切回代理），返回切换的图像数。"""
+    switched = 0
+    for img in bpy.data.images:
+        if PROXY_SOURCE_PROPERTY not in img:
+            continue
+        path = img[PROXY_SOURCE_PROPERTY] if full_resolution else img[PROXY_PATH_PROPERTY]
+        if img.filepath != path and os.path.exists(path):
+            img.filepath = path  # Blender 修改 filepath 时会重新加载图像
+            switched += 1
+    return switched
+
+class ImageRegistry:
+    """
+    一次导入内的图像注册表。
+    路径规范化后作为键，复用 bpy.data.images 中已有的同路径图像，
+    并缓存 os.path.exists 的结果，保证每张图片只加载一次。
+    """
+
+    def __init__(self, case_insensitive=CASE_INSENSITIVE_PATHS, resolver=None):
+        self.case_insensitive = case_insensitive
+        self.resolver = resolver
+        self.images = None  # 规范化路径 -> bpy.types.Image，首次使用时建立
+        self.exists_cache = {}
+        self.prefetched = {}  # 路径 -> TextureInfo，由 prefetch_textures 填入
+        self.proxies = {}  # 原图路径 -> 代理路径，由 TextureProxyCache 填入
+        self.reuse_counts = {}  # 规范化路径 -> 节省的加载次数
+        self.loads = 0
+        self.missing = 0
+        self.released = 0
+        self.released_bytes = 0
+
+    def normalize(self, path):
+        info = self.prefetched.get(path)
+        path = info.resolved if info is not None else os.path.realpath(bpy.path.abspath(path))
+        return path.lower() if self.case_insensitive else path
+
+    def exists(self, path):
+        info = self.prefetched.get(path)
+        if info is not None:
+            return info.exists
+        result = self.exists_cache.get(path)
+        if result is None:
+            result = self.exists_cache[path] = os.path.exists(path)
+        return result
+
+    def index_existing(self):
+        self.images = {}
+        for img in bpy.data.images:
+            # 用代理加载的图像按原图路径登记
+            path = img.get(PROXY_SOURCE_PROPERTY) or img.filepath
+            if path:
+                self.images.setdefault(self.normalize(path), img)
+
+    def get(self, image_path):
+        """返回路径对应的图像，必要时加载；文件不存在时返回 None。"""
+        if self.images is None:
+            self.index_existing()
+
+        key = self.normalize(image_path)
+        img = self.images.get(key)
+        if img is not None:
+            self.reuse_counts[key] = self.reuse_counts.get(key, 0) + 1
+            return img
+
+        info = self.prefetched.get(image_path)
+        if info is not None:
+            load_path = info.resolved if info.exists else None
+        elif self.exists(image_path):
+            load_path = image_path
+        else:
+            load_path = self.resolver.resolve(image_path) if self.resolver is not None else None
+        if load_path is None:
+            self.missing += 1
+            return None
+
+        count = len(bpy.data.images)
+        proxy = self.proxies.get(load_path)
+        if proxy is not None:
+            img = bpy.data.images.load(proxy, check_existing=True)
+            img[PROXY_SOURCE_PROPERTY] = load_path
+            img[PROXY_PATH_PROPERTY] = proxy
+        else:
+            img = bpy.data.images.load(load_path, check_existing=True)
+        if len(bpy.data.images) > count:
+            # check_existing 返回的已有图像不是导入器创建的，不加标记
+            img[CREATED_PROPERTY] = True
+        self.loads += 1
+        self.images[key] = img
+        return img
+
+    def saved_bytes(self):
+        """按图像尺寸估算因复用而避免的像素内存。"""
+        headers = {}
+        for info in self.prefetched.values():
+            if info.width:
+                headers[self.normalize(info.path)] = info
+        total = 0
+        for key, count in self.reuse_counts.items():
+            info = headers.get(key)
+            if info is not None:
+                # 文件头里已有尺寸，不必让Blender为读取 size 加载像素
+                total += count * info.width * info.height * (info.channels or 4)
+                continue
+            img = self.images.get(key)  # 复用后又被释放的图像不再计入
+            if img is not None:
+                total += count * image_bytes(img)
+        return total
+
+    def release_orphans(self):
+        """删除导入器创建的、已没有用户的图像（见 release_orphan_images），并从注册表中移除。"""
+        released, freed = release_orphan_images()
+        if released:
+            removed = {id(img) for img in released}
+            self.images = {key: img for key, img in (self.images or {}).items() if id(img) not in removed}
+        self.released += len(released)
+        self.released_bytes += freed
+
+    def summary(self):
+        saved = sum(self.reuse_counts.values())
+        summary = (f"Images: {self.loads} loaded, {saved} loads saved "
+                   f"(~{format_bytes(self.saved_bytes())} avoided), {self.missing} missing")
+        if self.released:
+            summary += f", {self.released} orphaned released (~{format_bytes(self.released_bytes)} freed)"
+        return summary
+
+def image_bytes(img):
+    """按尺寸估算图像像素缓冲的大小。"""
+    width, height = img.size
+    return width * height * img.channels * (4 if img.is_float else 1)
+
+def release_orphan_images():
+    """
+    删除带 CREATED_PROPERTY 标记且没有用户的图像（例如重新导入后不再被任何节点引用的旧贴图），
+    返回 (删除的图像, 估算释放的像素内存)；只统计像素已加载的图像。
+    没有标记的图像（用户自己加载的、其他插件或旧版本导入的）从不删除，设了伪用户的图像也会保留。
+    """
+    released = []
+    freed = 0
+    for img in bpy.data.images:
+        if img.users == 0 and img.get(CREATED_PROPERTY):
+            if img.has_data:
+                freed += image_bytes(img)
+            released.append(img)
+    for img in released:
+        bpy.data.images.remove(img)
+    return released, freed
+
+class ImportStats:
+    """一次导入各阶段的耗时、计数和最慢的材质。"""
+
+    def __init__(self):
+        self.stages = {}  # 阶段名 -> 秒，按首次出现顺序
+        self.counters = {}
+        self.material_times = []  # (秒, 材质名)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other):
+        """并入后台线程单独记录的统计。"""
+        for name, seconds in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        for name, amount in other.counters.items():
+            self.count(name, amount)
+        self.material_times.extend(other.material_times)
+
+    def slowest(self, limit=SLOWEST_MATERIALS_REPORTED):
+        return sorted(self.material_times, reverse=True)[:limit]
+
+    def summary(self):
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.stages.items())
+        counters = ", ".join(f"{value} {name}" for name, value in self.counters.items())
+        slowest = ", ".join(f"{name} ({seconds:.3f}s)" for seconds, name in self.slowest())
+        return f"Timing: {stages}. Counts: {counters}. Slowest: {slowest or '-'}"
+
+    def to_dict(self):
+        return {
+            "stages": self.stages,
+            "counters": self.counters,
+            "slowest_materials": [{"material": name, "seconds": seconds} for seconds, name in self.slowest()],
+        }
+
+class ImportSession:
+    """一次导入的共享状态，在 apply_material_plans 和 create_texture_node 之间传递。"""
+
+    def __init__(self, case_insensitive_paths=CASE_INSENSITIVE_PATHS, use_templates=USE_MATERIAL_TEMPLATES,
+                 search_roots=None, proxy_size=None, assigner=None, release_orphans=RELEASE_ORPHAN_IMAGES):
+        self.resolver = TextureResolver(search_roots) if search_roots else None
+        self.images = ImageRegistry(case_insensitive_paths, self.resolver)
+        self.proxies = TextureProxyCache(proxy_size) if proxy_size else None
+        self.assigner = assigner
+        self.release_orphans = release_orphans
+        self.stats = ImportStats()
+        self.use_templates = use_templates
+        self.templates = {}  # 材质形状 -> 本次导入中第一个按该形状构建的材质
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+
+    def texture_jobs(self, plans):
+        """在主线程中收集所有贴图路径，返回交给 probe_textures 的参数。"""
+        paths = collect_texture_paths(plans)
+        self.stats.count("textures prefetched", len(paths))
+        return texture_jobs(paths)
+
+    def probe_textures(self, jobs, max_workers=PREFETCH_WORKERS, stats=None):
+        """
+        解析贴图路径和文件头，不调用 bpy。在后台线程中运行时传入单独的 stats，
+        由主线程稍后并入，避免两个线程同时修改 self.stats。
+        """
+        stats = stats or self.stats
+        with stats.stage("prefetch"):
+            return probe_textures(jobs, max_workers, self.resolver)
+
+    def prefetch(self, plans, max_workers=PREFETCH_WORKERS):
+        """节点构建前的预处理：并行解析所有贴图路径，之后的查找只使用这里的结果。"""
+        self.images.prefetched.update(self.probe_textures(self.texture_jobs(plans), max_workers))
+
+    def build_proxies(self, keep=(), stats=None):
+        """为预取到的贴图准备代理，不调用 bpy；stats 的用法同 probe_textures。"""
+        stats = stats or self.stats
+        with stats.stage("proxies"):
+            return self.proxies.build(list(self.images.prefetched.values()), keep)
+
+    def get_image(self, image_path):
+        """通过注册表获取图像，并计入 images 阶段的耗时。"""
+        with self.stats.stage("images"):
+            return self.images.get(image_path)
+
+    def release_orphan_images(self):
+        """导入结束后删除不再被引用的、导入器创建的图像；release_orphans 为 False 时不做任何事。"""
+        if self.release_orphans:
+            with self.stats.stage("cleanup"):
+                self.images.release_orphans()
+
+    def summary(self):
+        summary = (f"Materials: {self.created} created, {self.updated} updated, {self.skipped} unchanged. "
+                   + self.images.summary())
+        if self.resolver is not None:
+            summary += ". " + self.resolver.summary()
+        if self.proxies is not None:
+            summary += ". " + self.proxies.summary()
+        if self.assigner is not None:
+            summary += ". " + self.assigner.summary()
+        return summary
+
+    def profile(self):
+        """可写成JSON的导入报告。"""
+        report = self.stats.to_dict()
+        report["materials"] = {"created": self.created, "updated": self.updated, "skipped": self.skipped}
+        report["images"] = {
+            "loaded": self.images.loads,
+            "loads_saved": sum(self.images.reuse_counts.values()),
+            "missing": self.images.missing,
+            "released": self.images.released,
+            "released_bytes": self.images.released_bytes,
+        }
+        if self.resolver is not None:
+            report["relocated"] = {
+                "roots": self.resolver.roots,
+                "rescanned": self.resolver.rescanned,
+                "index_seconds": self.resolver.index_seconds,
+                "resolved": self.resolver.resolved,
+                "ambiguous": self.resolver.ambiguous,
+                "unresolved": sorted(self.resolver.unresolved),
+            }
+        if self.proxies is not None:
+            report["proxies"] = {
+                "size": self.proxies.size,
+                "cache_dir": self.proxies.cache_dir,
+                "generated": self.proxies.generated,
+                "reused": self.proxies.reused,
+                "full_size": self.proxies.full_size,
+                "failed": self.proxies.failed,
+                "evicted": self.proxies.evicted,
+            }
+        if self.assigner is not None:
+            report["objects"] = {
+                "rule": self.assigner.rule,
+                "assigned": self.assigner.assigned,
+                "unchanged": self.assigner.unchanged,
+                "renamed": self.assigner.renamed,
+                "slots_set": self.assigner.slots_set,
+                "slots_added": self.assigner.slots_added,
+                "unsupported": self.assigner.unsupported,
+                "unmatched": self.assigner.unmatched,
+                "missing_materials": sorted(self.assigner.missing_materials),
+            }
+        return report
+
+def channel_node_name(channel, suffix=""):
+    """导入器为通道创建的节点名称，重新导入时据此找到并替换这些节点。"""
+    return f"{CHANNEL_NODE_PREFIX}{channel}{suffix}"
+
+def remove_channel_nodes(nodes, channel):
+    name = channel_node_name(channel)
+    for node in list(nodes):
+        if node.name == name or node.name.startswith(name + " "):
+            nodes.remove(node)
+
+def create_texture_node(nodes, links, principled, input_name, image_path, session=None, channel=None):
+    if session is None:
+        session = ImportSession()
+
     tex_node = nodes.new(type='ShaderNodeTexImage')
     tex_node.location = (-300, len(nodes) * -300)
+    if channel:
+        tex_node.name = channel_node_name(channel)
     
-    if os.path.exists(image_path):
-        img = bpy.data.images.load(image_path)
+    img = session.get_image(image_path)
+    if img is not None:
         tex_node.image = img
     else:
         print(f"Warning: Image file not found: {image_path}")
+    session.stats.count("nodes")
     
+    link_channel_output(nodes, links, principled, input_name, tex_node.outputs['Color'], session, channel)
+    return tex_node
+
+def set_color_ramp(ramp, gradient):
+    """按色标数据设置 ColorRamp 的元素、颜色和插值方式。"""
+    knots = gradient["knots"]
+    # ColorRamp 只有一个整体的插值方式。导出脚本只对插值方式一致的色标写色标数据，其余的烘焙为图像；
+    # 旧版本的导出中可能有不一致的，用线性并给出警告
+    modes = {GRADIENT_INTERPOLATIONS.get(knot.get("interpolation"), 'LINEAR') for knot in knots}
+    interpolation = next(iter(modes)) if len(modes) == 1 else 'LINEAR'
+    if len(modes) > 1:
+        print(f"Warning: Gradient knots mix {', '.join(sorted(modes))} interpolation, "
+              f"rebuilt as LINEAR; export again to bake it as an image")
+    if gradient["axis"] == 'v':
+        # C4D 的 V 从上往下，Blender 的 UV 从下往上：位置镜像。阶梯插值时每段取左端元素的颜色，
+        # 镜像后颜色要错开一个色标，并在0处补一个元素表示原来最后一个色标之后的部分
+        mirrored = list(reversed(knots))
+        colors = [knot["color"] for knot in mirrored]
+        if interpolation == 'CONSTANT':
+            colors = colors[1:] + colors[-1:]
+        knots = [dict(knot, pos=1.0 - knot["pos"], color=color) for knot, color in zip(mirrored, colors)]
+        if interpolation == 'CONSTANT':
+            knots.insert(0, dict(mirrored[0], pos=0.0))
+    elements = ramp.elements
+    while len(elements) > len(knots):
+        elements.remove(elements[len(elements) - 1])
+    while len(elements) < len(knots):
+        elements.new(1.0)
+    # Blender 修改 position 后会重新排序元素：先全部移到0，再从后往前设置，每一步都保持有序
+    for i in range(len(elements)):
+        elements[i].position = 0.0
+    for i in reversed(range(len(knots))):
+        elements[i].position = knots[i]["pos"]
+    for i, knot in enumerate(knots):
+        elements[i].color = (*knot["color"][:3], 1.0)
+    ramp.interpolation = interpolation
+
+def create_gradient_node(nodes, links, principled, input_name, gradient, session=None, channel=None):
+    """用 Texture Coordinate -> Separate XYZ -> ColorRamp 重建沿 U 或 V 变化的渐变，不需要图像。"""
+    if session is None:
+        session = ImportSession()
+
+    y = len(nodes) * -300
+    coords = nodes.new(type='ShaderNodeTexCoord')
+    coords.location = (-700, y)
+    separate = nodes.new(type='ShaderNodeSeparateXYZ')
+    separate.location = (-500, y)
+    ramp_node = nodes.new(type='ShaderNodeValToRGB')
+    ramp_node.location = (-300, y)
+    if channel:
+        ramp_node.name = channel_node_name(channel)
+        coords.name = channel_node_name(channel, " Texture Coordinate")
+        separate.name = channel_node_name(channel, " Separate XYZ")
+    links.new(coords.outputs['UV'], separate.inputs['Vector'])
+    links.new(separate.outputs['X' if gradient["axis"] == 'u' else 'Y'], ramp_node.inputs['Fac'])
+    set_color_ramp(ramp_node.color_ramp, gradient)
+    session.stats.count("nodes", 3)
+    session.stats.count("links", 2)
+    session.stats.count("gradient ramps")
+
+    link_channel_output(nodes, links, principled, input_name, ramp_node.outputs['Color'], session, channel)
+    return ramp_node
+
+def link_channel_output(nodes, links, principled, input_name, output, session, channel=None):
+    """把通道节点的颜色输出接到 Principled BSDF；Normal 和 Bump 通道先经过法线贴图或凹凸节点。"""
     if input_name == 'Normal':
         normal_map = nodes.new(type='ShaderNodeNormalMap')
         normal_map.location = (-150, len(nodes) * -300)
-        links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
+        if channel:
+            normal_map.name = channel_node_name(channel, " Normal Map")
+        links.new(output, normal_map.inputs['Color'])
         links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
+        session.stats.count("nodes")
+        session.stats.count("links", 2)
     elif input_name == 'Bump':
         bump_node = nodes.new(type='ShaderNodeBump')
         bump_node.location = (-150, len(nodes) * -300)
-        links.new(tex_node.outputs['Color'], bump_node.inputs['Height'])
+        if channel:
+            bump_node.name = channel_node_name(channel, " Bump")
+        links.new(output, bump_node.inputs['Height'])
         links.new(bump_node.outputs['Normal'], principled.inputs['Normal'])
+        session.stats.count("nodes")
+        session.stats.count("links", 2)
     else:
         if input_name in principled.inputs:
-            links.new(tex_node.outputs['Color'], principled.inputs[input_name])
+            links.new(output, principled.inputs[input_name])
+            session.stats.count("links")
         else:
             print(f"Warning: Input '{input_name}' not found in Principled BSDF")
-    
-    return tex_node
 
 def set_principled_input(principled, input_name, value):
     if input_name in principled.inputs:
@@ -135,113 +1673,1349 @@ def set_principled_input(principled, input_name, value):
     else:
         print(f"Warning: Input '{input_name}' not found in Principled BSDF")
 
-def apply_material_properties(materials, base_path):
-    for mat_name, properties in materials.items():
-        if mat_name in bpy.data.materials:
-            mat = bpy.data.materials[mat_name]
-        else:
-            mat = bpy.data.materials.new(name=mat_name)
-        
-        mat.use_nodes = True
-        nodes = mat.node_tree.nodes
-        links = mat.node_tree.links
-        
+def socket_value(value):
+    """把socket的默认值转换为可以存进自定义属性的值。"""
+    if isinstance(value, (int, float)):
+        return value
+    return list(value)
+
+def id_property_dict(value):
+    if value is None:
+        return {}
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return dict(value)
+
+def principled_socket(principled, key):
+    """key 为输入名，或 "#17" 形式的输入索引。"""
+    if key.startswith("#"):
+        return principled.inputs[int(key[1:])]
+    return principled.inputs.get(key)
+
+def remember_input_default(principled, key, defaults):
+    """第一次修改某个输入前记下它的默认值，通道被删除时用来恢复。"""
+    if key not in defaults:
+        socket = principled_socket(principled, key)
+        if socket is not None:
+            defaults[key] = socket_value(socket.default_value)
+
+def restore_input_default(principled, key, defaults):
+    if key in defaults:
+        socket = principled_socket(principled, key)
+        if socket is not None:
+            socket.default_value = defaults[key]
+
+def fingerprint(data):
+    """解析数据的指纹，包含插件版本，导入逻辑变化后旧指纹自动失效。"""
+    data = repr((bl_info["version"], data))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+def channel_fingerprints(material):
+    """每个通道只取它自己的记录计算指纹，Transmission 还取决于材质类型。"""
+    fingerprints = {}
+    for prop, record in zip(CHANNEL_MAPPING, material.channels):
+        values = None if record is None else record.values()
+        if prop == 'Transmission':
+            values = (values, material.extra.get('Type'))
+        fingerprints[prop] = fingerprint(values)
+    return fingerprints
+
+def resolve_channel(channel):
+    """
+    决定一个通道（ChannelRecord 或 None）如何设置，返回 (类型, 值)：
+    ('texture', 图像路径)、('gradient', 色标数据)、('value', 颜色或浮点) 或 (None, None)。
+    """
+    if channel is None:
+        return None, None
+
+    # 首先检查是否有图像纹理
+    if channel.image:
+        return 'texture', channel.image
+
+    # 检查Link中的着色器
+    if channel.link is not None:
+        shader_name = (channel.shader_name or '').lower()
+        if '渐变' in shader_name:
+            if channel.gradient_ramp:
+                return 'gradient', channel.gradient_ramp
+            if channel.gradient_image:
+                return 'texture', channel.gradient_image
+        elif '颜色' in shader_name or 'color' in shader_name:
+            if channel.link_color:
+                return 'value', channel.link_color
+        return None, None
+
+    # 如果没有Link或Link中没有相关着色器，则检查Color和Float
+    if channel.color is not None:
+        if channel.color == (0, 0, 0) and channel.float is not None:
+            return 'value', float(channel.float)
+        return 'value', channel.color
+    if channel.float is not None:
+        return 'value', float(channel.float)
+    return None, None
+
+def is_specular_material(material):
+    return 'specular' in (material.extra.get('Type') or '').lower()
+
+def material_plan(material):
+    """
+    把一个 MaterialRecord 转换为与宿主无关的构建计划，不调用 bpy。计划是可以写成JSON的字典：
+    每个通道的目标输入、类型和值（见 resolve_channel），Transmission 的特殊处理、混合模式和指纹。
+    """
+    channels = {}
+    for (prop, input_name), record in zip(CHANNEL_MAPPING.items(), material.channels):
+        kind, value = resolve_channel(record)
+        channels[prop] = {"input": input_name, "kind": kind, "value": value}
+    transmission = material.channels[Channel.TRANSMISSION]
+    opacity = material.channels[Channel.OPACITY]
+    channel_prints = channel_fingerprints(material)
+    # 材质指纹由其余字段和各通道的指纹组成，通道数据只 repr 一次
+    extra = sorted(material.extra.items(), key=operator.itemgetter(0))
+    return {
+        "name": material.name,
+        "fingerprint": fingerprint((extra, list(channel_prints.values()))),
+        "channel_fingerprints": channel_prints,
+        "channels": channels,
+        "specular": is_specular_material(material),
+        "transmission": None if transmission is None or transmission.float is None else float(transmission.float),
+        "blend_method": 'HASHED' if opacity is not None and (opacity.float is not None
+                                                             or opacity.color is not None) else None,
+    }
+
+def plan_materials(materials):
+    """parse_material_info 结果中的每个材质转换为计划，返回计划列表。"""
+    return [material_plan(material) for material in materials.values()]
+
+def material_shape(plan):
+    """材质的节点"形状"：每个通道是贴图、渐变、数值还是没有，以及影响节点树的特殊处理。"""
+    channels = []
+    for channel in plan["channels"].values():
+        # 渐变的轴决定 Separate XYZ 的哪个输出接到 ColorRamp
+        kind = channel["kind"]
+        channels.append((kind, channel["value"]["axis"]) if kind == 'gradient' else kind)
+    return (tuple(channels),
+            plan["specular"],
+            plan["transmission"] is not None,
+            plan["blend_method"] is not None)
+
+def apply_channel(nodes, links, principled, plan, prop, defaults, session):
+    """按计划设置一个通道：贴图/渐变创建节点，颜色/浮点直接写入Principled BSDF。"""
+    channel = plan["channels"][prop]
+    input_name, kind, value = channel["input"], channel["kind"], channel["value"]
+
+    def set_input(value):
+        remember_input_default(principled, input_name, defaults)
+        set_principled_input(principled, input_name, value)
+
+    if kind == 'texture':
+        create_texture_node(nodes, links, principled, input_name, value, session, prop)
+    elif kind == 'gradient':
+        create_gradient_node(nodes, links, principled, input_name, value, session, prop)
+    elif kind == 'value':
+        set_input(value)
+    else:
+        print(f"Info: No data found for {prop} channel")
+
+    # 特殊处理Transmission
+    if prop == 'Transmission':
+        if plan["specular"]:
+            remember_input_default(principled, "#17", defaults)
+            principled.inputs[17].default_value = 1.0
+        elif plan["transmission"] is not None:
+            set_input(plan["transmission"])
+
+def patch_template_copy(mat, plan, session):
+    """
+    材质由同形状的原型复制而来：节点和连线已经就位，只需替换图像和输入值。
+    原型与本材质形状相同，复制来的 omat_input_defaults 同样适用。
+    """
+    nodes = mat.node_tree.nodes
+    principled = nodes[PRINCIPLED_NODE_NAME]
+
+    for prop, channel in plan["channels"].items():
+        kind, value = channel["kind"], channel["value"]
+        if kind == 'texture':
+            img = session.get_image(value)
+            if img is None:
+                print(f"Warning: Image file not found: {value}")
+            nodes[channel_node_name(prop)].image = img
+        elif kind == 'gradient':
+            set_color_ramp(nodes[channel_node_name(prop)].color_ramp, value)
+        elif kind == 'value':
+            set_principled_input(principled, channel["input"], value)
+
+    if not plan["specular"] and plan["transmission"] is not None:
+        set_principled_input(principled, 'Transmission', plan["transmission"])
+
+    mat[CHANNEL_FINGERPRINTS_PROPERTY] = plan["channel_fingerprints"]
+
+def linked_channels(plan, props):
+    """
+    props 以及与它们接到同一个 Principled 输入的通道（Normal 和 Bump 都接到 Normal），按计划顺序返回。
+    这些通道只能一起重建：单独删除或设置其中一个会断开或覆盖另一个的连接。
+    """
+    inputs = {plan["channels"][prop]["input"] for prop in props}
+    return [prop for prop, channel in plan["channels"].items() if channel["input"] in inputs]
+
+def set_blend_method(mat, blend_method, defaults):
+    """
+    设置混合和阴影模式。第一次修改前把原值记在 defaults 中（键加 "@" 前缀），
+    计划不再需要混合模式时（例如去掉了 Opacity）恢复原值。
+    """
+    for attr in ('blend_method', 'shadow_method'):
+        key = "@" + attr
+        if blend_method:
+            if key not in defaults:
+                defaults[key] = getattr(mat, attr)
+            setattr(mat, attr, blend_method)
+        elif key in defaults:
+            setattr(mat, attr, defaults.pop(key))
+
+def build_material_nodes(mat, plan, session, previous_channels=None):
+    """
+    构建材质节点。previous_channels 为上次导入记录的通道指纹：
+    为 None 时清空节点树重建，否则只替换指纹变化的通道（连同接到同一输入的通道）。
+    """
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+
+    principled = output = None
+    if previous_channels is not None:
+        principled = nodes.get(PRINCIPLED_NODE_NAME)
+        output = nodes.get(OUTPUT_NODE_NAME)
+    if principled is None or output is None:
+        previous_channels = None
+
+    if previous_channels is None:
         nodes.clear()
-        
+
         principled = nodes.new(type='ShaderNodeBsdfPrincipled')
+        principled.name = PRINCIPLED_NODE_NAME
         principled.location = (0, 0)
-        
+
         output = nodes.new(type='ShaderNodeOutputMaterial')
+        output.name = OUTPUT_NODE_NAME
         output.location = (300, 0)
-        
+
         links.new(principled.outputs['BSDF'], output.inputs['Surface'])
-        
-        material_type = properties.get('Type', '').lower()
-        is_specular = 'specular' in material_type
-
-        channel_mapping = {
-            'Diffuse': 'Base Color',
-            'Roughness': 'Roughness',
-            'Normal': 'Normal',
-            'Bump': 'Normal',
-            'Displacement': 'Displacement',
-            'Opacity': 'Alpha',
-            'Metalness': 'Metallic',
-            'Emission': 'Emission',
-            'Transmission': 'Transmission'
-        }
+        session.stats.count("nodes", 2)
+        session.stats.count("links")
+        previous_channels = {}
+        # 节点树重建后输入的原值不再适用，材质属性的原值仍然有效
+        defaults = {key: value for key, value in id_property_dict(mat.get(INPUT_DEFAULTS_PROPERTY)).items()
+                    if key.startswith("@")}
+    else:
+        defaults = id_property_dict(mat.get(INPUT_DEFAULTS_PROPERTY))
 
-        for prop, input_name in channel_mapping.items():
-            link_key = f'{prop} Link'
-            color_key = f'{prop} Color'
-            float_key = f'{prop} Float'
-            
-            # 首先检查是否有图像纹理
-            image_texture_file = properties.get(f'{prop} Image Texture File')
-            if image_texture_file:
-                create_texture_node(nodes, links, principled, input_name, image_texture_file)
-                continue  # 如果使用了图像纹理，跳过后续的颜色和float处理
-
-            # 检查Link中的着色器
-            if link_key in properties:
-                shader_name = properties.get(f'{prop} Shader Name', '').lower()
-                if '渐变' in shader_name:
-                    gradient_path = properties.get(f'{prop} Gradient Image Path')
-                    if gradient_path:
-                        create_texture_node(nodes, links, principled, input_name, gradient_path)
-                elif '颜色' in shader_name or 'color' in shader_name:
-                    color_value = properties.get(f'{prop} Color (Link)')
-                    if color_value:
-                        color = parse_vector(color_value)
-                        set_principled_input(principled, input_name, color)
-            # 如果没有Link或Link中没有相关着色器，则检查Color和Float
-            elif color_key in properties:
-                color = parse_vector(properties[color_key])
-                if color == [0, 0, 0] and float_key in properties:
-                    set_principled_input(principled, input_name, float(properties[float_key]))
-                else:
-                    set_principled_input(principled, input_name, color)
-            elif float_key in properties:
-                set_principled_input(principled, input_name, float(properties[float_key]))
-            else:
-                print(f"Info: No data found for {prop} channel")
+    channels = plan["channel_fingerprints"]
+    changed = [prop for prop in plan["channels"] if previous_channels.get(prop) != channels[prop]]
+    rebuilt = linked_channels(plan, changed)
+    # 先删除所有要重建的通道的节点并恢复它们改过的输入，再按计划顺序重新设置：
+    # 同一个输入上后设置的通道生效，结果与清空重建相同
+    for prop in rebuilt:
+        if prop in previous_channels:
+            remove_channel_nodes(nodes, prop)
+            restore_input_default(principled, plan["channels"][prop]["input"], defaults)
+            if prop == 'Transmission':
+                restore_input_default(principled, "#17", defaults)
+    for prop in rebuilt:
+        apply_channel(nodes, links, principled, plan, prop, defaults, session)
 
-        # 特殊处理Transmission
-        if is_specular:
-            principled.inputs[17].default_value = 1.0
-        elif 'Transmission Float' in properties:
-            set_principled_input(principled, 'Transmission', float(properties['Transmission Float']))
+    set_blend_method(mat, plan["blend_method"], defaults)
 
-        # 设置混合模式
-        if 'Opacity Float' in properties or 'Opacity Color' in properties:
-            mat.blend_method = 'HASHED'
-            mat.shadow_method = 'HASHED'
+    mat[CHANNEL_FINGERPRINTS_PROPERTY] = channels
+    mat[INPUT_DEFAULTS_PROPERTY] = defaults
 
-        print(f"Material '{mat_name}' processed")
+def apply_material_properties(materials, base_path, session=None):
+    """把 parse_material_info 的结果转换为计划后用 apply_material_plans 应用。"""
+    return apply_material_plans(plan_materials(materials), session)
 
-def main():
-    input_file_path = os.path.join(os.path.expanduser('~'), 'Documents', 'chche', 'octane_material_info.txt')
-    
-    if not os.path.exists(input_file_path):
-        print(f"File not found: {input_file_path}")
+def apply_material_plans(plans, session=None):
+    """
+    按计划创建或更新材质。指纹与上次导入相同的材质直接跳过，
+    有变化的材质只重建变化的通道，结果计入 session 的 created/updated/skipped。
+    新材质按节点形状分组：每种形状只逐个节点构建第一个材质，其余材质复制它再修改值。
+    """
+    if session is None:
+        session = ImportSession()
+
+    with session.stats.stage("apply"):
+        for plan in plans:
+            apply_material(plan, session)
+
+    return session
+
+def apply_material(plan, session):
+    """按计划创建、更新或跳过一个材质，并记录它的耗时。"""
+    start = time.perf_counter()
+    mat_name = plan["name"]
+    material_fingerprint = plan["fingerprint"]
+    mat = bpy.data.materials.get(mat_name)
+
+    if mat is None:
+        shape = material_shape(plan) if session.use_templates else None
+        prototype = session.templates.get(shape)
+        if prototype is not None:
+            # 复制同形状的原型，只修改值
+            mat = prototype.copy()
+            mat.name = mat_name
+            patch_template_copy(mat, plan, session)
+            session.stats.count("template copies")
+        else:
+            mat = bpy.data.materials.new(name=mat_name)
+            build_material_nodes(mat, plan, session)
+            if shape is not None:
+                session.templates[shape] = mat
+        session.created += 1
+    elif mat.get(FINGERPRINT_PROPERTY) == material_fingerprint and mat.node_tree is not None:
+        session.skipped += 1
         return
+    else:
+        previous_channels = mat.get(CHANNEL_FINGERPRINTS_PROPERTY)
+        if previous_channels is not None:
+            previous_channels = id_property_dict(previous_channels)
+        build_material_nodes(mat, plan, session, previous_channels)
+        session.updated += 1
+
+    mat[FINGERPRINT_PROPERTY] = material_fingerprint
+    session.stats.material_times.append((time.perf_counter() - start, mat_name))
+    print(f"Material '{mat_name}' processed")
+
+BLENDER_NAME_SUFFIX = re.compile(r'\.\d{3,}$')
+LOOSE_NAME_SEPARATORS = re.compile(r'[\s_.\-]+')
+
+def object_name_key(name, rule, pattern=None):
+    """
+    按规则把对象名转换为匹配用的键。'EXACT' 不变；'SUFFIX' 去掉Blender重名时追加的 .001 后缀；
+    'LOOSE' 另外忽略大小写、空白、下划线、点和连字符；'PATTERN' 删除 pattern（已编译的正则表达式）匹配的部分。
+    """
+    if rule == 'EXACT':
+        return name
+    if rule == 'PATTERN':
+        return pattern.sub('', name)
+    name = BLENDER_NAME_SUFFIX.sub('', name)
+    if rule == 'LOOSE':
+        name = LOOSE_NAME_SEPARATORS.sub('', name).casefold()
+    return name
+
+def group_assignments(assignments):
+    """
+    把 (对象名, 材质名, 对象ID) 按对象合并为 (对象名, [材质名])，对象按第一次出现的顺序，材质按标签顺序。
+    按 (对象ID, 对象名) 分组，与记录的先后顺序无关，同名的不同对象各占一组；没有ID的记录按对象名合并。
+    同一对象上重复的材质只占一个槽。
+    """
+    groups = {}  # (对象ID, 对象名) -> [材质名]
+    for obj_name, mat_name, obj_id in assignments:
+        mat_names = groups.setdefault((obj_id, obj_name), [])
+        if mat_name not in mat_names:  # 每个对象只有几个材质，列表比字典便宜
+            mat_names.append(mat_name)
+    return [(obj_name, mat_names) for (_, obj_name), mat_names in groups.items()]
 
-    materials_info = parse_material_info(input_file_path)
-    base_path = os.path.dirname(input_file_path)
-    apply_material_properties(materials_info, base_path)
+class ObjectAssigner:
+    """
+    把导出中的对象-材质对应关系写到 bpy.data.objects 的材质槽上。
+    对象和材质的名称索引只建一次；已是目标材质的槽不动，槽不够时才追加，重复导入不会产生重复的槽。
+    导出的对象名找不到（或已分给前一个同名对象）时按 rule 规范化后匹配，
+    规范化后相同的对象按名称排序，依次分给导出中出现的对象；与导出对象名完全相同的对象只按原名分配。
+    candidates 不为 None 时只在这些对象中匹配（例如选中的对象），否则在 bpy.data.objects 中匹配。
+    """
+
+    def __init__(self, rule=OBJECT_NAME_RULE, pattern=OBJECT_NAME_PATTERN, candidates=None):
+        if rule not in OBJECT_NAME_RULES:
+            raise ValueError(f"Unknown object name rule: {rule}")
+        self.rule = rule
+        self.pattern = re.compile(pattern) if rule == 'PATTERN' else None
+        self.candidates = candidates
+        self.objects = None  # 名称 -> 对象，首次分配时建立
+        self.materials = None  # 名称 -> 材质
+        self.by_key = None  # 规范化名称 -> 按名称排序的对象名，第一次按原名找不到时建立
+        self.cursors = {}  # 规范化名称 -> by_key 中第一个可能未分配的位置
+        self.used = set()
+        self.reserved = set()  # 导出中出现的、在Blender中原名存在的对象名
+        self.total = 0
+        self.processed = 0
+        self.assigned = 0
+        self.unchanged = 0
+        self.renamed = 0
+        self.slots_set = 0
+        self.slots_added = 0
+        self.unsupported = 0
+        self.unmatched = []
+        self.missing_materials = set()
+
+    def build_index(self):
+        candidates = bpy.data.objects if self.candidates is None else self.candidates
+        self.objects = {obj.name: obj for obj in candidates}
+        self.materials = {mat.name: mat for mat in bpy.data.materials}
+        self.by_key = None
+        self.cursors = {}
+
+    def build_key_index(self):
+        """只给导出中没有原名出现的对象计算规范化名称：保留的对象不会按规范化名称分配。"""
+        self.by_key = {}
+        for name in sorted(self.objects.keys() - self.reserved):
+            self.by_key.setdefault(object_name_key(name, self.rule, self.pattern), []).append(name)
+
+    def find_object(self, name):
+        """返回导出对象名对应的Blender对象，找不到时返回 None。"""
+        if name in self.objects and name not in self.used:
+            match = name
+        elif self.rule == 'EXACT':
+            return None
+        else:
+            if self.by_key is None:
+                self.build_key_index()
+            key = object_name_key(name, self.rule, self.pattern)
+            candidates = self.by_key.get(key, ())
+            position = self.cursors.get(key, 0)
+            while position < len(candidates) and (candidates[position] in self.used
+                                                  or candidates[position] in self.reserved):
+                position += 1
+            self.cursors[key] = position
+            if position == len(candidates):
+                return None
+            match = candidates[position]
+            if match != name:
+                self.renamed += 1
+        self.used.add(match)
+        return self.objects[match]
 
+    def assign_slots(self, obj, mat_names):
+        """把材质依次写到对象的前几个槽，缺失的材质保留原槽（追加时为空槽）。"""
+        materials = getattr(obj.data, 'materials', None)
+        if materials is None:
+            self.unsupported += 1
+            return
+        count = len(materials)
+        changed = False
+        if count:  # 没有槽时不用取槽列表
+            for slot, mat_name in zip(obj.material_slots, mat_names):
+                mat = self.materials.get(mat_name)
+                if mat is None:
+                    self.missing_materials.add(mat_name)
+                elif slot.material != mat:
+                    slot.material = mat
+                    self.slots_set += 1
+                    changed = True
+        for mat_name in mat_names[count:]:
+            mat = self.materials.get(mat_name)
+            if mat is None:
+                self.missing_materials.add(mat_name)
+            materials.append(mat)
+            self.slots_added += 1
+            changed = True
+        if changed:
+            self.assigned += 1
+        else:
+            self.unchanged += 1
+
+    def iter_assign(self, assignments):
+        """逐个对象分配，每处理完一个对象 yield 一次，供 ImportJob 按时间预算分批执行。"""
+        groups = group_assignments(assignments)
+        self.total += len(groups)
+        if self.objects is None:
+            self.build_index()
+        if self.rule != 'EXACT':  # 只有按规范化名称匹配时才需要避开原名存在的对象
+            self.reserved |= self.objects.keys() & {name for name, _ in groups}
+        for obj_name, mat_names in groups:
+            obj = self.find_object(obj_name)
+            if obj is None:
+                self.unmatched.append(obj_name)
+            else:
+                self.assign_slots(obj, mat_names)
+            self.processed += 1
+            yield
+
+    def assign(self, assignments):
+        for _ in self.iter_assign(assignments):
+            pass
+        return self
+
+    def summary(self):
+        return (f"Objects: {self.assigned} assigned, {self.unchanged} unchanged, "
+                f"{self.renamed} matched by {self.rule.lower()} name, {len(self.unmatched)} not found "
+                f"({self.slots_set} slots set, {self.slots_added} added, "
+                f"{len(self.missing_materials)} missing materials)")
+
+    def report_unmatched(self, limit=UNMATCHED_OBJECTS_REPORTED):
+        if self.unmatched:
+            more = len(self.unmatched) - limit
+            print(f"Warning: Objects not found: {', '.join(self.unmatched[:limit])}"
+                  + (f" and {more} more" if more > 0 else ""))
+
+def find_export_file(directory):
+    """返回目录中最新的导出文件（包括压缩的），没有则返回 None。"""
+    candidates = [os.path.join(directory, name + suffix)
+                  for name in EXPORT_FILE_NAMES for suffix in ("",) + COMPRESSION_SUFFIXES]
+    candidates = [path for path in candidates if os.path.exists(path)]
+    if not candidates:
+        return None
+    return max(candidates, key=os.path.getmtime)
+
+def write_import_profile(session, input_file_path, profiler=None):
+    """在导出文件旁写 <name>_import_profile.json，开启cProfile时另写 .prof 文件。"""
+    base = input_file_path
+    if base.endswith(COMPRESSION_SUFFIXES):
+        base = os.path.splitext(base)[0]
+    base = os.path.splitext(base)[0] + "_import_profile"
+    report = session.profile()
+    report["input"] = input_file_path
+    if profiler is not None:
+        profiler.dump_stats(base + ".prof")
+        report["cprofile"] = base + ".prof"
+    with open(base + ".json", 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    return base + ".json"
+
+def parse_search_roots(value):
+    """面板中的搜索目录以 ; 分隔。"""
+    return [root.strip() for root in value.split(';') if root.strip()]
+
+class ImportJob:
+    """
+    可分步执行的导入。解析、生成材质计划和贴图预取不调用 bpy，background 为 True 时在后台线程中进行；
+    input_file_path 也可以是 convert_exports 生成的计划文件；给出 plans 时（例如 MaterialLibrary.select 的结果）
+    不再读取文件，assignments 为对应的对象-材质关系，input_file_path 只用于贴图搜索目录和报告。
+    材质在主线程中由 step() 按时间预算分批应用，session 有 assigner 时随后同样分批分配到对象。
+    每个材质和对象要么完整处理要么未动，因此在两次 step() 之间取消不会留下半成品。
+    """
+
+    def __init__(self, input_file_path, search_roots=(), session=None, background=False, plans=None,
+                 assignments=None):
+        self.input_file_path = input_file_path
+        self.session = session or ImportSession()
+        roots = list(search_roots) + TEXTURE_SEARCH_ROOTS + [os.path.dirname(input_file_path)]
+        self.session.resolver = self.session.images.resolver = TextureResolver(roots)
+        self.assignments = list(assignments or ())
+        self.plans = None
+        self.pending = None  # 尚未应用的材质计划
+        self.pending_objects = None  # ObjectAssigner.iter_assign 的生成器
+        self.applied = 0
+        self.phase = 'parse'
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1) if background else None
+        self.future = self.submit(self.parse, plans)
+
+    def submit(self, func, *args):
+        if self.executor is not None:
+            return self.executor.submit(func, *args)
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def parse(self, plans=None):
+        stats = ImportStats()
+        if plans is not None:
+            return plans, stats
+        return load_material_plans(self.input_file_path, self.assignments, stats), stats
+
+    def probe_textures(self, jobs):
+        stats = ImportStats()
+        return self.session.probe_textures(jobs, stats=stats), stats
+
+    def build_proxies(self, keep):
+        stats = ImportStats()
+        return self.session.build_proxies(keep, stats), stats
+
+    def step(self, budget=None):
+        """
+        推进导入，budget 为本次最多占用主线程的秒数（None 表示一次做完）。
+        全部完成时返回 True；解析出错时抛出 ValueError。
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        if self.phase == 'parse':
+            if deadline is not None and not self.future.done():
+                return False
+            self.plans, stats = self.future.result()
+            self.session.stats.merge(stats)
+            self.session.stats.count("materials", len(self.plans))
+            self.future = self.submit(self.probe_textures, self.session.texture_jobs(self.plans))
+            self.phase = 'prefetch'
+
+        if self.phase == 'prefetch':
+            if deadline is not None and not self.future.done():
+                return False
+            prefetched, stats = self.future.result()
+            self.session.stats.merge(stats)
+            self.session.images.prefetched.update(prefetched)
+            if self.session.proxies is not None:
+                self.future = self.submit(self.build_proxies, proxy_paths_in_use())
+                self.phase = 'proxies'
+            else:
+                self.pending = iter(self.plans)
+                self.phase = 'apply'
+
+        if self.phase == 'proxies':
+            if deadline is not None and not self.future.done():
+                return False
+            proxies, stats = self.future.result()
+            self.session.stats.merge(stats)
+            self.session.images.proxies.update(proxies)
+            self.pending = iter(self.plans)
+            self.phase = 'apply'
+
+        if self.phase == 'apply':
+            with self.session.stats.stage("apply"):
+                for plan in self.pending:
+                    apply_material(plan, self.session)
+                    self.applied += 1
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        return False
+            if self.session.assigner is not None:
+                self.pending_objects = self.session.assigner.iter_assign(self.assignments)
+                self.phase = 'assign'
+            else:
+                self.close()
+                self.phase = 'done'
+
+        if self.phase == 'assign':
+            with self.session.stats.stage("assign"):
+                for _ in self.pending_objects:
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        return False
+            self.close()
+            self.phase = 'done'
+        return True
+
+    def run(self):
+        while not self.step():
+            pass
+
+    def progress(self):
+        if not self.plans:
+            return 0.0
+        return self.applied / len(self.plans)
+
+    def status(self):
+        if self.phase == 'parse':
+            return f"Parsing {os.path.basename(self.input_file_path)}..."
+        if self.phase == 'prefetch':
+            return f"Resolving textures for {len(self.plans)} materials..."
+        if self.phase == 'proxies':
+            return f"Generating {self.session.proxies.size}px texture proxies..."
+        if self.phase == 'assign':
+            assigner = self.session.assigner
+            return f"Assigning materials to objects {assigner.processed}/{assigner.total}"
+        return f"Applying materials {self.applied}/{len(self.plans)}"
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def cancel(self):
+        """停止导入，已应用的材质保持不变。"""
+        if self.session.proxies is not None:
+            self.session.proxies.cancel()
+        self.close()
+        self.phase = 'cancelled'
+
+    def finish(self, write_profile=False, profiler=None):
+        """汇总计数并打印报告，write_profile 或 profiler 存在时写导入报告。"""
+        session = self.session
+        session.release_orphan_images()
+        session.stats.count("image loads", session.images.loads)
+        session.stats.count("missing files", session.images.missing)
+        # 在预取或代理生成完成前取消时，后台线程可能仍在写入解析器，跳过依赖它的报告
+        if self.pending is not None:
+            if session.resolver is not None:
+                session.stats.count("relocated textures", len(session.resolver.resolved))
+                session.resolver.report_ambiguous()
+            if session.proxies is not None:
+                session.stats.count("texture proxies", len(session.proxies.proxies))
+            if self.pending_objects is not None:
+                session.stats.count("objects assigned", session.assigner.assigned)
+                session.assigner.report_unmatched()
+            if write_profile or profiler is not None:
+                print(f"Import profile written to: {write_import_profile(session, self.input_file_path, profiler)}")
+
+        if self.phase == 'cancelled':
+            print(f"Import cancelled: {self.applied} of {len(self.plans or ())} materials applied.")
+        else:
+            print(f"{len(self.plans)} unique materials, {len(self.assignments)} object assignments in export.")
+        print(session.summary())
+        print(session.stats.summary())
+
+def main(write_profile=False, capture_cprofile=False, search_roots=(), proxy_size=None, assigner=None,
+         release_orphans=RELEASE_ORPHAN_IMAGES):
+    """
+    导入最新的导出文件，返回本次导入的 ImportSession（未导入时返回 None）。
+    write_profile 在导出文件旁写JSON报告；capture_cprofile 同时用cProfile采样整个导入。
+    search_roots 为本机找不到贴图时的搜索目录，另加 TEXTURE_SEARCH_ROOTS 和导出文件所在目录。
+    proxy_size 不为 None 时图像节点使用缩小到该尺寸的代理贴图。
+    assigner 为 ObjectAssigner 时把材质分配到导出中对应的对象上。
+    release_orphans 为 True 时导入结束后删除导入器创建的、已没有用户的图像。
+    """
+    session = ImportSession(proxy_size=proxy_size, assigner=assigner, release_orphans=release_orphans)
+    profiler = cProfile.Profile() if capture_cprofile else None
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        with session.stats.stage("find"):
+            input_file_path = find_export_file(EXPORT_DIR)
+
+        if input_file_path is None:
+            print(f"File not found: {os.path.join(EXPORT_DIR, EXPORT_FILE_NAMES[0])}")
+            return
+
+        job = ImportJob(input_file_path, search_roots, session)
+        try:
+            job.run()
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+    job.finish(write_profile, profiler)
     print("Materials have been updated in Blender.")
+    return session
+
+def read_plan_file(file_path, assignments=None):
+    """读取计划文件，返回材质计划列表；assignments 的用法同 parse_material_info。"""
+    plans = []
+    with open_export_file(file_path, 'r') as file:
+        records = (json.loads(line) for line in file if line.strip())
+        header = next(records, None)
+        if not isinstance(header, dict) or header.get("format") != PLAN_FORMAT_NAME:
+            raise ValueError("Not an Octane material plan: missing format header")
+        if header.get("version") != PLAN_FORMAT_VERSION or tuple(header.get("addon_version", ())) != bl_info["version"]:
+            raise ValueError(f"Material plan {os.path.basename(file_path)} was written by another add-on version, "
+                             f"convert the export again")
+        for record in records:
+            kind = record.pop("kind", None)
+            if kind == "material":
+                plans.append(record)
+            elif kind == "assignment" and assignments is not None:
+                assignments.append((record["object"], record["material"], record.get("object_id")))
+    return plans
+
+def is_plan_file(file_path):
+    if detect_export_format(file_path) != "jsonl":
+        return False
+    with open_export_file(file_path, 'r') as file:
+        header = json.loads(file.readline() or "{}")
+    return isinstance(header, dict) and header.get("format") == PLAN_FORMAT_NAME
+
+def load_material_plans(file_path, assignments=None, stats=None):
+    """
+    返回文件中所有材质的计划，不调用 bpy。file_path 为导出文件时解析后生成计划，
+    为计划文件时直接读取。stats 为 ImportStats 时记录 parse 和 plan 阶段的耗时。
+    """
+    stats = stats or ImportStats()
+    with stats.stage("parse"):
+        if is_plan_file(file_path):
+            return read_plan_file(file_path, assignments)
+        materials = parse_material_info(file_path, assignments)
+    with stats.stage("plan"):
+        return plan_materials(materials)
+
+def write_plan_file(input_path, output_path):
+    """
+    把一个导出文件转换为计划文件，返回 (材质数, 对象-材质对应数)。
+    先写临时文件再替换，转换失败或中断时不会留下不完整的计划。可在工作进程中调用。
+    """
+    assignments = []
+    plans = load_material_plans(input_path, assignments)
+    header = {"format": PLAN_FORMAT_NAME, "version": PLAN_FORMAT_VERSION,
+              "addon_version": bl_info["version"], "source": os.path.abspath(input_path)}
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(header) + "\n")
+            for plan in plans:
+                file.write(json.dumps(dict(plan, kind="material"), ensure_ascii=False) + "\n")
+            for obj_name, mat_name, obj_id in assignments:
+                record = {"kind": "assignment", "object": obj_name, "material": mat_name, "object_id": obj_id}
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return len(plans), len(assignments)
+
+def is_export_file_name(name):
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.endswith(EXPORT_FILE_EXTENSIONS) and not name.endswith(PLAN_FILE_SUFFIX)
+
+def find_export_files(paths):
+    """命令行参数中的文件原样保留，目录递归查找导出文件；返回 [(导出文件, 相对于参数目录的路径)]。"""
+    found = []
+    for path in paths:
+        if not os.path.isdir(path):
+            found.append((path, os.path.basename(path)))
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if is_export_file_name(name):
+                    file_path = os.path.join(dirpath, name)
+                    found.append((file_path, os.path.relpath(file_path, path)))
+    return found
+
+def plan_output_path(input_path, relative_path, output_dir=None):
+    """计划文件写在导出文件旁边，或 output_dir 中与导出文件相同的相对位置。"""
+    if output_dir is not None:
+        input_path = os.path.join(output_dir, relative_path)
+    base = input_path
+    if base.endswith(COMPRESSION_SUFFIXES):
+        base = os.path.splitext(base)[0]
+    return os.path.splitext(base)[0] + PLAN_FILE_SUFFIX
+
+def convert_exports(paths, output_dir=None, workers=PLAN_WORKERS):
+    """
+    用进程池把多个导出文件转换为计划文件，不需要 Blender。
+    返回 (转换结果 {导出文件: (计划文件, 材质数, 对应数)}, 失败 {导出文件: 错误})。
+    """
+    jobs = {}
+    for input_path, relative_path in find_export_files(paths):
+        output_path = plan_output_path(input_path, relative_path, output_dir)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        jobs[input_path] = output_path
+
+    converted = {}
+    failed = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs) or 1))) as executor:
+        futures = {executor.submit(write_plan_file, input_path, output_path): input_path
+                   for input_path, output_path in jobs.items()}
+        for future in concurrent.futures.as_completed(futures):
+            input_path = futures[future]
+            try:
+                materials, assignments = future.result()
+            except Exception as e:
+                failed[input_path] = f"{type(e).__name__}: {e}"
+                print(f"Failed: {input_path}: {failed[input_path]}")
+                continue
+            converted[input_path] = (jobs[input_path], materials, assignments)
+            print(f"Converted {input_path} -> {jobs[input_path]} ({materials} materials, {assignments} assignments)")
+    return converted, failed
+
+LIBRARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS exports (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, materials INTEGER);
+CREATE TABLE IF NOT EXISTS materials (name TEXT PRIMARY KEY, source TEXT, fingerprint TEXT, plan TEXT);
+CREATE TABLE IF NOT EXISTS objects (object TEXT, material TEXT, source TEXT, object_id INTEGER);
+CREATE TABLE IF NOT EXISTS textures (material TEXT, path TEXT, source TEXT);
+CREATE INDEX IF NOT EXISTS materials_by_source ON materials (source);
+CREATE INDEX IF NOT EXISTS objects_by_object ON objects (object);
+CREATE INDEX IF NOT EXISTS objects_by_material ON objects (material);
+CREATE INDEX IF NOT EXISTS objects_by_source ON objects (source);
+CREATE INDEX IF NOT EXISTS textures_by_material ON textures (material);
+CREATE INDEX IF NOT EXISTS textures_by_source ON textures (source);
+CREATE TEMP TABLE IF NOT EXISTS wanted (name TEXT PRIMARY KEY);
+"""
+# 查询对象-材质对应关系时的列；没有对象ID的记录（旧的计划文件）ID为 NULL，按对象名合并
+LIBRARY_ASSIGNMENT_COLUMNS = "objects.object, objects.material, objects.source || '#' || objects.object_id"
+
+class MaterialLibrary:
+    """
+    保存在 SQLite 文件中的材质库。收录（ingest）导出文件或计划文件时记录每个材质的计划、指纹、
+    导出中使用它的对象和引用的贴图；之后按对象名或材质名通配符查询，只读取需要的材质计划，
+    导入的耗时与请求的材质数成正比，而不是与源场景的大小成正比。
+    材质按名称唯一，后收录的导出中的同名材质覆盖先前的；库由其他插件版本写入时清空，需要重新收录。
+    """
+
+    def __init__(self, path=LIBRARY_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(LIBRARY_SCHEMA)
+        version = json.dumps([LIBRARY_VERSION, bl_info["version"]])
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            with self.db:
+                if row is not None:
+                    print(f"Warning: Material library {path} was written by another add-on version, "
+                          f"exports must be added again")
+                for table in ("exports", "materials", "objects", "textures"):
+                    self.db.execute(f"DELETE FROM {table}")
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def ingest(self, file_path):
+        """
+        收录一个导出文件或计划文件，返回收录的材质数；文件自上次收录后未变化时返回 None。
+        重新收录时先删除该文件以前的记录，整个过程在一个事务中完成。
+        """
+        source = os.path.abspath(file_path)
+        stat = os.stat(source)
+        row = self.db.execute("SELECT mtime_ns, size FROM exports WHERE path = ?", (source,)).fetchone()
+        if row == (stat.st_mtime_ns, stat.st_size):
+            return None
+
+        assignments = []
+        plans = load_material_plans(source, assignments)
+        with self.db:
+            for table in ("materials", "objects", "textures"):
+                self.db.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO materials VALUES (?, ?, ?, ?)",
+                ((plan["name"], source, plan["fingerprint"], json.dumps(plan, ensure_ascii=False, separators=(",", ":")))
+                 for plan in plans))
+            self.db.executemany("INSERT INTO objects VALUES (?, ?, ?, ?)",
+                                ((obj_name, mat_name, source, obj_id) for obj_name, mat_name, obj_id in assignments))
+            self.db.executemany("INSERT INTO textures VALUES (?, ?, ?)",
+                                ((plan["name"], path, source)
+                                 for plan in plans for path in sorted(collect_texture_paths([plan]))))
+            self.db.execute("INSERT OR REPLACE INTO exports VALUES (?, ?, ?, ?)",
+                            (source, stat.st_mtime_ns, stat.st_size, len(plans)))
+        return len(plans)
+
+    def set_wanted(self, names):
+        """把要查询的名称放进临时表，查询时与它连接，不受SQL参数个数的限制。"""
+        self.db.execute("DELETE FROM wanted")
+        self.db.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((name,) for name in names))
+
+    def object_assignments(self, object_names):
+        """
+        返回导出中这些对象的 (对象名, 材质名, 对象ID)，按收录时的顺序；对象ID 加上导出文件路径，
+        不同导出中的对象不会合并。Blender对象名带 .001 后缀时也按去掉后缀的名称查找。
+        """
+        names = set(object_names)
+        names.update(object_name_key(name, 'SUFFIX') for name in object_names)
+        self.set_wanted(names)
+        return self.db.execute(f"SELECT {LIBRARY_ASSIGNMENT_COLUMNS} FROM objects "
+                               "JOIN wanted ON objects.object = wanted.name ORDER BY objects.rowid").fetchall()
+
+    def material_assignments(self, material_names):
+        """返回导出中使用这些材质的 (对象名, 材质名, 对象ID)，按收录时的顺序。"""
+        self.set_wanted(material_names)
+        return self.db.execute(f"SELECT {LIBRARY_ASSIGNMENT_COLUMNS} FROM objects "
+                               "JOIN wanted ON objects.material = wanted.name ORDER BY objects.rowid").fetchall()
+
+    def match_materials(self, pattern):
+        """返回名称匹配通配符 pattern（* ? [...]，区分大小写）的材质名。"""
+        return [row[0] for row in self.db.execute(
+            "SELECT name FROM materials WHERE name GLOB ? ORDER BY name", (pattern,))]
+
+    def load_plans(self, material_names):
+        """读取这些材质的计划，库中没有的材质被忽略。"""
+        self.set_wanted(material_names)
+        return [json.loads(row[0]) for row in self.db.execute(
+            "SELECT materials.plan FROM materials JOIN wanted ON materials.name = wanted.name")]
+
+    def texture_paths(self, material_names):
+        """这些材质引用的贴图路径。"""
+        self.set_wanted(material_names)
+        return {row[0] for row in self.db.execute(
+            "SELECT textures.path FROM textures JOIN wanted ON textures.material = wanted.name "
+            "JOIN materials ON materials.name = textures.material AND materials.source = textures.source")}
+
+    def select(self, object_names=None, pattern=None):
+        """
+        按对象名（例如选中的对象）或材质名通配符选出材质，返回 (材质计划, 对象-材质对应关系)，
+        可直接交给 ImportJob。按通配符选择时对应关系包括导出中使用这些材质的所有对象。
+        """
+        if object_names is not None:
+            assignments = self.object_assignments(object_names)
+            material_names = list(dict.fromkeys(mat_name for _, mat_name, _ in assignments))
+        else:
+            material_names = self.match_materials(pattern)
+            assignments = self.material_assignments(material_names)
+        return self.load_plans(material_names), assignments
+
+    def summary(self):
+        exports, materials = self.db.execute("SELECT COUNT(*), COALESCE(SUM(materials), 0) FROM exports").fetchone()
+        unique = self.db.execute("SELECT COUNT(*) FROM materials").fetchone()[0]
+        objects = self.db.execute("SELECT COUNT(DISTINCT object) FROM objects").fetchone()[0]
+        return (f"Library: {exports} exports, {unique} unique materials ({materials} ingested), "
+                f"{objects} objects")
+
+def ingest_exports(paths, library_path=LIBRARY_PATH):
+    """把导出文件或计划文件（目录中递归查找）收录到材质库，返回 (收录的文件数, 未变化的文件数)。"""
+    ingested = unchanged = 0
+    with MaterialLibrary(library_path) as library:
+        for file_path, _ in find_export_files(paths):
+            count = library.ingest(file_path)
+            if count is None:
+                unchanged += 1
+                continue
+            ingested += 1
+            print(f"Added {file_path} to the library ({count} materials)")
+        print(library.summary())
+    return ingested, unchanged
+
+def cli(argv=None):
+    """不在Blender中运行时的命令行入口：把导出文件批量转换为材质计划，--library 时同时收录到材质库。"""
+    parser = argparse.ArgumentParser(
+        prog="Blender_Omat.py",
+        description="Convert Octane material exports into material plans that Blender imports without parsing")
+    parser.add_argument("paths", nargs="+", help="export files, or folders searched recursively for exports")
+    parser.add_argument("-o", "--output-dir", help="write plans here instead of next to each export")
+    parser.add_argument("-j", "--workers", type=int, default=PLAN_WORKERS, help="worker processes")
+    parser.add_argument("--library", metavar="PATH", nargs="?", const=LIBRARY_PATH,
+                        help=f"also add the converted plans to a material library (default {LIBRARY_PATH})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    converted, failed = convert_exports(args.paths, args.output_dir, args.workers)
+    materials = sum(result[1] for result in converted.values())
+    print(f"{len(converted)} exports converted ({materials} materials), {len(failed)} failed "
+          f"in {time.perf_counter() - start:.2f}s")
+    if args.library:
+        ingest_exports(sorted(result[0] for result in converted.values()), args.library)
+    for input_path, error in sorted(failed.items()):
+        print(f"    {input_path}: {error}")
+    return 1 if failed else 0
 
-class IMPORT_OT_OctaneMaterial(bpy.types.Operator):
+class LiveLinkServer:
+    """
+    Live Link 监听器。后台线程接受本机连接并解析记录，按材质名合并到 pending（同名的新记录覆盖旧记录）；
+    主线程的计时器调用 tick()，在没有新记录到达 LIVE_LINK_DEBOUNCE 秒后取出一批，贴图在工作线程中预取，
+    完成后再按时间预算分批应用，主线程不等待文件系统。协议见 Cinema_Omat.LiveLinkSender。
+    """
+
+    def __init__(self, host=LIVE_LINK_HOST, port=LIVE_LINK_PORT, search_roots=(), budget_ms=FRAME_BUDGET_MS):
+        self.session_id = os.urandom(8).hex()
+        self.resolver = TextureResolver(list(search_roots) + TEXTURE_SEARCH_ROOTS + [EXPORT_DIR])
+        self.budget = budget_ms / 1000.0
+        self.lock = threading.Lock()
+        self.pending = {}  # 材质名 -> 材质计划
+        self.first_received = None
+        self.last_received = None
+        self.received = 0
+        self.applied = 0
+        self.batches = 0
+        self.errors = 0
+        self.stats = ImportStats()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.prefetching = None  # (session, batch, future, stats)：正在预取贴图的一批
+        self.sock = socket.create_server((host, port))
+        self.sock.settimeout(LIVE_LINK_POLL)
+        self.port = self.sock.getsockname()[1]
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, name="omat-live-link", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        bpy.app.timers.register(self.tick, first_interval=LIVE_LINK_POLL, persistent=True)
+        print(f"Live link listening on {LIVE_LINK_HOST}:{self.port}")
+
+    def stop(self):
+        self.running = False
+        if bpy.app.timers.is_registered(self.tick):
+            bpy.app.timers.unregister(self.tick)
+        self.thread.join()
+        self.executor.shutdown(cancel_futures=True)
+        self.sock.close()
+        print(f"Live link stopped. {self.summary()}")
+
+    def serve(self):
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with conn:
+                self.handle(conn)
+
+    def handle(self, conn):
+        """读取一次推送；不调用 bpy，只把记录转换为计划放进 pending。"""
+        conn.settimeout(5.0)
+        file = conn.makefile('rwb')
+        hello = {"format": EXPORT_FORMAT_NAME, "version": SUPPORTED_FORMAT_VERSION, "session": self.session_id}
+        count = 0
+        try:
+            file.write(json.dumps(hello).encode('utf-8') + b"\n")
+            file.flush()
+            records = (json.loads(line) for line in file if line.strip())
+            check_export_header(next(records, None))
+            shaders = {}
+            for record in records:
+                if record.get("kind") != "material":
+                    continue
+                plan = material_plan(record_to_material(record, shaders))
+                now = time.perf_counter()
+                with self.lock:
+                    if not self.pending:
+                        self.first_received = now
+                    self.pending[record["name"]] = plan
+                    self.last_received = now
+                    self.received += 1
+                count += 1
+            reply = {"received": count}
+        except (OSError, ValueError, KeyError) as e:
+            self.errors += 1
+            reply = {"error": str(e)}
+        try:
+            file.write(json.dumps(reply).encode('utf-8') + b"\n")
+            file.flush()
+        except OSError:
+            pass
+
+    def take_batch(self, now):
+        """取出可以应用的记录；仍在连续编辑时返回空字典。"""
+        with self.lock:
+            if not self.pending:
+                return {}
+            if (now - self.last_received < LIVE_LINK_DEBOUNCE
+                    and now - self.first_received < LIVE_LINK_MAX_DELAY):
+                return {}
+            batch, self.pending = self.pending, {}
+            self.first_received = None
+        return batch
+
+    def start_prefetch(self, batch):
+        """在主线程中收集这一批的贴图路径，交给工作线程预取。"""
+        session = ImportSession()
+        session.stats = self.stats
+        session.resolver = session.images.resolver = self.resolver
+        stats = ImportStats()
+        future = self.executor.submit(session.probe_textures, session.texture_jobs(batch.values()), stats=stats)
+        self.prefetching = (session, batch, future, stats)
+
+    def tick(self):
+        """bpy.app.timers 回调，在主线程中运行；返回下次调用的间隔。"""
+        if self.prefetching is None:
+            batch = self.take_batch(time.perf_counter())
+            if not batch:
+                return LIVE_LINK_POLL
+            self.start_prefetch(batch)
+        session, batch, future, stats = self.prefetching
+        if not future.done():
+            return LIVE_LINK_PREFETCH_POLL
+        self.prefetching = None
+        session.images.prefetched.update(future.result())
+        session.stats.merge(stats)
+
+        deadline = time.perf_counter() + self.budget
+        items = list(batch.items())
+        with session.stats.stage("apply"):
+            for index, (mat_name, plan) in enumerate(items):
+                apply_material(plan, session)
+                self.applied += 1
+                if time.perf_counter() >= deadline:
+                    # 超出预算：剩余的放回队列，期间收到的更新记录优先
+                    with self.lock:
+                        for name, rest in items[index + 1:]:
+                            self.pending.setdefault(name, rest)
+                        if self.first_received is None:
+                            # 只有放回的记录：下一次 tick 直接应用，不再等待防抖
+                            self.first_received = self.last_received = 0.0
+                    break
+        session.release_orphan_images()
+        self.batches += 1
+        print(f"Live link: {session.summary()}")
+        return LIVE_LINK_POLL
+
+    def summary(self):
+        return (f"{self.received} records received, {self.applied} applied in {self.batches} batches, "
+                f"{self.errors} errors")
+
+# 当前运行的 LiveLinkServer，未启动时为 None
+live_link = None
+
+def scene_proxy_size(scene):
+    """面板中的代理尺寸，'FULL' 表示不使用代理。"""
+    return None if scene.omat_texture_proxy == 'FULL' else int(scene.omat_texture_proxy)
+
+def scene_object_assigner(scene, candidates=None):
+    """按面板设置创建 ObjectAssigner，关闭分配时返回 None；匹配模式不是合法的正则表达式时抛出 re.error。"""
+    if not scene.omat_assign_objects:
+        return None
+    return ObjectAssigner(scene.omat_object_name_rule, scene.omat_object_name_pattern, candidates)
+
+def update_texture_resolution(scene, context):
+    switched = set_texture_resolution(scene.omat_full_resolution_textures)
+    target = "full resolution" if scene.omat_full_resolution_textures else "proxies"
+    print(f"Switched {switched} images to {target}")
+
+# 没有 bpy 时（代理贴图的工作进程）只定义不调用 bpy 的部分，类仍可创建但不会注册
+_Operator = bpy.types.Operator if bpy else object
+_Panel = bpy.types.Panel if bpy else object
+
+class IMPORT_OT_OctaneMaterial(_Operator):
     bl_idname = "import_octane_material.import"
     bl_label = "Import Octane Material"
     bl_description = "Import materials from Octane"
 
     def execute(self, context):
-        main()
+        scene = context.scene
+        try:
+            assigner = scene_object_assigner(scene)
+        except re.error as e:
+            self.report({'ERROR'}, f"Invalid object name pattern: {e}")
+            return {'CANCELLED'}
+        session = main(scene.omat_write_profile, scene.omat_capture_cprofile,
+                       parse_search_roots(scene.omat_texture_search_paths), scene_proxy_size(scene), assigner,
+                       scene.omat_release_orphans)
+        if session is None:
+            self.report({'WARNING'}, "No Octane material export found")
+            return {'CANCELLED'}
+        if scene.omat_full_resolution_textures:
+            set_texture_resolution(True)
+        self.report({'INFO'}, session.summary())
+        self.report({'INFO'}, session.stats.summary())
         return {'FINISHED'}
 
-class IMPORT_PT_OctaneMaterialPanel(bpy.types.Panel):
+    def invoke(self, context, event):
+        """从面板启动时，若开启后台导入则进入模态，由计时器分批应用材质。"""
+        scene = context.scene
+        if not scene.omat_background_import:
+            return self.execute(context)
+
+        input_file_path = find_export_file(EXPORT_DIR)
+        if input_file_path is None:
+            self.report({'WARNING'}, "No Octane material export found")
+            return {'CANCELLED'}
+        try:
+            assigner = scene_object_assigner(scene)
+        except re.error as e:
+            self.report({'ERROR'}, f"Invalid object name pattern: {e}")
+            return {'CANCELLED'}
+
+        self.job = ImportJob(input_file_path, parse_search_roots(scene.omat_texture_search_paths),
+                             ImportSession(proxy_size=scene_proxy_size(scene), assigner=assigner,
+                                           release_orphans=scene.omat_release_orphans),
+                             background=True)
+        self.budget = scene.omat_frame_budget_ms / 1000.0
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.01, window=context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.job.cancel()
+            return self.stop(context)
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        try:
+            done = self.job.step(self.budget)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            self.job.cancel()
+            return self.stop(context)
+
+        context.window_manager.progress_update(int(self.job.progress() * 100))
+        context.workspace.status_text_set(self.job.status())
+        return self.stop(context) if done else {'RUNNING_MODAL'}
+
+    def stop(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        self.job.finish(context.scene.omat_write_profile)
+
+        if context.scene.omat_full_resolution_textures:
+            set_texture_resolution(True)
+        if self.job.phase == 'cancelled':
+            self.report({'WARNING'}, f"Import cancelled after {self.job.applied} materials")
+            return {'CANCELLED'}
+        self.report({'INFO'}, self.job.session.summary())
+        self.report({'INFO'}, self.job.session.stats.summary())
+        return {'FINISHED'}
+
+class IMPORT_OT_OctaneLibraryAdd(_Operator):
+    bl_idname = "import_octane_material.library_add"
+    bl_label = "Add Export to Library"
+    bl_description = "Record the latest Octane material export in the material library without creating materials"
+
+    def execute(self, context):
+        input_file_path = find_export_file(EXPORT_DIR)
+        if input_file_path is None:
+            self.report({'WARNING'}, "No Octane material export found")
+            return {'CANCELLED'}
+        try:
+            with MaterialLibrary() as library:
+                count = library.ingest(input_file_path)
+                summary = library.summary()
+        except (ValueError, sqlite3.Error) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if count is None:
+            self.report({'INFO'}, f"{os.path.basename(input_file_path)} is already in the library. {summary}")
+        else:
+            self.report({'INFO'}, f"Added {count} materials. {summary}")
+        return {'FINISHED'}
+
+class IMPORT_OT_OctaneLibraryImport(_Operator):
+    bl_idname = "import_octane_material.library_import"
+    bl_label = "Import from Library"
+    bl_description = "Import only the library materials used by the selected objects or matching a name pattern"
+
+    def execute(self, context):
+        scene = context.scene
+        selected = scene.omat_library_selection == 'SELECTED'
+        try:
+            assigner = scene_object_assigner(scene, context.selected_objects if selected else None)
+        except re.error as e:
+            self.report({'ERROR'}, f"Invalid object name pattern: {e}")
+            return {'CANCELLED'}
+        if not os.path.exists(LIBRARY_PATH):
+            self.report({'WARNING'}, "The material library is empty, add an export first")
+            return {'CANCELLED'}
+
+        try:
+            with MaterialLibrary() as library:
+                if selected:
+                    plans, assignments = library.select(object_names=[obj.name for obj in context.selected_objects])
+                else:
+                    plans, assignments = library.select(pattern=scene.omat_library_pattern)
+        except sqlite3.Error as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if not plans:
+            self.report({'WARNING'}, "No library materials for the selected objects" if selected
+                        else f"No library materials match {scene.omat_library_pattern}")
+            return {'CANCELLED'}
+
+        job = ImportJob(LIBRARY_PATH, parse_search_roots(scene.omat_texture_search_paths),
+                        ImportSession(proxy_size=scene_proxy_size(scene), assigner=assigner,
+                                      release_orphans=scene.omat_release_orphans),
+                        plans=plans, assignments=assignments)
+        job.run()
+        job.finish(scene.omat_write_profile)
+        if scene.omat_full_resolution_textures:
+            set_texture_resolution(True)
+        self.report({'INFO'}, job.session.summary())
+        return {'FINISHED'}
+
+class IMPORT_OT_OctaneLiveLink(_Operator):
+    bl_idname = "import_octane_material.live_link"
+    bl_label = "Toggle Octane Live Link"
+    bl_description = "Start or stop receiving material updates pushed from Cinema 4D"
+
+    def execute(self, context):
+        global live_link
+        if live_link is not None:
+            live_link.stop()
+            live_link = None
+            self.report({'INFO'}, "Live link stopped")
+            return {'FINISHED'}
+
+        scene = context.scene
+        try:
+            live_link = LiveLinkServer(port=scene.omat_live_link_port,
+                                       search_roots=parse_search_roots(scene.omat_texture_search_paths),
+                                       budget_ms=scene.omat_frame_budget_ms)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not start live link: {e}")
+            return {'CANCELLED'}
+        live_link.start()
+        self.report({'INFO'}, f"Live link listening on port {live_link.port}")
+        return {'FINISHED'}
+
+class IMPORT_PT_OctaneMaterialPanel(_Panel):
     bl_label = "Import Octane Material"
     bl_idname = "IMPORT_PT_OctaneMaterialPanel"
     bl_space_type = 'VIEW_3D'
@@ -251,14 +3025,128 @@ class IMPORT_PT_OctaneMaterialPanel(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         layout.operator("import_octane_material.import")
+        layout.operator("import_octane_material.live_link",
+                        text="Stop Live Link" if live_link is not None else "Start Live Link")
+        layout.prop(context.scene, "omat_live_link_port")
+        layout.prop(context.scene, "omat_texture_search_paths")
+        layout.prop(context.scene, "omat_texture_proxy")
+        layout.prop(context.scene, "omat_full_resolution_textures")
+        layout.prop(context.scene, "omat_release_orphans")
+        layout.prop(context.scene, "omat_assign_objects")
+        row = layout.row()
+        row.enabled = context.scene.omat_assign_objects
+        row.prop(context.scene, "omat_object_name_rule")
+        row = layout.row()
+        row.enabled = context.scene.omat_assign_objects and context.scene.omat_object_name_rule == 'PATTERN'
+        row.prop(context.scene, "omat_object_name_pattern")
+        box = layout.box()
+        box.label(text="Material Library")
+        box.operator("import_octane_material.library_add")
+        box.prop(context.scene, "omat_library_selection")
+        row = box.row()
+        row.enabled = context.scene.omat_library_selection == 'PATTERN'
+        row.prop(context.scene, "omat_library_pattern")
+        box.operator("import_octane_material.library_import")
+        layout.prop(context.scene, "omat_background_import")
+        row = layout.row()
+        row.enabled = context.scene.omat_background_import
+        row.prop(context.scene, "omat_frame_budget_ms")
+        layout.prop(context.scene, "omat_write_profile")
+        layout.prop(context.scene, "omat_capture_cprofile")
+
+def scene_properties():
+    """注册到 bpy.types.Scene 上的插件设置。"""
+    return {
+        "omat_texture_search_paths": bpy.props.StringProperty(
+            name="Texture Search Paths",
+            description="Folders (separated by ;) searched by file name for textures missing at their exported path",
+            default=""),
+        "omat_texture_proxy": bpy.props.EnumProperty(
+            name="Texture Proxies",
+            description="Point image nodes at downscaled copies of large textures (generated once and cached)",
+            items=[('FULL', "Full Resolution", "Load textures at their original size")]
+                  + [(str(size), f"{size // 1024}K Proxies", f"Downscale textures larger than {size} px")
+                     for size in TEXTURE_PROXY_SIZES],
+            default='FULL'),
+        "omat_full_resolution_textures": bpy.props.BoolProperty(
+            name="Full Resolution Textures",
+            description="Switch images loaded from proxies to their original files, e.g. for final renders",
+            default=False, update=update_texture_resolution),
+        "omat_release_orphans": bpy.props.BoolProperty(
+            name="Release Unused Images",
+            description="After each import, remove images the importer loaded that no node uses any more",
+            default=RELEASE_ORPHAN_IMAGES),
+        "omat_assign_objects": bpy.props.BoolProperty(
+            name="Assign to Objects",
+            description="Set the material slots of the exported objects, reusing slots that already hold the material",
+            default=ASSIGN_OBJECT_MATERIALS),
+        "omat_object_name_rule": bpy.props.EnumProperty(
+            name="Object Names",
+            description="How exported object names are matched when no Blender object has the exact name",
+            items=[('EXACT', "Exact", "Only objects with exactly the exported name"),
+                   ('SUFFIX', "Ignore .001 Suffix", "Ignore the numeric suffix Blender adds to duplicate names"),
+                   ('LOOSE', "Loose", "Also ignore case, spaces, underscores, dots and hyphens"),
+                   ('PATTERN', "Pattern", "Remove the parts of both names matched by a regular expression")],
+            default=OBJECT_NAME_RULE),
+        "omat_object_name_pattern": bpy.props.StringProperty(
+            name="Name Pattern",
+            description="Regular expression removed from object names before matching",
+            default=OBJECT_NAME_PATTERN),
+        "omat_library_selection": bpy.props.EnumProperty(
+            name="Import",
+            description="Which library materials Import from Library creates",
+            items=[('SELECTED', "Selected Objects", "Materials the export assigned to the selected objects"),
+                   ('PATTERN', "Name Pattern", "Materials whose name matches a wildcard pattern")],
+            default='SELECTED'),
+        "omat_library_pattern": bpy.props.StringProperty(
+            name="Material Names",
+            description="Wildcard pattern (* ? [...], case-sensitive) matched against library material names",
+            default="*"),
+        "omat_background_import": bpy.props.BoolProperty(
+            name="Import in Background",
+            description="Keep Blender responsive: parse in the background and apply materials in small batches (Esc cancels)",
+            default=False),
+        "omat_frame_budget_ms": bpy.props.IntProperty(
+            name="Batch Budget (ms)",
+            description="Time spent applying materials per timer event during a background import",
+            default=FRAME_BUDGET_MS, min=5, max=1000),
+        "omat_live_link_port": bpy.props.IntProperty(
+            name="Live Link Port",
+            description="Local TCP port the live link listens on (must match LIVE_LINK_PORT in Cinema_Omat.py)",
+            default=LIVE_LINK_PORT, min=1024, max=65535),
+        "omat_write_profile": bpy.props.BoolProperty(
+            name="Write Import Profile",
+            description="Write a JSON timing report next to the export file",
+            default=False),
+        "omat_capture_cprofile": bpy.props.BoolProperty(
+            name="Capture cProfile",
+            description="Profile the whole import with cProfile and save a .prof file next to the export file",
+            default=False),
+    }
 
 def register():
     bpy.utils.register_class(IMPORT_OT_OctaneMaterial)
+    bpy.utils.register_class(IMPORT_OT_OctaneLibraryAdd)
+    bpy.utils.register_class(IMPORT_OT_OctaneLibraryImport)
+    bpy.utils.register_class(IMPORT_OT_OctaneLiveLink)
     bpy.utils.register_class(IMPORT_PT_OctaneMaterialPanel)
+    for name, prop in scene_properties().items():
+        setattr(bpy.types.Scene, name, prop)
 
 def unregister():
+    global live_link
+    if live_link is not None:
+        live_link.stop()
+        live_link = None
+    for name in scene_properties():
+        delattr(bpy.types.Scene, name)
     bpy.utils.unregister_class(IMPORT_OT_OctaneMaterial)
+    bpy.utils.unregister_class(IMPORT_OT_OctaneLibraryAdd)
+    bpy.utils.unregister_class(IMPORT_OT_OctaneLibraryImport)
+    bpy.utils.unregister_class(IMPORT_OT_OctaneLiveLink)
     bpy.utils.unregister_class(IMPORT_PT_OctaneMaterialPanel)
 
 if __name__ == "__main__":
+    if bpy is None:
+        sys.exit(cli())
     register()
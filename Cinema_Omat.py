@@ -1,7 +1,29 @@
 import c4d
+import argparse
+import contextlib
+import gzip
+import hashlib
+import io
+import json
 import os
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
 from c4d import gui
 
+try:
+    import numpy as np
+except ImportError:  # C4D自带的Python通常没有NumPy，退回到bytearray实现
+    np = None
+
+try:
+    import zstandard
+except ImportError:  # zstd 压缩需要另外安装 zstandard
+    zstandard = None
+
 # Octane材质的类型ID
 OCTANE_MATERIAL_TYPE_ID = 1029501  # 请替换为正确的Octane材质类型ID
 
@@ -14,10 +36,182 @@ OCTANE_MATERIAL_TYPES = {
     2516: "Universal"
 }
 
+# 渐变图像的分辨率、缓存目录和缓存目录的大小上限
+GRADIENT_RESOLUTION = 256
+GRADIENT_CACHE_DIR = os.path.join(os.path.expanduser('~/Documents'), "octane_gradient_cache")
+GRADIENT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# 沿 UV 的一个轴变化的渐变类型导出为色标，由Blender重建为 ColorRamp；其余类型仍烘焙为图像
+GRADIENT_RAMP_AXES = {
+    "SLA_GRADIENT_TYPE_2D_U": "u",
+    "SLA_GRADIENT_TYPE_2D_V": "v",
+}
+GRADIENT_RAMP_MAX_KNOTS = 31  # Blender ColorRamp 最多32个元素，V方向的阶梯渐变要多用一个
+# 色标的插值方式（GRADIENT_INTERPOLATION_*）对应的 ColorRamp 插值，与 Blender_Omat.GRADIENT_INTERPOLATIONS 一致；
+# 每个色标决定它到下一个色标之间的插值，烘焙图像时按同样的方式取样
+GRADIENT_INTERPOLATIONS = {
+    0: 'CARDINAL',  # CUBICKNOT
+    1: 'CARDINAL',  # CUBICBIAS
+    2: 'EASE',  # SMOOTHKNOT
+    3: 'LINEAR',  # LINEARKNOT
+    4: 'LINEAR',  # LINEAR
+    5: 'CONSTANT',  # NONE
+}
+# Blender ColorRamp 的 CARDINAL 插值使用 key_curve_position_weights(KEY_CARDINAL)，其中的张力系数 fc
+GRADIENT_CARDINAL_FC = 0.71
+# 烘焙算法的版本，写进渐变缓存的键：算法改变后不再使用缓存目录中旧的图像
+# 2: 按色标的插值方式取样（之前总是线性）
+# 3: 三次插值使用 Blender 的 Cardinal 权重（fc = 0.71），之前是 Catmull-Rom（0.5）
+GRADIENT_BAKE_VERSION = 3
+
+# 导出格式："jsonl"（默认，每行一个JSON记录）、"binary"（紧凑二进制）或 "text"（旧的文本格式）
+EXPORT_FORMAT = "jsonl"
+EXPORT_FORMAT_NAME = "octane-material"
+# 2: 着色器写成单独的 "shader" 记录，材质中以 {"ref": id} 引用
+# 3: 可映射的渐变写成色标（"gradient_ramp"），不再烘焙图像
+EXPORT_FORMAT_VERSION = 3
+EXPORT_FILE_NAMES = {
+    "jsonl": "octane_material_info.jsonl",
+    "binary": "octane_material_info.omatb",
+    "text": "octane_material_info.txt",
+}
+BINARY_MAGIC = b"OMATB"
+
+# 导出文件压缩：None、"gzip" 或 "zstd"，文件名加上对应后缀；Blender端按文件头自动识别
+EXPORT_COMPRESSION = None
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+EXPORT_BUFFER_SIZE = 256 * 1024
+
+# 导出范围："selection"（选中的对象及其子对象）或 "document"（整个文档，不需要选择）
+EXPORT_SCOPE = "selection"
+# 只导出这些层上的对象（层名称列表），None 表示不限制
+EXPORT_LAYERS = None
+# 只导出这些类型的对象（例如 [c4d.Opolygon]），None 表示不限制
+EXPORT_OBJECT_TYPES = None
+
+# 导出目录，与 Blender_Omat.EXPORT_DIR 一致
+EXPORT_DIR = os.path.join(os.path.expanduser('~/Documents'), "chche")
+
+# Live Link：为 True 时 main() 把有变化的材质直接发送给Blender（需先在Blender面板中启动Live Link）；
+# 本文件复制为插件目录中的 Cinema_Omat.pyp 时，启动时注册 LiveLinkMessage，文档修改后自动发送
+LIVE_LINK = False
+LIVE_LINK_HOST = "127.0.0.1"
+LIVE_LINK_PORT = 52375  # 与 Blender 面板中的 Live Link Port 一致
+LIVE_LINK_TIMEOUT = 5.0
+LIVE_LINK_STATE_PATH = os.path.join(EXPORT_DIR, "live_link_state.json")
+LIVE_LINK_PLUGIN_ID = 1000001  # 开发用的插件ID（1000001-1000010）；发布前请替换为在 plugincafe 申请的ID
+LIVE_LINK_INTERVAL = 250  # 毫秒：文档修改后最多等这么久推送一次，连续的修改合并为一次推送
+
+# 命令行批量导出（c4dpy Cinema_Omat.py 文件或目录 ...）：每个文档在单独的进程中载入和导出
+BATCH_WORKERS = max(1, min(4, os.cpu_count() or 1))  # 同时运行的进程数；每个进程都载入完整的文档，受内存限制
+BATCH_TIMEOUT = 600.0  # 单个文档的超时（秒），超时的进程被终止并记为失败
+BATCH_POLL = 0.1
+BATCH_DOCUMENT_EXTENSION = ".c4d"
+BATCH_RESULT_PREFIX = "OMAT_BATCH_RESULT "  # 工作进程输出的最后结果行
+
+# 结构化导出的材质通道：(通道名, 启用参数, 链接参数, 颜色参数, 浮点参数)，参数名在导出时才解析
+MATERIAL_CHANNELS = (
+    ("Diffuse", "OCT_MAT_USE_COLOR", "OCT_MATERIAL_DIFFUSE_LINK", "OCT_MATERIAL_DIFFUSE_COLOR", "OCT_MATERIAL_DIFFUSE_FLOAT"),
+    ("Roughness", "OCT_MAT_USE_ROUGHNESS", "OCT_MATERIAL_ROUGHNESS_LINK", "OCT_MATERIAL_ROUGHNESS_COLOR", "OCT_MATERIAL_ROUGHNESS_FLOAT"),
+    ("Bump", "OCT_MAT_USE_BUMP", "OCT_MATERIAL_BUMP_LINK", None, None),
+    ("Normal", "OCT_MAT_USE_NORMAL", "OCT_MATERIAL_NORMAL_LINK", None, None),
+    ("Displacement", "OCT_MAT_USE_DISPLACEMENT", None, None, None),
+    ("Opacity", "OCT_MAT_USE_OPACITY", "OCT_MATERIAL_OPACITY_LINK", "OCT_MATERIAL_OPACITY_COLOR", "OCT_MATERIAL_OPACITY_FLOAT"),
+    ("Transmission", "OCT_MAT_USE_TRANSMISSION", "OCT_MATERIAL_TRANSMISSION_LINK", "OCT_MATERIAL_TRANSMISSION_COLOR", "OCT_MATERIAL_TRANSMISSION_FLOAT"),
+)
+
 def lerp_color(color1, color2, t):
     """Linearly interpolate between two colors."""
     return [int(color1[i] * (1 - t) + color2[i] * t) for i in range(3)]
 
+def cardinal_color(before, left, right, after, t):
+    """
+    Cardinal 样条，权重与 Blender 的 key_curve_position_weights(KEY_CARDINAL) 相同（fc 为 GRADIENT_CARDINAL_FC）：
+    参数为前一个、左、右、后一个色标的颜色（0-1），返回 0-255 的颜色。权重先乘以255，每个分量只做一次乘加。
+    """
+    fc = GRADIENT_CARDINAL_FC
+    t2 = t * t
+    t3 = t2 * t
+    w0 = (-fc * t3 + 2.0 * fc * t2 - fc * t) * 255
+    w1 = ((2.0 - fc) * t3 + (fc - 3.0) * t2 + 1.0) * 255
+    w2 = ((fc - 2.0) * t3 + (3.0 - 2.0 * fc) * t2 + fc * t) * 255
+    w3 = (fc * t3 - fc * t2) * 255
+    return [int(w0 * before[j] + w1 * left[j] + w2 * right[j] + w3 * after[j]) for j in range(3)]
+
+def GradientColorAt(knots, t):
+    """
+    计算渐变在位置t处的颜色。左侧色标的插值方式决定这一段的取样：
+    线性与原逐像素算法的取整方式完全一致，平滑为 smoothstep，阶梯取左侧色标的颜色，三次为 Cardinal 样条。
+    """
+    if t <= knots[0]["pos"]:
+        return [int(knots[0]["col"][j] * 255) for j in range(3)]
+    if t >= knots[-1]["pos"]:
+        return [int(knots[-1]["col"][j] * 255) for j in range(3)]
+    for i in range(len(knots) - 1):
+        if knots[i]["pos"] <= t <= knots[i + 1]["pos"]:
+            lerp_factor = (t - knots[i]["pos"]) / (knots[i + 1]["pos"] - knots[i]["pos"])
+            interpolation = GRADIENT_INTERPOLATIONS.get(knots[i].get("interpolation"), 'LINEAR')
+            if interpolation == 'CONSTANT':
+                return [int(knots[i]["col"][j] * 255) for j in range(3)]
+            if interpolation == 'CARDINAL':
+                # 两端之外没有色标时重复端点
+                return cardinal_color(knots[max(i - 1, 0)]["col"], knots[i]["col"], knots[i + 1]["col"],
+                                      knots[min(i + 2, len(knots) - 1)]["col"], lerp_factor)
+            if interpolation == 'EASE':
+                lerp_factor = lerp_factor * lerp_factor * (3.0 - 2.0 * lerp_factor)
+            return lerp_color(
+                [knots[i]["col"][j] * 255 for j in range(3)],
+                [knots[i + 1]["col"][j] * 255 for j in range(3)],
+                lerp_factor
+            )
+    return [int(knots[-1]["col"][j] * 255) for j in range(3)]
+
+def BakeGradientPixels(knots, width, height, gradient_type):
+    """
+    将渐变烘焙为按行排列的RGB字节缓冲 (height * width * 3)。
+    渐变只沿一个轴变化，因此只需沿该轴计算一次查找表，再广播到整张图像。
+    """
+    vertical = gradient_type == c4d.SLA_GRADIENT_TYPE_2D_V
+    count = height if vertical else width
+    # 色标颜色先转换为元组，查找表的每个位置不再访问 c4d.Vector
+    knots = [dict(knot, col=(knot["col"][0], knot["col"][1], knot["col"][2])) for knot in knots]
+    # 注意：原实现对V方向同样除以 (width - 1)，这里保持一致
+    lut = [GradientColorAt(knots, float(i) / (width - 1)) for i in range(count)]
+    lut = [[min(255, max(0, v)) for v in color] for color in lut]
+
+    if np is not None:
+        table = np.array(lut, dtype=np.uint8)
+        if vertical:
+            image = np.broadcast_to(table[:, None, :], (height, width, 3))
+        else:
+            image = np.broadcast_to(table[None, :, :], (height, width, 3))
+        return np.ascontiguousarray(image).tobytes()
+
+    if vertical:
+        return b"".join(bytes(color) * width for color in lut)
+    return bytes(v for color in lut for v in color) * height
+
+def WriteBitmapPixels(bmp, pixels, width, height):
+    """按行批量写入像素，不支持SetPixelCnt时退回逐像素写入。"""
+    stride = width * 3
+    try:
+        row_buffer = c4d.storage.ByteSeq(None, stride)
+        last_row = None
+        for y in range(height):
+            row = pixels[y * stride:(y + 1) * stride]
+            if row != last_row:
+                row_buffer[0:stride] = row
+                last_row = row
+            bmp.SetPixelCnt(0, y, width, row_buffer, 3, c4d.COLORMODE_RGB, c4d.PIXELCNT_0)
+    except (AttributeError, TypeError):
+        for y in range(height):
+            offset = y * stride
+            for x in range(width):
+                o = offset + x * 3
+                bmp.SetPixel(x, y, pixels[o], pixels[o + 1], pixels[o + 2])
+
 def GradientToBitmap(gradient, width, height, gradient_type):
     bmp = c4d.bitmaps.BaseBitmap()
     if bmp is None:
@@ -31,47 +225,232 @@ def GradientToBitmap(gradient, width, height, gradient_type):
 
     knots = sorted([gradient.GetKnot(i) for i in range(knot_count)], key=lambda k: k["pos"])
 
-    for x in range(width):
-        for y in range(height):
-            if gradient_type in [c4d.SLA_GRADIENT_TYPE_2D_U, c4d.SLA_GRADIENT_TYPE_2D_V]:
-                t = float(x) if gradient_type == c4d.SLA_GRADIENT_TYPE_2D_U else float(y)
-                t /= (width - 1)
-            else:
-                t = float(x) / (width - 1)
-
-            if t <= knots[0]["pos"]:
-                color = [int(knots[0]["col"][j] * 255) for j in range(3)]
-            elif t >= knots[-1]["pos"]:
-                color = [int(knots[-1]["col"][j] * 255) for j in range(3)]
-            else:
-                for i in range(knot_count - 1):
-                    if knots[i]["pos"] <= t <= knots[i + 1]["pos"]:
-                        lerp_factor = (t - knots[i]["pos"]) / (knots[i + 1]["pos"] - knots[i]["pos"])
-                        color = lerp_color(
-                            [knots[i]["col"][j] * 255 for j in range(3)],
-                            [knots[i + 1]["col"][j] * 255 for j in range(3)],
-                            lerp_factor
-                        )
-                        break
-
-            bmp.SetPixel(x, y, *color)
+    pixels = BakeGradientPixels(knots, width, height, gradient_type)
+    WriteBitmapPixels(bmp, pixels, width, height)
 
     return bmp
 
-def save_gradient_image(gradient, obj_name, material_name, channel_name):
-    bmp = GradientToBitmap(gradient, 256, 256, c4d.SLA_GRADIENT_TYPE_2D_U)  # 假设为2D_U类型渐变
-    if bmp is None:
+class GradientCache(object):
+    """
+    按内容寻址的渐变图像缓存。
+
+    键由节点数据、渐变类型和分辨率的哈希组成：同一次导出内在内存中去重，
+    跨导出则复用缓存目录中已经烘焙好的图像。目录超过 max_bytes 时按最近使用时间淘汰；
+    max_bytes 为 None 时不淘汰（批量导出的工作进程共用缓存目录，由主进程在最后统一淘汰）。
+    """
+
+    def __init__(self, cache_dir=GRADIENT_CACHE_DIR, max_bytes=GRADIENT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.paths = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def begin_export(self):
+        """开始新的一次导出，清空内存映射和计数。"""
+        self.paths = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def GradientKey(gradient, gradient_type, width, height):
+        knots = sorted([gradient.GetKnot(i) for i in range(gradient.GetKnotCount())], key=lambda k: k["pos"])
+        digest = hashlib.sha1("{}|{}|{}x{}".format(GRADIENT_BAKE_VERSION, gradient_type, width, height).encode("utf-8"))
+        for knot in knots:
+            col = knot["col"]
+            digest.update("|{!r},{!r},{!r},{!r},{!r},{!r},{!r}".format(
+                knot["pos"], col[0], col[1], col[2],
+                knot.get("brightness"), knot.get("bias"), knot.get("interpolation")).encode("utf-8"))
+        return digest.hexdigest()
+
+    def GetImagePath(self, gradient, gradient_type=c4d.SLA_GRADIENT_TYPE_2D_U, width=GRADIENT_RESOLUTION, height=GRADIENT_RESOLUTION):
+        """返回渐变图像路径，只有缓存未命中时才烘焙并写盘。"""
+        key = self.GradientKey(gradient, gradient_type, width, height)
+        path = self.paths.get(key)
+        if path:
+            self.hits += 1
+            return path
+
+        path = os.path.join(self.cache_dir, key + ".jpg")
+        if os.path.exists(path):
+            self.disk_hits += 1
+            os.utime(path, None)  # 刷新使用时间，供LRU淘汰参考
+            self.paths[key] = path
+            return path
+
+        self.misses += 1
+        bmp = GradientToBitmap(gradient, width, height, gradient_type)
+        if bmp is None:
+            return None
+
+        if not os.path.isdir(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError:  # 另一个批量导出进程刚刚创建了它
+                if not os.path.isdir(self.cache_dir):
+                    raise
+        # 先写临时文件再替换，其他进程不会读到写了一半的图像；保留 .jpg 扩展名以免 Save 另加扩展名
+        temp_path = os.path.join(self.cache_dir, "{}.{}.tmp.jpg".format(key, os.getpid()))
+        bmp.Save(temp_path, c4d.FILTER_JPG)
+        os.replace(temp_path, path)
+        self.paths[key] = path
+        return path
+
+    def Evict(self):
+        """按使用时间从旧到新删除缓存文件直到目录大小不超过上限，本次导出引用的文件不会删除。"""
+        if self.max_bytes is None or not os.path.isdir(self.cache_dir):
+            return 0
+
+        in_use = set(self.paths.values())
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                total += stat.st_size
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in in_use:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def Summary(self):
+        return "Gradient cache: {} baked, {} reused in export, {} reused from disk".format(
+            self.misses, self.hits, self.disk_hits)
+
+# 当前导出使用的渐变缓存
+gradient_cache = GradientCache()
+
+def GradientRamp(shader):
+    """
+    渐变着色器的色标数据 {"axis": "u"/"v", "knots": [{"pos", "color", "interpolation"}]}，
+    颜色已乘上亮度。渐变类型无法映射、色标过多或色标的插值方式不同（ColorRamp 只有一个整体的插值方式）时
+    返回 None，由调用方烘焙为图像。
+    """
+    gradient_type = shader[c4d.SLA_GRADIENT_TYPE]
+    axis = None
+    for name, ramp_axis in GRADIENT_RAMP_AXES.items():
+        if gradient_type == getattr(c4d, name):
+            axis = ramp_axis
+    gradient = shader[c4d.SLA_GRADIENT_GRADIENT]
+    if axis is None or gradient is None:
+        return None
+    knot_count = gradient.GetKnotCount()
+    if knot_count == 0 or knot_count > GRADIENT_RAMP_MAX_KNOTS:
+        return None
+    gradient_knots = sorted([gradient.GetKnot(i) for i in range(knot_count)], key=lambda k: k["pos"])
+    if len({GRADIENT_INTERPOLATIONS.get(knot.get("interpolation"), 'LINEAR') for knot in gradient_knots}) > 1:
         return None
 
-    # 替换材质名称中的 '.'
-    material_name = material_name.replace('.', '_')
+    knots = []
+    for knot in gradient_knots:
+        brightness = knot.get("brightness", 1.0)
+        knots.append({
+            "pos": knot["pos"],
+            "color": [knot["col"][j] * brightness for j in range(3)],
+            "interpolation": knot.get("interpolation"),
+        })
+    return {"axis": axis, "knots": knots}
+
+def GradientInfoLines(shader, obj_name, material_name, channel_name):
+    """文本格式中渐变的数据行：能重建为 ColorRamp 时写色标，否则写烘焙图像的路径。"""
+    ramp = GradientRamp(shader)
+    if ramp is not None:
+        return ["Gradient Ramp: {}".format(json.dumps(ramp))]
+    gradient_path = save_gradient_image(shader[c4d.SLA_GRADIENT_GRADIENT], obj_name, material_name, channel_name)
+    if gradient_path:
+        return [f"Gradient Image Path: {gradient_path}"]
+    return []
+
+def save_gradient_image(gradient, obj_name, material_name, channel_name):
+    """通过渐变缓存获取图像路径，相同的渐变只烘焙和保存一次。"""
+    output_path = gradient_cache.GetImagePath(gradient, c4d.SLA_GRADIENT_TYPE_2D_U)  # 假设为2D_U类型渐变
+    if output_path is None:
+        return None
 
-    filename = f"{obj_name}_{material_name}_{channel_name}_gradient.jpg"
-    output_path = os.path.join(os.path.expanduser('~/Documents'), filename)
-    bmp.Save(output_path, c4d.FILTER_JPG)
-    print(f"Saved gradient image to: {output_path}")
+    print(f"Gradient image for {obj_name}/{material_name}/{channel_name}: {output_path}")
     return output_path
 
+def ShaderInput(shader):
+    """着色器的输入节点，目前只跟随 ColorCorrection 的链接。"""
+    if shader.GetName() == "ColorCorrection":
+        link_shader = shader[c4d.COLORCOR_TEXTURE_LNK]
+        if isinstance(link_shader, c4d.BaseShader):
+            return link_shader
+    return None
+
+# 着色器图中出现环时，代替输入结果传给构建函数
+SHADER_CYCLE = object()
+
+class ShaderCache(object):
+    """
+    一次导出内的着色器缓存，按着色器身份（GUID）保存文本和结构化记录。
+    同一个着色器被多个通道或多个材质使用时只读取一次参数；
+    遍历用显式栈代替递归，遇到环时截断并计入 cycles。
+    """
+
+    def __init__(self):
+        self.begin_export()
+
+    def begin_export(self):
+        self.texts = {}
+        self.records = {}
+        self.hits = 0
+        self.misses = 0
+        self.cycles = 0
+
+    def Resolve(self, shader, cache, build):
+        """
+        按后序遍历 shader 及其输入，对每个未缓存的节点调用 build(节点, 输入节点, 输入结果)，
+        输入结果为 SHADER_CYCLE 表示输入形成了环。返回 shader 的结果。
+        """
+        root = MaterialKey(shader)
+        if root in cache:
+            self.hits += 1
+            return cache[root]
+
+        stack = [(shader, None, False)]
+        visiting = set()
+        while stack:
+            node, link, expanded = stack.pop()
+            key = MaterialKey(node)
+            if expanded:
+                visiting.discard(key)
+                result = None
+                if link is not None:
+                    result = cache.get(MaterialKey(link), SHADER_CYCLE)
+                cache[key] = build(node, link, result)
+                self.misses += 1
+            elif key not in cache:
+                link = ShaderInput(node)
+                visiting.add(key)
+                stack.append((node, link, True))
+                if link is not None:
+                    link_key = MaterialKey(link)
+                    if link_key in visiting:
+                        self.cycles += 1
+                        print("Warning: Shader cycle at {} -> {}".format(node.GetName(), link.GetName()))
+                    elif link_key not in cache:
+                        stack.append((link, None, False))
+        return cache[root]
+
+    def Summary(self):
+        return "Shader cache: {} read, {} reused, {} cycles".format(self.misses, self.hits, self.cycles)
+
+shader_cache = ShaderCache()
+
 def GetShaderInfo(shader, obj_name, material_name, channel_name):
     """
     获取节点信息的函数
@@ -79,77 +458,57 @@ def GetShaderInfo(shader, obj_name, material_name, channel_name):
     if not shader:
         return "No shader found."
 
-    shader_info = []
-
-    shader_name = shader.GetName()
-    shader_type = shader.GetType()
-    shader_info.append("Shader Name: {}".format(shader_name))
-    shader_info.append("Shader Type: {}".format(shader_type))
-
-    if shader_type == 1011100:  # 渐变
-        gradient = shader[c4d.SLA_GRADIENT_GRADIENT]
-        shader_info.append("Gradient: {}".format(gradient))
-        gradient_path = save_gradient_image(gradient, obj_name, material_name, channel_name)
-        if gradient_path:
-            shader_info.append(f"Gradient Image Path: {gradient_path}")
-
-    elif shader_type == 5832:  # 颜色
-        color = shader[c4d.COLORSHADER_COLOR]
-        shader_info.append("Color: Vector({}, {}, {})".format(color.x, color.y, color.z))
-
-    elif shader_type == 1029508:  # ImageTexture
-        image_path = shader[c4d.IMAGETEXTURE_FILE]
-        shader_info.append("Image Texture File: {}".format(image_path))
-    
-    elif shader_type == 1029506:  # FloatTexture
-        float_value = shader[c4d.FLOATTEXTURE_VALUE]
-        shader_info.append("Float Texture Value: {}".format(float_value))    
-        
-    elif shader_type == 1029504:  # RgbSpectrum
-        rgb_color = shader[c4d.RGBSPECTRUMSHADER_COLOR]
-        shader_info.append("RGB Spectrum Color: Vector({}, {}, {})".format(rgb_color.x, rgb_color.y, rgb_color.z))    
-
-    # 检查是否为BitmapShader以获取文件名
-    if shader_type == c4d.Xbitmap:
-        file_path = shader[c4d.BITMAPSHADER_FILENAME]
-        shader_info.append("Bitmap Shader File: {}".format(file_path))
-
-    # 检查是否为ColorCorrection类型
-    if shader_name == "ColorCorrection":
-        shader_info.append("Shader is a Color Correction Node.")
-        # 获取Color Correction的链接
-        link_shader = shader[c4d.COLORCOR_TEXTURE_LNK]
-        if isinstance(link_shader, c4d.BaseShader):
-            shader_info.append("Color Correction Link: {}".format(link_shader))
-            # 递归获取链接的Shader信息
-            linked_shader_info = GetShaderInfo(link_shader, obj_name, material_name, "ColorCorrection_Link")
-            shader_info.append(linked_shader_info)
+    def build(shader, link_shader, linked_shader_info):
+        shader_info = []
 
-    # 每个通道信息结束后添加分割符
-    shader_info.append("#####")
+        shader_name = shader.GetName()
+        shader_type = shader.GetType()
+        shader_info.append("Shader Name: {}".format(shader_name))
+        shader_info.append("Shader Type: {}".format(shader_type))
 
-    return "\n".join(shader_info)
+        if shader_type == 1011100:  # 渐变
+            gradient = shader[c4d.SLA_GRADIENT_GRADIENT]
+            shader_info.append("Gradient: {}".format(gradient))
+            shader_info.extend(GradientInfoLines(shader, obj_name, material_name, channel_name))
 
-def GetTextureTagInfo(tag):
-    """
-    获取TextureTag信息的函数
-    """
-    tag_info = []
+        elif shader_type == 5832:  # 颜色
+            color = shader[c4d.COLORSHADER_COLOR]
+            shader_info.append("Color: Vector({}, {}, {})".format(color.x, color.y, color.z))
+
+        elif shader_type == 1029508:  # ImageTexture
+            image_path = shader[c4d.IMAGETEXTURE_FILE]
+            shader_info.append("Image Texture File: {}".format(image_path))
+
+        elif shader_type == 1029506:  # FloatTexture
+            float_value = shader[c4d.FLOATTEXTURE_VALUE]
+            shader_info.append("Float Texture Value: {}".format(float_value))
+
+        elif shader_type == 1029504:  # RgbSpectrum
+            rgb_color = shader[c4d.RGBSPECTRUMSHADER_COLOR]
+            shader_info.append("RGB Spectrum Color: Vector({}, {}, {})".format(rgb_color.x, rgb_color.y, rgb_color.z))
 
-    material = tag.GetMaterial()
-    if material:
-        # 替换材质名称中的 '.'
-        material_name = material.GetName().replace('.', '_')
-        tag_info.append("Material: {}".format(material_name))
+        # 检查是否为BitmapShader以获取文件名
+        if shader_type == c4d.Xbitmap:
+            file_path = shader[c4d.BITMAPSHADER_FILENAME]
+            shader_info.append("Bitmap Shader File: {}".format(file_path))
 
-    tag_info.append("Texture Projection Matrix: {}".format(tag.GetMl()))
-    tag_info.append("Texture Position: {}".format(tag.GetPos()))
-    tag_info.append("Texture Rotation: {}".format(tag.GetRot()))
-    tag_info.append("Texture Scale: {}".format(tag.GetScale()))
+        # 检查是否为ColorCorrection类型
+        if shader_name == "ColorCorrection":
+            shader_info.append("Shader is a Color Correction Node.")
+            # 获取Color Correction的链接，链接节点的信息已由 ShaderCache 先行生成
+            if link_shader is not None:
+                shader_info.append("Color Correction Link: {}".format(link_shader))
+                if linked_shader_info is SHADER_CYCLE:
+                    shader_info.append("Shader Cycle: {}".format(link_shader.GetName()))
+                else:
+                    shader_info.append(linked_shader_info)
 
-    tag_info.append("#####")
+        # 每个通道信息结束后添加分割符
+        shader_info.append("#####")
 
-    return "\n".join(tag_info)
+        return "\n".join(shader_info)
+
+    return shader_cache.Resolve(shader, shader_cache.texts, build)
 
 def GenerateUniqueMaterialName(material_name, used_names):
     """
@@ -172,17 +531,14 @@ def GenerateUniqueMaterialName(material_name, used_names):
     used_names.add(unique_name)
     return unique_name
 
-def GetOctaneMaterialInfo(material, obj_name, used_names):
+def GetOctaneMaterialInfo(material, obj_name, unique_material_name):
     """
     获取Octane材质信息的函数, 并处理发光（Emission）信息以及其他着色器链接
+    unique_material_name 为 GenerateUniqueMaterialName 生成的导出名称
     """
     if not material:
         return "No material found."
 
-    # 生成唯一的材质名称，并替换 '.'
-    original_name = material.GetName()
-    unique_material_name = GenerateUniqueMaterialName(original_name, used_names)
-
     material_info = []
 
     material_info.append("Object Name: {}".format(obj_name))
@@ -243,9 +599,7 @@ def GetOctaneMaterialInfo(material, obj_name, used_names):
         elif diffuse_link.GetType() == 1011100:  # 渐变
             gradient = diffuse_link[c4d.SLA_GRADIENT_GRADIENT]
             material_info.append("Diffuse Gradient (Link): {}".format(gradient))
-            gradient_path = save_gradient_image(gradient, obj_name, unique_material_name, "Diffuse_Gradient")
-            if gradient_path:
-                material_info.append(f"Gradient Image Path: {gradient_path}")
+            material_info.extend(GradientInfoLines(diffuse_link, obj_name, unique_material_name, "Diffuse_Gradient"))
         elif diffuse_link.GetType() == 1029508:  # ImageTexture
             image_path = diffuse_link[c4d.IMAGETEXTURE_FILE]
             material_info.append("Diffuse Image Texture (Link): {}".format(image_path))
@@ -331,39 +685,814 @@ def GetOctaneMaterialInfo(material, obj_name, used_names):
 
     return "\n".join(material_info)
 
-def main():
-    doc = c4d.documents.GetActiveDocument()
-    selected_objects = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN)
+def PlainValue(value):
+    """把C4D参数值转换为可序列化的值：Vector 转为 [x, y, z]，节点转为名称。"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, c4d.Vector):
+        return [value.x, value.y, value.z]
+    if isinstance(value, c4d.BaseList2D):
+        return value.GetName()
+    return str(value)
+
+def GetShaderRecord(shader, obj_name, material_name, channel_name):
+    """
+    获取着色器的结构化记录，ColorCorrection 的输入作为嵌套记录放在 "input" 中。
+    返回的记录由 ShaderCache 共享，调用方不能修改。
+    """
+    def build(shader, link_shader, input_record):
+        shader_name = shader.GetName()
+        shader_type = shader.GetType()
+        record = {"name": shader_name, "type": shader_type}
+
+        if shader_type == 1011100:  # 渐变
+            ramp = GradientRamp(shader)
+            if ramp is not None:
+                record["gradient_ramp"] = ramp
+            else:
+                gradient_path = save_gradient_image(shader[c4d.SLA_GRADIENT_GRADIENT], obj_name, material_name, channel_name)
+                if gradient_path:
+                    record["gradient_image"] = gradient_path
+        elif shader_type == 5832:  # 颜色
+            record["color"] = PlainValue(shader[c4d.COLORSHADER_COLOR])
+        elif shader_type == 1029508:  # ImageTexture
+            record["image"] = PlainValue(shader[c4d.IMAGETEXTURE_FILE])
+        elif shader_type == 1029506:  # FloatTexture
+            record["float"] = PlainValue(shader[c4d.FLOATTEXTURE_VALUE])
+        elif shader_type == 1029504:  # RgbSpectrum
+            record["color"] = PlainValue(shader[c4d.RGBSPECTRUMSHADER_COLOR])
+
+        if shader_type == c4d.Xbitmap:
+            record["image"] = PlainValue(shader[c4d.BITMAPSHADER_FILENAME])
+
+        if link_shader is not None:
+            if input_record is SHADER_CYCLE:
+                record["input"] = {"name": link_shader.GetName(), "type": link_shader.GetType(), "cycle": True}
+            else:
+                record["input"] = input_record
 
-    if not selected_objects:
-        gui.MessageDialog("No objects selected.")
-        return
+        return record
 
-    output_lines = []  # 用于存储输出信息的列表
-    used_names = set()  # 用于存储已使用的材质名称
+    return shader_cache.Resolve(shader, shader_cache.records, build)
 
-    for obj in selected_objects:
+def ShaderReferences(record, emitted, write):
+    """
+    返回 record 的副本，其中的着色器链接替换为 {"ref": id}。还没输出过的着色器先由 write
+    写成单独的 {"kind": "shader", "id": ...} 记录（输入在前），输入同样写成引用，
+    因此任何记录都不会嵌套，链再深也不需要递归。
+    emitted 为 id(着色器记录) -> 引用号，由写入器在整个文件内保存。
+    """
+    def reference(shader_record):
+        chain = []
+        node = shader_record
+        while isinstance(node, dict) and id(node) not in emitted and not node.get("cycle"):
+            chain.append(node)
+            node = node.get("input")
+        for node in reversed(chain):
+            ref = emitted[id(node)] = len(emitted) + 1
+            out = dict(node, kind="shader", id=ref)
+            link = node.get("input")
+            if link is not None and not link.get("cycle"):
+                out["input"] = {"ref": emitted[id(link)]}
+            write(out)
+        if shader_record.get("cycle"):
+            return shader_record
+        return {"ref": emitted[id(shader_record)]}
+
+    record = dict(record)
+    record["channels"] = dict(record["channels"])
+    for channel, data in record["channels"].items():
+        if "link" in data:
+            record["channels"][channel] = dict(data, link=reference(data["link"]))
+    if "link" in record["emission"]:
+        record["emission"] = dict(record["emission"], link=reference(record["emission"]["link"]))
+    return record
+
+def GetOctaneMaterialRecord(material, obj_name, unique_material_name):
+    """
+    获取Octane材质的结构化记录（结构化导出格式使用），数值保存为真正的浮点数
+    """
+    mat_type = material[c4d.OCT_MATERIAL_TYPE]
+    record = {
+        "kind": "material",
+        "name": unique_material_name,
+        "object": obj_name,
+        "parent": material.GetUp().GetName() if material.GetUp() else None,
+        "type": mat_type,
+        "type_name": OCTANE_MATERIAL_TYPES.get(mat_type, "Unknown"),
+    }
+
+    use_emission = material[c4d.OCT_MAT_USE_EMISSION]
+    emission = {"enabled": PlainValue(use_emission)}
+    if use_emission:
+        emission_shader = material[c4d.OCT_MATERIAL_EMISSION]
+        if isinstance(emission_shader, c4d.BaseShader):
+            emission["shader"] = emission_shader.GetName()
+            if emission_shader.GetType() == 1029641:  # Blackbody Emission
+                emission["mode"] = "blackbody"
+                efficiency_or_tex = emission_shader[c4d.BBEMISSION_EFFIC_OR_TEX]
+                channel = "Blackbody_Emission"
+            elif emission_shader.GetType() == 1029642:  # Texture Emission
+                emission["mode"] = "texture"
+                efficiency_or_tex = emission_shader[c4d.TEXEMISSION_EFFIC_OR_TEX]
+                channel = "Texture_Emission"
+            else:
+                efficiency_or_tex = None
+            if isinstance(efficiency_or_tex, c4d.BaseShader):
+                emission["link"] = GetShaderRecord(efficiency_or_tex, obj_name, unique_material_name, channel)
+            elif efficiency_or_tex is not None:
+                emission["efficiency"] = PlainValue(efficiency_or_tex)
+    record["emission"] = emission
+
+    channels = {}
+    for channel, use_param, link_param, color_param, float_param in MATERIAL_CHANNELS:
+        data = {"use": PlainValue(material[getattr(c4d, use_param)])}
+        if link_param:
+            link = material[getattr(c4d, link_param)]
+            if isinstance(link, c4d.BaseShader):
+                data["link"] = GetShaderRecord(link, obj_name, unique_material_name, channel)
+        if color_param:
+            color = material[getattr(c4d, color_param)]
+            if isinstance(color, c4d.Vector):
+                data["color"] = PlainValue(color)
+        if float_param:
+            data["float"] = PlainValue(material[getattr(c4d, float_param)])
+        channels[channel] = data
+    record["channels"] = channels
+
+    # Universal材质类型的特定信息
+    if mat_type == 2516:
+        record["universal"] = {
+            "specular_map_float": PlainValue(material[c4d.OCT_MAT_SPECULAR_MAP_FLOAT]),
+            "specular_float": PlainValue(material[c4d.OCT_MATERIAL_SPECULAR_FLOAT]),
+            "parameter_2639": PlainValue(material[2639]),
+            "index": PlainValue(material[c4d.OCT_MATERIAL_INDEX]),
+        }
+
+    return record
+
+def ExportHeader():
+    return {"format": EXPORT_FORMAT_NAME, "version": EXPORT_FORMAT_VERSION}
+
+def EncodeVarint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+class BinaryRecordEncoder(object):
+    """
+    紧凑二进制编码：每个值前有一个类型字节，字符串第一次出现后只写索引。
+    记录以 varint 长度为前缀，必须按顺序解码。
+    """
+
+    def __init__(self):
+        self.strings = {}
+
+    def Encode(self, value):
+        payload = bytearray()
+        self._Encode(value, payload)
+        out = bytearray()
+        EncodeVarint(len(payload), out)
+        out += payload
+        return bytes(out)
+
+    def _Encode(self, value, out):
+        if value is None:
+            out += b"N"
+        elif value is True:
+            out += b"T"
+        elif value is False:
+            out += b"F"
+        elif isinstance(value, int):
+            out += b"i"
+            out += struct.pack("<q", value)
+        elif isinstance(value, float):
+            out += b"d"
+            out += struct.pack("<d", value)
+        elif isinstance(value, str):
+            index = self.strings.get(value)
+            if index is not None:
+                out += b"r"
+                EncodeVarint(index, out)
+            else:
+                self.strings[value] = len(self.strings)
+                data = value.encode("utf-8")
+                out += b"s"
+                EncodeVarint(len(data), out)
+                out += data
+        elif isinstance(value, (list, tuple)):
+            out += b"l"
+            EncodeVarint(len(value), out)
+            for item in value:
+                self._Encode(item, out)
+        elif isinstance(value, dict):
+            out += b"m"
+            EncodeVarint(len(value), out)
+            for key, item in value.items():
+                self._Encode(str(key), out)
+                self._Encode(item, out)
+        else:
+            self._Encode(str(value), out)
+
+class TextExportWriter(object):
+    """旧的文本格式，内容与以前的 "\n".join(output_lines) 完全相同。"""
+    binary = False
+
+    def __init__(self, file):
+        self.file = file
+        self.first = True
+
+    def _Write(self, text):
+        if not self.first:
+            self.file.write("\n")
+        self.file.write(text)
+        self.first = False
+
+    def WriteMaterial(self, material, obj_name, material_name):
+        self._Write(GetOctaneMaterialInfo(material, obj_name, material_name))
+
+    def WriteNote(self, text):
+        self._Write(text)
+
+    def WriteAssignments(self, assignments):
+        # 文本格式没有对象ID，导入端把连续的同名行当作一个对象
+        lines = ["Material Assignments:"]
+        for obj_name, material_name, _ in assignments:
+            lines.append("Assignment: {} -> {}".format(obj_name, material_name))
+        lines.append("#####")
+        self._Write("\n".join(lines))
+
+class JsonLinesExportWriter(object):
+    """JSON Lines：第一行是带版本号的文件头，之后每行一个记录。"""
+    binary = False
+
+    def __init__(self, file):
+        self.file = file
+        self.shader_ids = {}  # 共享的着色器记录在文件中只完整写一次
+        self._Write(ExportHeader())
+
+    def _Write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self.file.write("\n")
+
+    def WriteMaterial(self, material, obj_name, material_name):
+        record = GetOctaneMaterialRecord(material, obj_name, material_name)
+        self._Write(ShaderReferences(record, self.shader_ids, self._Write))
+
+    def WriteNote(self, text):
+        self._Write({"kind": "note", "text": text})
+
+    def WriteAssignments(self, assignments):
+        for obj_name, material_name, obj_id in assignments:
+            self._Write({"kind": "assignment", "object": obj_name, "material": material_name, "object_id": obj_id})
+
+class BinaryExportWriter(JsonLinesExportWriter):
+    """与 JSON Lines 相同的记录，使用 BinaryRecordEncoder 编码，文件以 BINARY_MAGIC 开头。"""
+    binary = True
+
+    def __init__(self, file):
+        self.encoder = BinaryRecordEncoder()
+        file.write(BINARY_MAGIC)
+        super(BinaryExportWriter, self).__init__(file)
+
+    def _Write(self, record):
+        self.file.write(self.encoder.Encode(record))
+
+EXPORT_WRITERS = {
+    "jsonl": JsonLinesExportWriter,
+    "binary": BinaryExportWriter,
+    "text": TextExportWriter,
+}
+
+def MaterialKey(material):
+    """材质的身份键，同一个材质被多个对象使用时返回相同的值。"""
+    try:
+        return material.GetGUID()
+    except AttributeError:
+        return material
+
+def IterObjectMaterials(objects, used_names):
+    """
+    遍历对象上的材质标签，每个Octane材质只产出一次，名称在 used_names 中保持唯一。
+    产出 ("material", 身份键, 对象名, 材质, 材质名)、("assignment", 对象名, 材质名, 对象ID) 和 ("note", 文本)。
+    对象ID 是对象在这次导出中的序号，导入端用它区分同名的对象。
+    """
+    exported = {}  # 材质身份键 -> 导出的材质名称
+    for obj_id, obj in enumerate(objects):
+        obj_name = obj.GetName()
         mat_tags = [tag for tag in obj.GetTags() if isinstance(tag, c4d.TextureTag)]
 
         if not mat_tags:
-            output_lines.append("No material tags found on object: {}".format(obj.GetName()))
+            yield "note", "No material tags found on object: {}".format(obj_name)
             continue
 
         for tag in mat_tags:
             material = tag.GetMaterial()
             if material and material.GetType() == OCTANE_MATERIAL_TYPE_ID:
-                texture_tag_info = GetTextureTagInfo(tag)
-                output_lines.append(texture_tag_info)
+                key = MaterialKey(material)
+                material_name = exported.get(key)
+                if material_name is None:
+                    material_name = GenerateUniqueMaterialName(material.GetName(), used_names)
+                    exported[key] = material_name
+                    yield "material", key, obj_name, material, material_name
+                yield "assignment", obj_name, material_name, obj_id
+            else:
+                yield "note", "No Octane material found on tag: {}".format(tag.GetName())
+
+def ObjectMatches(obj, doc, layers=None, object_types=None):
+    """对象是否通过层名称和对象类型过滤；过滤条件为 None 时不限制。"""
+    if object_types is not None and obj.GetType() not in object_types:
+        return False
+    if layers is not None:
+        layer = obj.GetLayerObject(doc)
+        if layer is None or layer.GetName() not in layers:
+            return False
+    return True
+
+def IterDocumentObjects(doc, layers=None, object_types=None):
+    """
+    按层级顺序（先子对象后兄弟对象）遍历文档中的全部对象，用显式栈代替递归，
+    不需要先选中对象，也不会生成完整的对象列表。只产出通过过滤的对象，但总会进入它们的子对象。
+    """
+    stack = []
+    obj = doc.GetFirstObject()
+    while obj is not None:
+        if ObjectMatches(obj, doc, layers, object_types):
+            yield obj
+        down = obj.GetDown()
+        if down is not None:
+            next_obj = obj.GetNext()
+            if next_obj is not None:
+                stack.append(next_obj)
+            obj = down
+        else:
+            obj = obj.GetNext()
+            if obj is None and stack:
+                obj = stack.pop()
+
+def IterDocumentMaterials(doc, used_names, layers=None, object_types=None):
+    """
+    整个文档的导出：遍历层级一次，每个材质在第一次被使用时命名并记下使用它的对象，
+    对应关系随遍历产出；之后按 doc.GetMaterials() 的顺序产出材质。
+    每个对象、标签和材质都只访问一次。没有过滤条件时导出文档中所有Octane材质（未使用的也导出），
+    否则只导出被匹配对象使用的材质。产出的项与 IterObjectMaterials 相同（不产出 note）。
+    """
+    names = {}  # 材质身份键 -> (导出的材质名称, 第一个使用它的对象名)
+    for obj_id, obj in enumerate(IterDocumentObjects(doc, layers, object_types)):
+        obj_name = obj.GetName()
+        for tag in obj.GetTags():
+            if not isinstance(tag, c4d.TextureTag):
+                continue
+            material = tag.GetMaterial()
+            if material and material.GetType() == OCTANE_MATERIAL_TYPE_ID:
+                key = MaterialKey(material)
+                if key not in names:
+                    names[key] = (GenerateUniqueMaterialName(material.GetName(), used_names), obj_name)
+                yield "assignment", obj_name, names[key][0], obj_id
+
+    export_all = layers is None and object_types is None
+    for material in doc.GetMaterials():
+        if material.GetType() != OCTANE_MATERIAL_TYPE_ID:
+            continue
+        key = MaterialKey(material)
+        if key not in names:
+            if not export_all:
+                continue
+            names[key] = (GenerateUniqueMaterialName(material.GetName(), used_names), "")
+        material_name, obj_name = names[key]
+        yield "material", key, obj_name, material, material_name
+
+def CurrentUmask():
+    """当前进程的 umask，只能设置后再恢复来读取。"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+@contextlib.contextmanager
+def AtomicExportFile(output_path, binary, compression=None):
+    """
+    打开带缓冲的导出文件，可选 gzip / zstd 压缩。内容先写到同目录的临时文件，
+    成功后用 os.replace 换成 output_path，导入端不会读到写了一半的文件；出错时删除临时文件。
+    导出文件的权限与直接 open 创建的一样按 umask 设置，而不是 mkstemp 的 0600。
+    """
+    if compression not in (None, "gzip", "zstd"):
+        raise ValueError("Unknown export compression: {}".format(compression))
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard module")
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".omat_", suffix=".tmp", dir=directory)
+    raw = stream = io.open(fd, "wb", buffering=EXPORT_BUFFER_SIZE)
+    try:
+        if compression == "gzip":
+            stream = gzip.GzipFile(fileobj=stream, mode="wb", compresslevel=6, mtime=0)
+        elif compression == "zstd":
+            stream = zstandard.ZstdCompressor().stream_writer(stream)
+        if not binary:
+            stream = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        with stream:
+            yield stream
+        raw.close()  # GzipFile 不关闭传入的 fileobj
+        os.chmod(temp_path, 0o666 & ~CurrentUmask())
+        os.replace(temp_path, output_path)
+    except BaseException:
+        stream.close()
+        raw.close()
+        os.remove(temp_path)
+        raise
+
+def WriteExport(items, output_path, export_format, compression=None):
+    """把 IterObjectMaterials / IterDocumentMaterials 产出的项写入 output_path，见 AtomicExportFile。"""
+    writer_class = EXPORT_WRITERS[export_format]
+    exported = 0
+    assignments = []  # (对象名称, 材质名称, 对象ID)
+    gradient_cache.begin_export()
+    shader_cache.begin_export()
+
+    with AtomicExportFile(output_path, writer_class.binary, compression) as file:
+        writer = writer_class(file)
+        for item in items:
+            if item[0] == "material":
+                _, _, obj_name, material, material_name = item
+                writer.WriteMaterial(material, obj_name, material_name)
+                exported += 1
+            elif item[0] == "assignment":
+                assignments.append(item[1:])
+            else:
+                writer.WriteNote(item[1])
+
+        writer.WriteAssignments(assignments)
+
+    gradient_cache.Evict()
+    print(gradient_cache.Summary())
+    print(shader_cache.Summary())
+    print("Exported {} unique materials for {} assignments to: {}".format(exported, len(assignments), output_path))
+    return exported, len(assignments)
+
+def ExportMaterials(objects, output_path, export_format=EXPORT_FORMAT, compression=None):
+    """
+    导出对象上的Octane材质。每个材质只序列化一次，
+    对象与材质的对应关系写在文件末尾（文本格式为 "Material Assignments:" 段）。
+    export_format 为 EXPORT_WRITERS 中的一种，compression 为 None、"gzip" 或 "zstd"。
+    """
+    items = IterObjectMaterials(objects, set())
+    return WriteExport(items, output_path, export_format, compression)
+
+def ExportDocument(doc, output_path, export_format=EXPORT_FORMAT, layers=None, object_types=None, compression=None):
+    """
+    导出整个文档，不依赖选择。layers 为层名称集合，object_types 为对象类型ID集合，
+    用于只导出部分对象的材质。
+    """
+    items = IterDocumentMaterials(doc, set(), layers, object_types)
+    return WriteExport(items, output_path, export_format, compression)
+
+def RecordDigest(record):
+    return hashlib.sha1(json.dumps(record, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def MaterialDirty(material):
+    """材质和它的着色器分支的数据修改计数之和，任何参数修改都会让它变大；着色器的修改不一定计入材质本身。"""
+    dirty = material.GetDirty(c4d.DIRTYFLAGS_DATA)
+    stack = [material.GetFirstShader()]
+    while stack:
+        shader = stack.pop()
+        while shader is not None:
+            dirty += shader.GetDirty(c4d.DIRTYFLAGS_DATA)
+            stack.append(shader.GetDown())
+            shader = shader.GetNext()
+    return dirty
+
+class LiveLinkSender(object):
+    """
+    通过本机TCP把有变化的材质记录推送给Blender端的Live Link监听器（Blender_Omat.LiveLinkServer）。
+    协议为JSON Lines：连接后Blender先发一行问候（格式、版本和会话ID），
+    这边发送文件头和材质记录后关闭写端，Blender回复一行确认。
+    每个材质上次发送的记录摘要按会话ID保存在 state_path，Blender重启后会话ID改变，全部重新发送。
+    材质的修改计数（MaterialDirty）和名称都没变时沿用上次的记录和摘要，不重新读取参数。
+    """
+
+    def __init__(self, host=None, port=None, state_path=None, timeout=LIVE_LINK_TIMEOUT):
+        self.host = host or LIVE_LINK_HOST
+        self.port = port or LIVE_LINK_PORT
+        self.state_path = state_path or LIVE_LINK_STATE_PATH
+        self.timeout = timeout
+        self.records = {}  # 身份键 -> (修改计数, 对象名, 材质名, 记录, 摘要)
+        self.pushed = None  # 上次成功推送时的 {身份键: 摘要}
+
+    def LoadState(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def SaveState(self, state):
+        directory = os.path.dirname(self.state_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(self.state_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+
+    def CollectRecords(self, objects):
+        """
+        返回 [(身份键, 材质记录, 记录摘要)]，与文件导出使用相同的去重和命名规则。
+        共享的着色器不替换为引用：每条记录都可能单独发送，必须能单独应用。
+        """
+        gradient_cache.begin_export()
+        shader_cache.begin_export()
+        cached, self.records = self.records, {}
+        records = []
+        for item in IterObjectMaterials(objects, set()):
+            if item[0] == "material":
+                _, key, obj_name, material, material_name = item
+                key = str(key)
+                dirty = MaterialDirty(material)
+                entry = cached.get(key)
+                if entry is None or entry[:3] != (dirty, obj_name, material_name):
+                    record = GetOctaneMaterialRecord(material, obj_name, material_name)
+                    entry = (dirty, obj_name, material_name, record, RecordDigest(record))
+                self.records[key] = entry
+                records.append((key, entry[3], entry[4]))
+        return records
+
+    def Push(self, objects):
+        """
+        发送有变化的材质，返回 (发送的数量, 材质总数)。连接失败时抛出 socket.error。
+        上次成功推送后没有材质变化时不连接Blender；Blender在此期间重启的话，下一次修改时全部重新发送。
+        """
+        records = self.CollectRecords(objects)
+        current = {key: digest for key, _, digest in records}
+        if current == self.pushed:
+            return 0, len(records)
+        conn = socket.create_connection((self.host, self.port), self.timeout)
+        try:
+            file = conn.makefile("rwb")
+            hello = json.loads(file.readline().decode("utf-8") or "{}")
+            if hello.get("format") != EXPORT_FORMAT_NAME:
+                raise ValueError("Not an Octane material live link on port {}".format(self.port))
+
+            state = self.LoadState()
+            digests = state.get("digests", {}) if state.get("session") == hello.get("session") else {}
+            changed = []
+            for key, record, digest in records:
+                if digests.get(key) != digest:
+                    changed.append(record)
+                    digests[key] = digest
+
+            for record in [ExportHeader()] + changed:
+                file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                file.write(b"\n")
+            file.flush()
+            conn.shutdown(socket.SHUT_WR)
+
+            ack = json.loads(file.readline().decode("utf-8") or "{}")
+            if "error" in ack:
+                raise ValueError("Live link rejected the update: {}".format(ack["error"]))
+        finally:
+            conn.close()
+
+        self.SaveState({"session": hello.get("session"), "digests": digests})
+        self.pushed = current
+        return len(changed), len(records)
+
+class LiveLinkMessage(c4d.plugins.MessageData):
+    """
+    作为插件载入时注册的消息插件：文档修改（EVMSG_CHANGE）后，在下一次计时器消息中推送有变化的材质，
+    连续的修改合并为一次推送。推送失败只提示一次，直到再次成功。
+    """
 
-                material_info = GetOctaneMaterialInfo(material, obj.GetName(), used_names)
-                output_lines.append(material_info)
+    def __init__(self, sender=None):
+        self.sender = sender or LiveLinkSender()
+        self.pending = True  # 启动后先推送一次
+        self.failed = False
+
+    def GetTimer(self):
+        return LIVE_LINK_INTERVAL
+
+    def CoreMessage(self, id, bc):
+        if id == c4d.EVMSG_CHANGE:
+            self.pending = True
+        elif id == c4d.MSG_TIMER and self.pending:
+            self.pending = False
+            self.Push()
+        return True
+
+    def Push(self):
+        objects = ExportObjects(c4d.documents.GetActiveDocument())
+        try:
+            sent, total = self.sender.Push(objects)
+        except (socket.error, ValueError) as e:
+            if not self.failed:
+                print("Live link to Blender failed: {}".format(e))
+            self.failed = True
+            return
+        self.failed = False
+        if sent:
+            print("Live link: sent {} of {} materials ({} unchanged)".format(sent, total, total - sent))
+
+def RegisterLiveLink():
+    """注册 LiveLinkMessage；C4D只在启动载入插件时接受注册。"""
+    return c4d.plugins.RegisterMessagePlugin(id=LIVE_LINK_PLUGIN_ID, str="Octane Material Live Link",
+                                             info=0, dat=LiveLinkMessage())
+
+def ExportDocumentFile(input_path, output_path, export_format=EXPORT_FORMAT, compression=None,
+                       layers=None, object_types=None):
+    """
+    无界面地载入一个 .c4d 文件，导出整个文档后释放它，返回 (材质数, 对应数)。
+    载入时不允许对话框（不带 SCENEFILTER_DIALOGSALLOWED）；载入失败时抛出 IOError。
+    """
+    doc = c4d.documents.LoadDocument(input_path, c4d.SCENEFILTER_OBJECTS | c4d.SCENEFILTER_MATERIALS)
+    if doc is None:
+        raise IOError("Could not load document: {}".format(input_path))
+    try:
+        return ExportDocument(doc, output_path, export_format, layers, object_types, compression)
+    finally:
+        c4d.documents.KillDocument(doc)
+
+def FindDocuments(paths):
+    """参数中的文件原样保留，目录递归查找 .c4d 文件；返回 [(文档, 相对于参数目录的路径)]。"""
+    found = []
+    for path in paths:
+        if not os.path.isdir(path):
+            found.append((path, os.path.basename(path)))
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.lower().endswith(BATCH_DOCUMENT_EXTENSION):
+                    file_path = os.path.join(dirpath, name)
+                    found.append((file_path, os.path.relpath(file_path, path)))
+    return found
+
+def BatchOutputPath(input_path, relative_path, output_dir=None, export_format=EXPORT_FORMAT, compression=None):
+    """文档的导出文件：与文档同名，写在文档旁边，或 output_dir 中与文档相同的相对位置。"""
+    if output_dir is not None:
+        input_path = os.path.join(output_dir, relative_path)
+    extension = os.path.splitext(EXPORT_FILE_NAMES[export_format])[1]
+    return os.path.splitext(input_path)[0] + extension + COMPRESSION_SUFFIXES.get(compression, "")
+
+class BatchJob(object):
+    """一个正在导出的文档：工作进程、它的输出（写到临时文件，避免管道写满而阻塞）和开始时间。"""
+
+    def __init__(self, input_path, output_path, command):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.log = tempfile.TemporaryFile()
+        self.start = time.time()
+        self.process = subprocess.Popen(command, stdout=self.log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+
+    def Output(self):
+        self.log.seek(0)
+        output = self.log.read().decode("utf-8", "replace")
+        self.log.close()
+        return output
+
+    def Result(self):
+        """进程结束后返回 (结果字典, None) 或 (None, 失败原因)。"""
+        output = self.Output()
+        lines = [line for line in output.splitlines() if line.strip()]
+        for line in reversed(lines):
+            if line.startswith(BATCH_RESULT_PREFIX):
+                if self.process.returncode == 0:
+                    return json.loads(line[len(BATCH_RESULT_PREFIX):]), None
+                break
+        reason = lines[-1] if lines else "no output"
+        return None, "exit code {}: {}".format(self.process.returncode, reason)
+
+    def Kill(self):
+        self.process.kill()
+        self.process.wait()
+        self.Output()
+
+def BatchExport(paths, output_dir=None, workers=BATCH_WORKERS, timeout=BATCH_TIMEOUT, export_format=EXPORT_FORMAT,
+                compression=None, executable=None):
+    """
+    把多个 .c4d 文档分别导出到各自的文件。每个文档由一个工作进程（executable，默认当前解释器，
+    即 c4dpy）运行本脚本的 --worker 模式处理，同时最多 workers 个；超过 timeout 秒的进程被终止。
+    导出是原子的，失败或超时的文档不会留下或破坏导出文件。不弹出任何对话框。
+    返回 (成功 {文档: (导出文件, 材质数, 对应数)}, 失败 {文档: 原因})。
+    """
+    pending = []
+    for input_path, relative_path in FindDocuments(paths):
+        output_path = BatchOutputPath(input_path, relative_path, output_dir, export_format, compression)
+        directory = os.path.dirname(os.path.abspath(output_path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        pending.append((input_path, output_path))
+    pending.reverse()
+
+    base_command = [executable or sys.executable, os.path.abspath(__file__), "--format", export_format]
+    if compression:
+        base_command += ["--compression", compression]
+    exported = {}
+    failed = {}
+    running = []
+    while pending or running:
+        while pending and len(running) < max(1, workers):
+            input_path, output_path = pending.pop()
+            running.append(BatchJob(input_path, output_path, base_command + ["--worker", input_path, output_path]))
+
+        time.sleep(BATCH_POLL)
+        for job in list(running):
+            if job.process.poll() is None:
+                if time.time() - job.start < timeout:
+                    continue
+                job.Kill()
+                failed[job.input_path] = "timed out after {:.0f}s".format(timeout)
             else:
-                output_lines.append("No Octane material found on tag: {}".format(tag.GetName()))
+                result, error = job.Result()
+                if error is None:
+                    exported[job.input_path] = (job.output_path, result["materials"], result["assignments"])
+                    print("Exported {} -> {} ({} materials, {} assignments) in {:.1f}s".format(
+                        job.input_path, job.output_path, result["materials"], result["assignments"],
+                        time.time() - job.start))
+                else:
+                    failed[job.input_path] = error
+            if job.input_path in failed:
+                print("Failed: {}: {}".format(job.input_path, failed[job.input_path]))
+            running.remove(job)
+
+    # 工作进程不淘汰渐变缓存，全部结束后统一淘汰一次
+    GradientCache().Evict()
+    return exported, failed
+
+def BatchMain(argv=None):
+    """c4dpy 命令行入口：批量导出文档，返回进程退出码（有失败时为1）。--worker 为单个文档的工作进程模式。"""
+    parser = argparse.ArgumentParser(
+        prog="c4dpy Cinema_Omat.py",
+        description="Export the Octane materials of many Cinema 4D documents, each to its own file")
+    parser.add_argument("paths", nargs="*", help=".c4d files, or folders searched recursively for them")
+    parser.add_argument("-o", "--output-dir", help="write exports here instead of next to each document")
+    parser.add_argument("-j", "--workers", type=int, default=BATCH_WORKERS, help="documents exported at once")
+    parser.add_argument("--timeout", type=float, default=BATCH_TIMEOUT, help="seconds allowed per document")
+    parser.add_argument("--format", default=EXPORT_FORMAT, choices=sorted(EXPORT_WRITERS))
+    parser.add_argument("--compression", default=EXPORT_COMPRESSION, choices=sorted(COMPRESSION_SUFFIXES))
+    parser.add_argument("--c4dpy", help="interpreter that runs the workers (default: this one)")
+    parser.add_argument("--worker", nargs=2, metavar=("DOCUMENT", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    layers = set(EXPORT_LAYERS) if EXPORT_LAYERS is not None else None
+    object_types = set(EXPORT_OBJECT_TYPES) if EXPORT_OBJECT_TYPES is not None else None
+    if args.worker:
+        global gradient_cache
+        gradient_cache = GradientCache(max_bytes=None)
+        materials, assignments = ExportDocumentFile(args.worker[0], args.worker[1], args.format, args.compression,
+                                                    layers, object_types)
+        print(BATCH_RESULT_PREFIX + json.dumps({"materials": materials, "assignments": assignments}))
+        return 0
+    if not args.paths:
+        parser.error("no documents given")
+
+    start = time.time()
+    exported, failed = BatchExport(args.paths, args.output_dir, args.workers, args.timeout, args.format,
+                                   args.compression, args.c4dpy)
+    print("{} documents exported, {} failed in {:.1f}s".format(len(exported), len(failed), time.time() - start))
+    for input_path in sorted(failed):
+        print("    {}: {}".format(input_path, failed[input_path]))
+    return 1 if failed else 0
+
+def ExportObjects(doc):
+    """按 EXPORT_SCOPE、EXPORT_LAYERS 和 EXPORT_OBJECT_TYPES 返回要导出的对象。"""
+    layers = set(EXPORT_LAYERS) if EXPORT_LAYERS is not None else None
+    object_types = set(EXPORT_OBJECT_TYPES) if EXPORT_OBJECT_TYPES is not None else None
+    if EXPORT_SCOPE == "document":
+        return IterDocumentObjects(doc, layers, object_types)
+    objects = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN)
+    return [obj for obj in objects if ObjectMatches(obj, doc, layers, object_types)]
 
-    # 将输出信息写入文本文件
-    output_path = os.path.join(os.path.expanduser('~/Documents'), "octane_material_info.txt")
-    with open(output_path, "w", encoding="utf-8") as file:
-        file.write("\n".join(output_lines))
+def main():
+    doc = c4d.documents.GetActiveDocument()
+    layers = set(EXPORT_LAYERS) if EXPORT_LAYERS is not None else None
+    object_types = set(EXPORT_OBJECT_TYPES) if EXPORT_OBJECT_TYPES is not None else None
+
+    objects = ExportObjects(doc)
+    if EXPORT_SCOPE != "document" and not objects:
+        gui.MessageDialog("No objects selected.")
+        return
+
+    if LIVE_LINK:
+        try:
+            sent, total = LiveLinkSender().Push(objects)
+        except (socket.error, ValueError) as e:
+            gui.MessageDialog("Live link to Blender failed: {}".format(e))
+            return
+        print("Live link: sent {} of {} materials ({} unchanged)".format(sent, total, total - sent))
+        return
+
+    if not os.path.isdir(EXPORT_DIR):
+        os.makedirs(EXPORT_DIR)
+    output_path = os.path.join(EXPORT_DIR, EXPORT_FILE_NAMES[EXPORT_FORMAT])
+    output_path += COMPRESSION_SUFFIXES.get(EXPORT_COMPRESSION, "")
+    if EXPORT_SCOPE == "document":
+        ExportDocument(doc, output_path, EXPORT_FORMAT, layers, object_types, EXPORT_COMPRESSION)
+    else:
+        ExportMaterials(objects, output_path, EXPORT_FORMAT, EXPORT_COMPRESSION)
 
 if __name__ == '__main__':
-    main()
+    if len(getattr(sys, "argv", ())) > 1:  # c4dpy 带参数运行：批量导出，不使用活动文档
+        sys.exit(BatchMain(sys.argv[1:]))
+    if __file__.lower().endswith(".pyp"):  # 作为插件在C4D启动时载入
+        if LIVE_LINK:
+            RegisterLiveLink()
+    else:
+        main()
@@ -0,0 +1,11 @@
+"""让基准脚本能导入仓库根目录的插件脚本和 standins 下的替身模块。"""
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+STANDINS_DIR = os.path.join(BENCH_DIR, "standins")
+
+for _path in (REPO_DIR, STANDINS_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
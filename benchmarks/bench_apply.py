@@ -0,0 +1,94 @@
+"""
+apply_material_properties 基准：原型复制（模板）与逐个节点构建的对比，使用 bpy 替身。
+
+    python benchmarks/bench_apply.py [--materials 2000] [--latency-us 20]
+
+--latency-us 为每次RNA调用（nodes.new、links.new、default_value 赋值等）模拟的开销，
+用来近似Blender中Python调用RNA的成本。两种方式生成的节点树会逐一比对。
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+
+
+def snapshot(mat):
+    """材质节点树的可比较摘要：节点、连线、输入默认值和图像。"""
+    tree = mat.node_tree
+    nodes = sorted(
+        (node.name, node.type, tuple(map(repr, node.location)),
+         node.image.filepath if node.image else None,
+         tuple(repr(socket.default_value) for socket in node.inputs))
+        for node in tree.nodes)
+    links = sorted((l.from_node.name, l.from_socket.name, l.to_node.name, l.to_socket.name) for l in tree.links)
+    return nodes, links, mat.blend_method
+
+
+def apply(materials, use_templates):
+    bpy.reset()
+    session = Blender_Omat.ImportSession(use_templates=use_templates)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        Blender_Omat.apply_material_properties(materials, "", session)
+    elapsed = time.perf_counter() - start
+    calls = dict(bpy.call_counts)
+    snapshots = {mat.name: snapshot(mat) for mat in bpy.data.materials}
+    return elapsed, calls, snapshots
+
+
+def run(materials=2000, latency_us=20.0, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_apply_")
+    texture_dir = os.path.join(workdir, "textures")
+    os.makedirs(texture_dir)
+    for i in range(50):
+        open(os.path.join(texture_dir, "tex_{:05d}.png".format(i)), "wb").close()
+
+    path = os.path.join(workdir, "octane_material_info.jsonl")
+    synthetic.write_export(path, materials, export_format="jsonl", texture_dir=texture_dir, texture_pool=50,
+                           cache_dir=os.path.join(workdir, "gradients"))
+    parsed = Blender_Omat.parse_material_info(path)
+
+    bpy.set_call_latency(latency_us / 1e6)
+    try:
+        per_node_s, per_node_calls, per_node = apply(parsed, use_templates=False)
+        template_s, template_calls, templated = apply(parsed, use_templates=True)
+    finally:
+        bpy.set_call_latency(0.0)
+
+    if per_node != templated:
+        raise AssertionError("template copies differ from per-node construction")
+
+    return {
+        "materials": len(parsed),
+        "shapes": len(set(map(Blender_Omat.material_shape, Blender_Omat.plan_materials(parsed)))),
+        "per_node_s": per_node_s,
+        "template_s": template_s,
+        "per_node_calls": per_node_calls,
+        "template_calls": template_calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    parser.add_argument("--latency-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.latency_us)
+    print("{materials} materials, {shapes} node shapes, identical node trees".format(**result))
+    for name in ("per_node", "template"):
+        calls = result[name + "_calls"]
+        print("  {:<9} {:7.2f}s  nodes.new={:<6} links.new={:<6} material.copy={:<6} default_value={}".format(
+            name, result[name + "_s"], calls.get("nodes.new", 0), calls.get("links.new", 0),
+            calls.get("material.copy", 0), calls.get("socket.default_value", 0)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+对象材质分配基准：把导出中的对象-材质对应关系写到 bpy 替身的材质槽上。
+
+    python benchmarks/bench_assign.py [--objects 50000] [--materials 500] [--latency-us 20]
+
+场景中一部分对象被Blender改名（加 .001 后缀、改大小写和分隔符），一部分已经有材质槽。
+对比逐条 bpy.data.objects.get + 追加槽的写法与 Blender_Omat.ObjectAssigner：
+记录耗时、RNA调用次数（按名称查找也算一次）、找不到的对象，以及再导入一次后是否产生重复的槽。
+模拟了RNA开销时（--latency-us 大于0），ObjectAssigner 两次导入都不能比逐条写法慢。
+
+另导出一个小场景检查分组：两个相邻的同名对象（JSON Lines、二进制和材质库中按对象ID区分，
+分别分给 Twin 和 Twin.001），以及打乱顺序、同一对象的记录不连续时分组结果不变。
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import c4d
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+SUFFIX_RENAMED = 0.1  # 加了 .001 后缀的对象比例
+LOOSE_RENAMED = 0.05  # 改了大小写和分隔符的对象比例
+PREFILLED = 0.3  # 导入前已有材质槽的对象比例
+
+
+def build_objects(assignments, seed=0):
+    """按导出中的对象名创建网格对象，返回被改名的对象数 (后缀, 宽松)。"""
+    rng = random.Random(seed)
+    materials = list(bpy.data.materials)
+    suffixed = loose = 0
+    for obj_name, _ in Blender_Omat.group_assignments(assignments):
+        r = rng.random()
+        if r < SUFFIX_RENAMED:
+            name = obj_name + ".001"
+            suffixed += 1
+        elif r < SUFFIX_RENAMED + LOOSE_RENAMED:
+            name = obj_name.lower().replace("_", " ")
+            loose += 1
+        else:
+            name = obj_name
+        mesh = bpy.data.meshes.new(name)
+        if rng.random() < PREFILLED:
+            mesh.materials._materials.append(rng.choice(materials))
+        bpy.data.objects.new(name, mesh)
+    return suffixed, loose
+
+
+def naive_assign(assignments):
+    """常见的脚本写法：每条对应关系都按名称查找并追加槽。"""
+    unmatched = 0
+    for obj_name, mat_name, _ in assignments:
+        obj = bpy.data.objects.get(obj_name)
+        if obj is None:
+            unmatched += 1
+            continue
+        obj.data.materials.append(bpy.data.materials.get(mat_name))
+    return unmatched
+
+
+def slot_count():
+    return sum(len(obj.data.materials) for obj in bpy.data.objects)
+
+
+def twin_scene():
+    """四个对象，中间两个同名且相邻，第一个 Twin 有两个材质；返回 (对象列表, {Blender对象名: 槽中的材质名})。"""
+    objects, mats = synthetic.build_scene(4)
+    objects[1].SetName("Twin")
+    objects[1].InsertTag(c4d.TextureTag(mats[3]))
+    objects[2].SetName("Twin")
+    expected = {"Object_0_0": ["Mat_0"], "Twin": ["Mat_3", "Mat_1"], "Twin.001": ["Mat_2"], "Object_3_0": ["Mat_3"]}
+    return objects, expected
+
+
+def interleaved(assignments):
+    """轮流取每个对象的下一条记录，同一对象的记录不再连续。"""
+    queues = {}
+    for record in assignments:
+        queues.setdefault((record[2], record[0]), []).append(record)
+    result = []
+    while queues:
+        for key in list(queues):
+            result.append(queues[key].pop(0))
+            if not queues[key]:
+                del queues[key]
+    return result
+
+
+def assigned_slots(assignments):
+    bpy.reset()
+    for name in ("Object_0_0", "Twin", "Twin.001", "Object_3_0"):
+        bpy.data.objects.new(name, bpy.data.meshes.new(name))
+    for name in ("Mat_0", "Mat_1", "Mat_2", "Mat_3"):
+        bpy.data.materials.new(name)
+    Blender_Omat.ObjectAssigner('SUFFIX').assign(assignments)
+    return {obj.name: [slot.material.name for slot in obj.material_slots] for obj in bpy.data.objects}
+
+
+def check_grouping(workdir):
+    """同名对象和打乱顺序的对应关系，见模块说明；返回检查的导出格式。"""
+    objects, expected = twin_scene()
+    Cinema_Omat.gradient_cache = Cinema_Omat.GradientCache(os.path.join(workdir, "gradients"))
+    checked = []
+    for export_format in ("jsonl", "binary", "text"):
+        path = os.path.join(workdir, "twins" + os.path.splitext(Cinema_Omat.EXPORT_FILE_NAMES[export_format])[1])
+        with contextlib.redirect_stdout(io.StringIO()):
+            Cinema_Omat.ExportMaterials(objects, path, export_format)
+        assignments = []
+        Blender_Omat.parse_material_info(path, assignments)
+        groups = Blender_Omat.group_assignments(assignments)
+        if Blender_Omat.group_assignments(interleaved(assignments)) != groups:
+            raise AssertionError("{} grouping depends on the record order".format(export_format))
+        if export_format == "text":
+            continue  # 文本格式没有对象ID，相邻的同名对象无法区分
+        if assigned_slots(assignments) != expected:
+            raise AssertionError("{} export: wrong slots on same-named objects".format(export_format))
+        checked.append(export_format)
+
+    library_path = os.path.join(workdir, "twins.sqlite")
+    with Blender_Omat.MaterialLibrary(library_path) as library:
+        library.ingest(os.path.join(workdir, "twins.jsonl"))
+        _, selection = library.select(object_names=["Twin", "Twin.001"])
+    slots = assigned_slots(selection)
+    if {name: slots[name] for name in ("Twin", "Twin.001")} != {name: expected[name] for name in ("Twin", "Twin.001")}:
+        raise AssertionError("library selection: wrong slots on same-named objects")
+    checked.append("library")
+    return checked
+
+
+def measure(func):
+    bpy.call_counts.clear()
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, sum(bpy.call_counts.values()), result
+
+
+def run(objects=50000, materials=500, rule="LOOSE", latency=0.0, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_assign_")
+    path = os.path.join(workdir, "octane_material_info.jsonl")
+    synthetic.write_export(path, materials, objects // materials, export_format="jsonl",
+                           cache_dir=os.path.join(workdir, "gradients"))
+    assignments = []
+    parsed = Blender_Omat.parse_material_info(path, assignments)
+
+    results = {"objects": len(Blender_Omat.group_assignments(assignments)), "materials": len(parsed), "rule": rule}
+    for mode in ("naive", "indexed"):
+        bpy.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Blender_Omat.apply_material_properties(parsed, "")
+        results["suffixed"], results["loose"] = build_objects(assignments)
+        before = slot_count()
+        bpy.set_call_latency(latency)
+        try:
+            if mode == "naive":
+                first_s, first_calls, unmatched = measure(lambda: naive_assign(assignments))
+                again_s, again_calls, _ = measure(lambda: naive_assign(assignments))
+            else:
+                first_s, first_calls, assigner = measure(
+                    lambda: Blender_Omat.ObjectAssigner(rule).assign(assignments))
+                unmatched = len(assigner.unmatched)
+                again_s, again_calls, _ = measure(lambda: Blender_Omat.ObjectAssigner(rule).assign(assignments))
+                results["renamed"] = assigner.renamed
+        finally:
+            bpy.set_call_latency(0.0)
+        results[mode] = {
+            "first_s": first_s,
+            "first_calls": first_calls,
+            "again_s": again_s,
+            "again_calls": again_calls,
+            "unmatched": unmatched,
+            "slots_added": slot_count() - before,
+        }
+
+    # 不模拟RNA开销时替身的查找和追加都不花时间，只比较模拟了开销的结果
+    for key in ("first_s", "again_s"):
+        if latency and results["indexed"][key] > results["naive"][key]:
+            raise AssertionError("ObjectAssigner slower than the naive loop ({}: {:.2f}s > {:.2f}s)".format(
+                key, results["indexed"][key], results["naive"][key]))
+
+    # ObjectAssigner 的结果：每个找到的对象的槽与导出中的材质一一对应
+    for obj_name, mat_names in Blender_Omat.group_assignments(assignments):
+        obj = bpy.data.objects.get(obj_name)
+        if obj is not None and [slot.material.name for slot in obj.material_slots[:len(mat_names)]] != mat_names:
+            raise AssertionError("wrong slots on {}".format(obj_name))
+    results["grouping"] = check_grouping(workdir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objects", type=int, default=50000)
+    parser.add_argument("--materials", type=int, default=500)
+    parser.add_argument("--rule", default="LOOSE", choices=Blender_Omat.OBJECT_NAME_RULES[:3])
+    parser.add_argument("--latency-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    result = run(args.objects, args.materials, args.rule, args.latency_us / 1e6)
+    print("{objects} objects, {materials} materials, {suffixed} renamed with .001, {loose} with other case/separators, "
+          "rule {rule}".format(**result))
+    for mode in ("naive", "indexed"):
+        print("  {:<8} first {first_s:6.2f}s ({first_calls} RNA calls), again {again_s:6.2f}s ({again_calls} calls), "
+              "{unmatched} objects not found, {slots_added} slots added after two imports".format(mode, **result[mode]))
+    print("  indexed matched {renamed} renamed objects".format(**result))
+    print("  same-named objects and interleaved records grouped by object ID: {}".format(", ".join(result["grouping"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+批量导出基准：用 Cinema_Omat.BatchExport 在 c4d 替身上导出多个 .c4d 文档，每个文档一个工作进程。
+
+    python benchmarks/bench_batch.py [--documents 12] [--materials 500] [--workers 4] [--timeout 10]
+
+文档用 c4d 替身的 SaveDocument 保存；另加一个损坏的文档和一个载入时间超过 --timeout 的文档，
+检查它们记为失败、不影响其他文档，也没有留下导出文件。成功的导出在 Blender_Omat 中解析后
+必须与在本进程中直接导出的结果相同。先用1个进程、再用 --workers 个进程导出。
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import _paths
+import c4d
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+
+def write_documents(root, documents, materials):
+    """保存 documents 个合成文档（分在两个子目录中），另加一个损坏的和一个载入很慢的文档。"""
+    paths = []
+    for index in range(documents):
+        directory = os.path.join(root, "seq_{}".format(index % 2))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        doc, _ = synthetic.build_document(materials, 2, seed=index)
+        path = os.path.join(directory, "shot_{:03d}.c4d".format(index))
+        c4d.documents.SaveDocument(doc, path)
+        paths.append(path)
+    broken = os.path.join(root, "broken.c4d")
+    with open(broken, "wb") as f:
+        f.write(b"not a document")
+    doc, _ = synthetic.build_document(10, 1)
+    doc._load_delay = 3600
+    slow = os.path.join(root, "slow.c4d")
+    c4d.documents.SaveDocument(doc, slow)
+    return paths, broken, slow
+
+
+def reference_export(document_path, output_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        Cinema_Omat.ExportDocumentFile(document_path, output_path, "jsonl")
+        return Blender_Omat.parse_material_info(output_path)
+
+
+def batch(root, output_dir, workers, timeout):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        exported, failed = Cinema_Omat.BatchExport([root], output_dir, workers, timeout, "jsonl")
+    return time.perf_counter() - start, exported, failed
+
+
+def run(documents=12, materials=500, workers=Cinema_Omat.BATCH_WORKERS, timeout=10.0, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_batch_")
+    root = os.path.join(workdir, "documents")
+    paths, broken, slow = write_documents(root, documents, materials)
+    # 工作进程也要用 c4d 替身
+    os.environ["PYTHONPATH"] = os.pathsep.join([_paths.STANDINS_DIR, _paths.REPO_DIR, os.environ.get("PYTHONPATH", "")])
+
+    results = {"documents": documents, "materials": materials, "workers": workers, "timeout": timeout,
+               "cpus": os.cpu_count()}
+    for label, count in (("serial", 1), ("parallel", workers)):
+        output_dir = os.path.join(workdir, label)
+        seconds, exported, failed = batch(root, output_dir, count, timeout)
+        if sorted(exported) != sorted(paths) or sorted(failed) != sorted([broken, slow]):
+            raise AssertionError("unexpected results: {} exported, failed {}".format(len(exported), failed))
+        for path in (broken, slow):
+            if os.path.exists(Cinema_Omat.BatchOutputPath(path, os.path.basename(path), output_dir, "jsonl")):
+                raise AssertionError("failed document left an export: {}".format(path))
+        results[label] = {"seconds": seconds, "failed": failed}
+
+    # 比较几个文档的导出与本进程直接导出的结果
+    for path in paths[:3]:
+        output_path = exported[path][0]
+        if Blender_Omat.parse_material_info(output_path) != reference_export(path, output_path + ".reference"):
+            raise AssertionError("batch export of {} differs".format(path))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=12)
+    parser.add_argument("--materials", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=Cinema_Omat.BATCH_WORKERS)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    result = run(args.documents, args.materials, args.workers, args.timeout)
+    print("{documents} documents x {materials} materials + 1 broken + 1 hanging, {workers} workers on {cpus} CPUs, "
+          "timeout {timeout:.0f}s".format(**result))
+    for label in ("serial", "parallel"):
+        print("  {:<8} {:7.2f}s".format(label, result[label]["seconds"]))
+    for path, reason in sorted(result["parallel"]["failed"].items()):
+        print("  failed   {}: {}".format(os.path.basename(path), reason))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+孤立图像清理基准：在同一个 bpy 替身会话中反复导入，每次导出引用新版本目录中的贴图。
+
+    python benchmarks/bench_cleanup.py [--imports 12] [--materials 500] [--textures 50]
+
+每轮导出的材质相同，只有贴图目录（textures/v000、v001 …）不同，旧贴图在重新导入后不再被引用。
+分别关闭和开启 Blender_Omat.ImportSession 的 release_orphans，记录每轮后的图像数、零用户图像数和
+估算像素内存。场景中另有用户自己加载的图像（无用户、有伪用户、以及与第一轮导出同路径的图像），
+检查清理从不删除它们。
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+from bench_prefetch import write_png_header
+
+
+def write_round(workdir, round_index, materials, textures):
+    """写第 round_index 轮的贴图目录和导出文件，返回导出文件路径。"""
+    texture_dir = os.path.join(workdir, "textures", "v{:03d}".format(round_index))
+    os.makedirs(texture_dir)
+    for i in range(textures):
+        write_png_header(os.path.join(texture_dir, "tex_{:05d}.png".format(i)), 1024, 1024)
+    path = os.path.join(workdir, "export_{:03d}.jsonl".format(round_index))
+    synthetic.write_export(path, materials, export_format="jsonl", texture_dir=texture_dir, texture_pool=textures,
+                           cache_dir=os.path.join(workdir, "gradients"))
+    return path
+
+
+def add_foreign_images(workdir):
+    """用户自己加载的图像，返回 {名称: 图像}。"""
+    user_dir = os.path.join(workdir, "user")
+    os.makedirs(user_dir, exist_ok=True)
+    for name in ("unused.png", "kept.png"):
+        write_png_header(os.path.join(user_dir, name), 2048, 2048)
+    images = {
+        "unused": bpy.data.images.load(os.path.join(user_dir, "unused.png")),
+        "kept": bpy.data.images.load(os.path.join(user_dir, "kept.png")),
+        # 与第一轮导出中的贴图同路径：导入时复用它，之后被替换也不能删除
+        "shared": bpy.data.images.load(os.path.join(workdir, "textures", "v000", "tex_00000.png")),
+    }
+    images["kept"].use_fake_user = True
+    return images
+
+
+def image_memory():
+    return sum(Blender_Omat.image_bytes(img) for img in bpy.data.images if img.has_data)
+
+
+def run(imports=12, materials=500, textures=50, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_cleanup_")
+    paths = [write_round(workdir, i, materials, textures) for i in range(imports)]
+    results = {"imports": imports, "materials": materials, "textures": textures}
+    for release in (False, True):
+        bpy.reset()
+        foreign = add_foreign_images(workdir)
+        rounds = []
+        total_s = 0.0
+        for path in paths:
+            session = Blender_Omat.ImportSession(release_orphans=release)
+            job = Blender_Omat.ImportJob(path, session=session)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                job.run()
+                job.finish()
+            total_s += time.perf_counter() - start
+            rounds.append({
+                "images": len(bpy.data.images),
+                "orphans": sum(1 for img in bpy.data.images if img.users == 0),
+                "memory": image_memory(),
+                "released": session.images.released,
+                "freed": session.images.released_bytes,
+                "cleanup_s": session.stats.stages.get("cleanup", 0.0),
+            })
+        for name, img in foreign.items():
+            if bpy.data.images.get(img.name) is not img:
+                raise AssertionError("foreign image {} was removed".format(name))
+        if release and any(img.users == 0 and img.get(Blender_Omat.CREATED_PROPERTY) for img in bpy.data.images):
+            raise AssertionError("orphaned imported images left after cleanup")
+        results["release" if release else "keep"] = {"rounds": rounds, "total_s": total_s}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--imports", type=int, default=12)
+    parser.add_argument("--materials", type=int, default=500)
+    parser.add_argument("--textures", type=int, default=50)
+    args = parser.parse_args()
+
+    result = run(args.imports, args.materials, args.textures)
+    print("{imports} imports of {materials} materials, {textures} new textures per import".format(**result))
+    for mode in ("keep", "release"):
+        rounds = result[mode]["rounds"]
+        last = rounds[-1]
+        print("  {:<8} {:.2f}s total, after last import: {} images, {} with zero users, ~{}".format(
+            mode, result[mode]["total_s"], last["images"], last["orphans"],
+            Blender_Omat.format_bytes(last["memory"])))
+        if mode == "release":
+            print("           released {} images (~{} freed) in {:.3f}s of cleanup".format(
+                sum(r["released"] for r in rounds), Blender_Omat.format_bytes(sum(r["freed"] for r in rounds)),
+                sum(r["cleanup_s"] for r in rounds)))
+
+
+if __name__ == "__main__":
+    main()
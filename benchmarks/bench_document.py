@@ -0,0 +1,99 @@
+"""
+整个文档导出的基准：对比导出选中对象列表（GetActiveObjects + ExportMaterials）与 ExportDocument。
+
+    python benchmarks/bench_document.py [--materials 2000] [--objects-per-material 50]
+
+使用 c4d 替身，对象每10个放在一个空对象组里。两种方式导入Blender后的材质必须相同；
+另外测试按层和按对象类型过滤，以及远超递归深度的层级。
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import _paths  # noqa: F401
+import c4d
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+
+def measure(func):
+    c4d.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / (1024.0 * 1024.0)
+
+
+def parse(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Blender_Omat.parse_material_info(path)
+
+
+def run(materials=2000, objects_per_material=50, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_document_")
+    Cinema_Omat.gradient_cache = Cinema_Omat.GradientCache(os.path.join(workdir, "gradients"))
+    doc, objects = synthetic.build_document(materials, objects_per_material, layers=("Props", "Set"))
+    results = {"objects": len(objects), "materials": materials}
+
+    selection_path = os.path.join(workdir, "selection.jsonl")
+    document_path = os.path.join(workdir, "document.jsonl")
+    selection = lambda: Cinema_Omat.ExportMaterials(
+        doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN), selection_path, "jsonl")
+    results["selection"] = measure(selection)
+    results["document"] = measure(lambda: Cinema_Omat.ExportDocument(doc, document_path, "jsonl"))
+    if parse(selection_path) != parse(document_path):
+        raise AssertionError("document export differs from exporting the full selection")
+
+    # 只导出 "Props" 层：对象轮流分配到两个层，正好一半
+    layer_path = os.path.join(workdir, "layer.jsonl")
+    (_, assigned), _, _ = measure(lambda: Cinema_Omat.ExportDocument(doc, layer_path, "jsonl", layers={"Props"}))
+    if assigned * 2 != len(objects):
+        raise AssertionError("layer filter exported {} of {} objects".format(assigned, len(objects)))
+    (_, assigned), _, _ = measure(lambda: Cinema_Omat.ExportDocument(
+        doc, layer_path, "jsonl", object_types={5140}))
+    if assigned != 0:
+        raise AssertionError("object type filter kept objects of other types")
+
+    # 每个对象都是上一个对象的子对象
+    deep = sys.getrecursionlimit() * 10
+    chain_doc = c4d.BaseDocument(materials=doc.GetMaterials()[:1])
+    parent = None
+    for index in range(deep):
+        obj = c4d.BaseObject(5100, "Deep_{}".format(index))
+        obj.InsertTag(c4d.TextureTag(chain_doc.GetMaterials()[0]))
+        chain_doc.InsertObject(obj, parent=parent)
+        parent = obj
+    (_, assigned), results["deep_seconds"], _ = measure(
+        lambda: Cinema_Omat.ExportDocument(chain_doc, os.path.join(workdir, "deep.jsonl"), "jsonl"))
+    if assigned != deep:
+        raise AssertionError("deep hierarchy exported {} of {} objects".format(assigned, deep))
+    results["deep"] = deep
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    parser.add_argument("--objects-per-material", type=int, default=50)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.objects_per_material)
+    print("{objects} objects, {materials} materials, identical import, layer and type filters checked".format(**result))
+    for name in ("selection", "document"):
+        _, seconds, peak = result[name]
+        print("  {:<9} {:7.2f}s  peak {:8.2f} MB".format(name, seconds, peak))
+    print("hierarchy of depth {deep} exported in {deep_seconds:.2f}s".format(**result))
+
+
+if __name__ == "__main__":
+    main()
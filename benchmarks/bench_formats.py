@@ -0,0 +1,91 @@
+"""
+交换格式基准：同一个合成场景分别导出为 text / jsonl / binary（各自另有 gzip 和 zstd 压缩），
+比较文件大小、导出和解析耗时。压缩文件的解析结果必须与未压缩的相同，导出文件的权限按 umask 设置。
+
+    python benchmarks/bench_formats.py [--materials 5000]
+
+zstd 导出需要 zstandard；没有时用 Blender_Omat 使用的 zstd 模块（Python 3.14 的 compression.zstd）压缩
+未压缩的导出，导出耗时不可比。两者都没有时跳过 zstd。
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+FORMATS = ("text", "jsonl", "binary")
+COMPRESSIONS = (None, "gzip") + (("zstd",) if Cinema_Omat.zstandard or Blender_Omat.zstd else ())
+# 文本格式里的着色器 repr 带内存地址，每次生成的场景都不同
+ADDRESS = re.compile(r" at 0x[0-9a-f]+")
+
+
+def comparable(parsed):
+    return {name: {key: ADDRESS.sub("", value) if isinstance(value, str) else value
+                   for key, value in material.as_dict().items()}
+            for name, material in parsed.items()}
+
+
+def write_export(path, materials, cache_dir, export_format, compression):
+    if compression == "zstd" and Cinema_Omat.zstandard is None:
+        plain_path = path[:-len(Cinema_Omat.COMPRESSION_SUFFIXES[compression])]
+        synthetic.write_export(plain_path, materials, cache_dir=cache_dir, export_format=export_format)
+        with open(plain_path, 'rb') as src, open(path, 'wb') as dst:
+            dst.write(Blender_Omat.zstd.compress(src.read()))
+        return
+    synthetic.write_export(path, materials, cache_dir=cache_dir, export_format=export_format, compression=compression)
+
+
+def run(materials=5000, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_formats_")
+    cache_dir = os.path.join(workdir, "gradients")
+    results = []
+    for export_format in FORMATS:
+        uncompressed = None
+        for compression in COMPRESSIONS:
+            path = os.path.join(workdir, "octane_material_info." + export_format)
+            path += Cinema_Omat.COMPRESSION_SUFFIXES.get(compression, "")
+
+            start = time.perf_counter()
+            write_export(path, materials, cache_dir, export_format, compression)
+            export_s = time.perf_counter() - start
+            if os.name == "posix" and os.stat(path).st_mode & 0o777 != 0o666 & ~Cinema_Omat.CurrentUmask():
+                raise AssertionError("{} has mode {:o}, not the umask default".format(path, os.stat(path).st_mode))
+
+            start = time.perf_counter()
+            parsed = Blender_Omat.parse_material_info(path)
+            parse_s = time.perf_counter() - start
+            if compression and Blender_Omat.detect_export_format(path) != export_format:
+                raise AssertionError("{}+{} detected as another format".format(export_format, compression))
+            if uncompressed is None:
+                uncompressed = comparable(parsed)
+            elif comparable(parsed) != uncompressed:
+                raise AssertionError("{}+{} parses differently".format(export_format, compression))
+
+            results.append({
+                "format": export_format + ("+" + compression if compression else ""),
+                "bytes": os.path.getsize(path),
+                "export_s": export_s,
+                "parse_s": parse_s,
+                "materials_per_s": len(parsed) / parse_s if parse_s else float("inf"),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=5000)
+    args = parser.parse_args()
+
+    print("{} materials".format(args.materials))
+    for result in run(args.materials):
+        print("  {format:<12}  {bytes:>11,} bytes  export {export_s:6.2f}s  parse {parse_s:6.2f}s"
+              "  {materials_per_s:9.0f} materials/s".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+渐变基准：对比 GradientToBitmap 的批量实现与原来的逐像素实现，并校验逐像素一致；
+再对比导出为色标、在Blender中重建为 ColorRamp 与烘焙为图像的整个导出-导入过程。
+
+    python benchmarks/bench_gradient.py [--gradients 20] [--size 256] [--materials 500]
+
+对照的逐像素实现只有线性插值，用线性色标比较。ColorRamp 的取样先与从 Blender 源码算出的参考值
+（BLENDER_RAMP_REFERENCE）比较。线性、平滑、阶梯和三次色标分别沿 U 和 V 烘焙，与 set_color_ramp
+重建的 ColorRamp 按其插值方式取样的结果比较，差异以8位颜色单位报告（烘焙本身取整，差异最多为1，
+超过则失败）；插值方式不同的色标不能导出为色标。
+替身中复制材质用 deepcopy 复制节点树，ColorRamp 路径节点更多，耗时对比偏向烘焙路径；
+烘焙路径在C4D中的JPEG编码、写盘和Blender中的图像解码都没有计入。
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import random
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import c4d
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+
+def legacy_gradient_to_bitmap(gradient, width, height, gradient_type):
+    """原 GradientToBitmap 的逐像素实现，作为对照。"""
+    bmp = c4d.bitmaps.BaseBitmap()
+    bmp.Init(width, height)
+
+    knot_count = gradient.GetKnotCount()
+    if knot_count == 0:
+        return None
+
+    knots = sorted([gradient.GetKnot(i) for i in range(knot_count)], key=lambda k: k["pos"])
+
+    for x in range(width):
+        for y in range(height):
+            if gradient_type in [c4d.SLA_GRADIENT_TYPE_2D_U, c4d.SLA_GRADIENT_TYPE_2D_V]:
+                t = float(x) if gradient_type == c4d.SLA_GRADIENT_TYPE_2D_U else float(y)
+                t /= (width - 1)
+            else:
+                t = float(x) / (width - 1)
+
+            if t <= knots[0]["pos"]:
+                color = [int(knots[0]["col"][j] * 255) for j in range(3)]
+            elif t >= knots[-1]["pos"]:
+                color = [int(knots[-1]["col"][j] * 255) for j in range(3)]
+            else:
+                for i in range(knot_count - 1):
+                    if knots[i]["pos"] <= t <= knots[i + 1]["pos"]:
+                        lerp_factor = (t - knots[i]["pos"]) / (knots[i + 1]["pos"] - knots[i]["pos"])
+                        color = Cinema_Omat.lerp_color(
+                            [knots[i]["col"][j] * 255 for j in range(3)],
+                            [knots[i + 1]["col"][j] * 255 for j in range(3)],
+                            lerp_factor
+                        )
+                        break
+
+            bmp.SetPixel(x, y, *color)
+
+    return bmp
+
+
+# 比较烘焙与 ColorRamp 时使用的色标插值方式：LINEAR、SMOOTHKNOT、NONE、CUBICKNOT
+RAMP_INTERPOLATIONS = (4, 2, 5, 0)
+
+
+def random_gradient(rng, interpolation=4):
+    gradient = c4d.Gradient()
+    positions = sorted(rng.random() for _ in range(rng.randint(2, 6)))
+    for pos in positions:
+        gradient.InsertKnot(c4d.Vector(rng.random(), rng.random(), rng.random()), pos=pos)
+    for knot in gradient._knots:  # 替身的 InsertKnot 不能设置插值，直接修改
+        knot["interpolation"] = interpolation
+    return gradient
+
+
+def run(gradients=20, size=256, seed=1):
+    rng = random.Random(seed)
+    samples = [(random_gradient(rng), gradient_type)
+               for _ in range(gradients)
+               for gradient_type in (c4d.SLA_GRADIENT_TYPE_2D_U, c4d.SLA_GRADIENT_TYPE_2D_V)]
+
+    start = time.perf_counter()
+    legacy = [legacy_gradient_to_bitmap(g, size, size, t) for g, t in samples]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    baked = [Cinema_Omat.GradientToBitmap(g, size, size, t) for g, t in samples]
+    baked_time = time.perf_counter() - start
+
+    for old, new in zip(legacy, baked):
+        if old.pixels != new.pixels:
+            raise AssertionError("baked gradient differs from the per-pixel reference")
+
+    return {
+        "bitmaps": len(samples),
+        "size": size,
+        "numpy": Cinema_Omat.np is not None,
+        "per_pixel_s": legacy_time,
+        "baked_s": baked_time,
+        "speedup": legacy_time / baked_time if baked_time else float("inf"),
+    }
+
+
+def ramp_color_at(ramp, t):
+    """按 ColorRamp 的插值方式取它在 t 处的颜色（0-255），与 Blender 的 ColorRamp 节点相同。"""
+    elements = list(ramp.elements)
+    if t <= elements[0].position:
+        color = elements[0].color
+    elif t >= elements[-1].position:
+        color = elements[-1].color
+    else:
+        for i, (left, right) in enumerate(zip(elements, elements[1:])):
+            if left.position <= t <= right.position:
+                f = (t - left.position) / (right.position - left.position)
+                if ramp.interpolation == 'CONSTANT':
+                    color = left.color
+                elif ramp.interpolation == 'CARDINAL':
+                    before = elements[max(i - 1, 0)].color
+                    after = elements[min(i + 2, len(elements) - 1)].color
+                    fc = 0.71  # key_curve_position_weights(KEY_CARDINAL)
+                    weights = (-fc * f ** 3 + 2.0 * fc * f ** 2 - fc * f,
+                               (2.0 - fc) * f ** 3 + (fc - 3.0) * f ** 2 + 1.0,
+                               (fc - 2.0) * f ** 3 + (3.0 - 2.0 * fc) * f ** 2 + fc * f,
+                               fc * f ** 3 - fc * f ** 2)
+                    color = [min(1.0, max(0.0, sum(w * c[j] for w, c in zip(weights, (before, left.color,
+                                                                                          right.color, after)))))
+                             for j in range(3)]
+                else:
+                    if ramp.interpolation == 'EASE':
+                        f = f * f * (3.0 - 2.0 * f)
+                    color = [a * (1 - f) + b * f for a, b in zip(left.color, right.color)]
+                break
+    return [c * 255 for c in color[:3]]
+
+
+# Blender ColorRamp 的取样结果（0-255）：(插值方式, [(位置, 颜色)], [(t, 颜色)])。
+# 按 Blender 源码中 BKE_colorband_evaluate 和 key_curve_position_weights 的单精度计算得到，
+# 与本文件和 Cinema_Omat 中的公式无关，用来发现两者共同的错误（例如 Cardinal 的张力系数）。
+BLENDER_RAMP_REFERENCE = [
+    ('CARDINAL', [(0.0, (0.0, 0.0, 0.0)), (0.5, (1.0, 1.0, 1.0)), (1.0, (0.0, 0.0, 0.0))],
+     [(0.1, (49.69, 49.69, 49.69)), (0.25, (150.13, 150.13, 150.13)), (0.4, (234.27, 234.27, 234.27)),
+      (0.75, (150.13, 150.13, 150.13))]),
+    ('CARDINAL', [(0.1, (1.0, 0.2, 0.0)), (0.35, (0.0, 0.6, 1.0)), (0.7, (0.9, 0.9, 0.1)), (0.9, (0.0, 0.0, 0.3))],
+     [(0.05, (255.0, 51.0, 0.0)), (0.2, (140.91, 85.17, 114.09)), (0.3, (23.04, 128.49, 231.96)),
+      (0.5, (87.79, 212.25, 180.51)), (0.65, (216.47, 238.88, 51.83)), (0.8, (135.12, 121.54, 30.63)),
+      (0.95, (0.0, 0.0, 76.5))]),
+    ('EASE', [(0.1, (1.0, 0.2, 0.0)), (0.35, (0.0, 0.6, 1.0)), (0.7, (0.9, 0.9, 0.1)), (0.9, (0.0, 0.0, 0.3))],
+     [(0.2, (165.24, 86.9, 89.76)), (0.5, (90.33, 183.11, 164.67)), (0.8, (114.75, 114.75, 51.0))]),
+]
+
+
+def reference_error():
+    """
+    BLENDER_RAMP_REFERENCE 中的渐变分别用 ramp_color_at 和 Cinema_Omat.GradientColorAt 取样，
+    返回与 Blender 结果的最大差异 (ColorRamp, 烘焙)；烘焙取整，差异最多为1。
+    """
+    interpolations = {mode: value for value, mode in reversed(list(Cinema_Omat.GRADIENT_INTERPOLATIONS.items()))}
+    ramp_error = bake_error = 0.0
+    for mode, stops, samples in BLENDER_RAMP_REFERENCE:
+        ramp = bpy.ColorRamp()
+        ramp.interpolation = mode
+        ramp.elements._elements = [bpy.ColorRampElement(pos, color + (1.0,)) for pos, color in stops]
+        knots = [{"pos": pos, "col": c4d.Vector(*color), "interpolation": interpolations[mode]} for pos, color in stops]
+        for t, expected in samples:
+            ramp_error = max(ramp_error, max(abs(a - b) for a, b in zip(ramp_color_at(ramp, t), expected)))
+            bake_error = max(bake_error, max(abs(a - b) for a, b in zip(Cinema_Omat.GradientColorAt(knots, t), expected)))
+    if ramp_error > 0.05 or bake_error > 1.0:
+        raise AssertionError("differs from Blender's ColorRamp: {:.2f}/255 (ColorRamp), {:.2f}/255 (baked)".format(
+            ramp_error, bake_error))
+    return ramp_error, bake_error
+
+
+def ramp_error(gradients=20, size=256, seed=1):
+    """
+    色标经 GradientRamp 导出、set_color_ramp 重建后，与 BakeGradientPixels 烘焙的像素的最大差异，
+    返回 {插值方式: 差异}。V 方向烘焙图像的第一行是 V=1，对应 ColorRamp 的 1-t。
+    """
+    rng = random.Random(seed)
+    errors = {}
+    for interpolation in RAMP_INTERPOLATIONS:
+        mode = Cinema_Omat.GRADIENT_INTERPOLATIONS[interpolation]
+        error = 0.0
+        for _ in range(gradients):
+            gradient = random_gradient(rng, interpolation)
+            knots = sorted([gradient.GetKnot(i) for i in range(gradient.GetKnotCount())], key=lambda k: k["pos"])
+            for gradient_type in (c4d.SLA_GRADIENT_TYPE_2D_U, c4d.SLA_GRADIENT_TYPE_2D_V):
+                shader = c4d.BaseShader(synthetic.SHADER_GRADIENT, "渐变")
+                shader[c4d.SLA_GRADIENT_GRADIENT] = gradient
+                shader[c4d.SLA_GRADIENT_TYPE] = gradient_type
+                ramp = bpy.ColorRamp()
+                Blender_Omat.set_color_ramp(ramp, Cinema_Omat.GradientRamp(shader))
+                if ramp.interpolation != mode:
+                    raise AssertionError("{} knots gave a {} ColorRamp".format(mode, ramp.interpolation))
+
+                pixels = Cinema_Omat.BakeGradientPixels(knots, size, size, gradient_type)
+                vertical = gradient_type == c4d.SLA_GRADIENT_TYPE_2D_V
+                for i in range(size):
+                    t = float(i) / (size - 1)
+                    offset = i * size * 3 if vertical else i * 3
+                    baked = pixels[offset:offset + 3]
+                    expected = ramp_color_at(ramp, 1.0 - t if vertical else t)
+                    error = max(error, max(abs(a - b) for a, b in zip(baked, expected)))
+        if error > 1.0:
+            raise AssertionError("{} ColorRamp differs from the baked gradient by {:.2f}/255".format(mode, error))
+        errors[mode] = error
+
+    # 插值方式不同的色标无法用一个 ColorRamp 表示，必须留给烘焙
+    for _ in range(gradients):
+        gradient = random_gradient(rng)
+        for knot, interpolation in zip(gradient._knots, itertools.cycle(RAMP_INTERPOLATIONS)):
+            knot["interpolation"] = interpolation
+        shader = c4d.BaseShader(synthetic.SHADER_GRADIENT, "渐变")
+        shader[c4d.SLA_GRADIENT_GRADIENT] = gradient
+        shader[c4d.SLA_GRADIENT_TYPE] = c4d.SLA_GRADIENT_TYPE_2D_U
+        if Cinema_Omat.GradientRamp(shader) is not None:
+            raise AssertionError("knots with mixed interpolations were exported as a ColorRamp")
+    return errors
+
+
+def export_and_import(materials, gradient_type, workdir):
+    """导出只有渐变通道的场景再导入，返回耗时和图像相关的调用次数。"""
+    path = os.path.join(workdir, "gradients_{}.jsonl".format(gradient_type))
+    cache_dir = tempfile.mkdtemp(dir=workdir)
+    bpy.reset()
+    bpy.call_counts.clear()
+    c4d.reset()
+    start = time.perf_counter()
+    synthetic.write_export(path, materials, export_format="jsonl", textures=0.0, gradients=1.0,
+                           color_corrections=0.0, cache_dir=cache_dir, gradient_type=gradient_type)
+    with contextlib.redirect_stdout(io.StringIO()):
+        session = Blender_Omat.apply_material_properties(Blender_Omat.parse_material_info(path), "")
+    return {
+        "seconds": time.perf_counter() - start,
+        "bakes": c4d.call_counts["bitmap.Save"],
+        "image_bytes": sum(entry.stat().st_size for entry in os.scandir(cache_dir)),
+        "image_loads": bpy.call_counts["images.load"],
+        "ramps": session.stats.counters.get("gradient ramps", 0),
+    }
+
+
+def run_ramps(materials=500):
+    workdir = tempfile.mkdtemp(prefix="omat_gradient_")
+    # 径向渐变无法映射为 ColorRamp，走烘焙图像的后备路径
+    return {
+        "materials": materials,
+        "ramp": export_and_import(materials, c4d.SLA_GRADIENT_TYPE_2D_U, workdir),
+        "baked": export_and_import(materials, c4d.SLA_GRADIENT_TYPE_2D_CIRC, workdir),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gradients", type=int, default=20)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--materials", type=int, default=500)
+    args = parser.parse_args()
+
+    result = run(args.gradients, args.size)
+    print("{bitmaps} bitmaps of {size}x{size} (numpy={numpy}), pixel-identical".format(**result))
+    print("  per-pixel: {per_pixel_s:.3f}s".format(**result))
+    print("  baked:     {baked_s:.3f}s  ({speedup:.1f}x)".format(**result))
+
+    print("Blender ColorRamp reference values: max difference {:.2f}/255 (ColorRamp), {:.2f}/255 (baked)".format(
+        *reference_error()))
+    errors = ramp_error(args.gradients, args.size)
+    print("ColorRamp vs baked pixels, max difference: " + ", ".join(
+        "{} {:.2f}/255".format(mode, error) for mode, error in errors.items()))
+    result = run_ramps(args.materials)
+    print("{materials} gradient materials, export + import:".format(**result))
+    for name in ("ramp", "baked"):
+        print("  {name:<6} {seconds:7.3f}s  {ramps} ramps, {bakes} bakes, {image_bytes} image bytes written, "
+              "{image_loads} image loads".format(name=name, **result[name]))
+
+
+if __name__ == "__main__":
+    main()
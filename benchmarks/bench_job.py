@@ -0,0 +1,139 @@
+"""
+分步导入基准：后台线程解析、主线程按时间预算分批应用的 Blender_Omat.ImportJob，与一次性导入对比，使用 bpy 替身。
+
+    python benchmarks/bench_job.py [--materials 5000] [--budget-ms 30] [--latency-us 20]
+
+一次性导入为 parse_material_info + apply_material_properties + ObjectAssigner.assign。分步导入模拟模态
+操作符的计时器：每次调用 step(budget) 之间让出主线程；另有一次在中途取消、再用新的导入完成剩余部分。
+检查三种方式得到的节点树、图像和对象材质槽完全相同，并记录每次 step() 占用主线程的最长时间。
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+from bench_apply import snapshot
+
+
+def scene_objects(assignments):
+    for obj_name, _, _ in assignments:
+        if bpy.data.objects.get(obj_name) is None:
+            bpy.data.objects.new(obj_name, bpy.data.meshes.new(obj_name))
+
+
+def scene_state():
+    materials = {mat.name: snapshot(mat) for mat in bpy.data.materials}
+    images = sorted(img.filepath for img in bpy.data.images)
+    slots = {obj.name: [slot.material.name for slot in obj.material_slots] for obj in bpy.data.objects}
+    return materials, images, slots
+
+
+def one_shot(path, assignments):
+    bpy.reset()
+    scene_objects(assignments)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pairs = []
+        materials = Blender_Omat.parse_material_info(path, pairs)
+        Blender_Omat.apply_material_properties(materials, "")
+        Blender_Omat.ObjectAssigner().assign(pairs)
+    return time.perf_counter() - start
+
+
+def stepped(path, budget, cancel_after=None):
+    """像模态操作符一样驱动后台导入，返回 (总耗时, 最长一次 step 的耗时, step 次数, job)。"""
+    job = Blender_Omat.ImportJob(path, session=Blender_Omat.ImportSession(assigner=Blender_Omat.ObjectAssigner()),
+                                 background=True)
+    start = time.perf_counter()
+    longest = 0.0
+    steps = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            step_start = time.perf_counter()
+            done = job.step(budget)
+            longest = max(longest, time.perf_counter() - step_start)
+            steps += 1
+            if done:
+                break
+            if cancel_after is not None and job.applied >= cancel_after:
+                job.cancel()
+                break
+            time.sleep(0.001)  # 两次计时器回调之间Blender处理界面事件
+        job.finish()
+    return time.perf_counter() - start, longest, steps, job
+
+
+def run(materials=5000, budget_ms=30.0, latency_us=20.0, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_job_")
+    texture_dir = os.path.join(workdir, "textures")
+    os.makedirs(texture_dir)
+    for i in range(50):
+        open(os.path.join(texture_dir, "tex_{:05d}.png".format(i)), "wb").close()
+    path = os.path.join(workdir, "octane_material_info.jsonl")
+    synthetic.write_export(path, materials, 2, export_format="jsonl", texture_dir=texture_dir, texture_pool=50,
+                           cache_dir=os.path.join(workdir, "gradients"))
+    assignments = []
+    Blender_Omat.parse_material_info(path, assignments)
+    budget = budget_ms / 1000.0
+
+    bpy.set_call_latency(latency_us / 1e6)
+    try:
+        one_shot_s = one_shot(path, assignments)
+        reference = scene_state()
+
+        bpy.reset()
+        scene_objects(assignments)
+        stepped_s, longest, steps, job = stepped(path, budget)
+        if job.phase != 'done' or scene_state() != reference:
+            raise AssertionError("stepped import differs from a one-shot import")
+
+        # 中途取消：已应用的材质完整，之后的导入补完剩余部分
+        bpy.reset()
+        scene_objects(assignments)
+        _, _, _, cancelled = stepped(path, budget, cancel_after=materials // 3)
+        partial = len(bpy.data.materials)
+        if cancelled.phase != 'cancelled' or not 0 < partial < materials:
+            raise AssertionError("cancel left {} of {} materials".format(partial, materials))
+        _, _, _, resumed = stepped(path, budget)
+        if scene_state() != reference:
+            raise AssertionError("resumed import differs from a one-shot import")
+        if resumed.session.skipped != partial:
+            raise AssertionError("{} materials skipped after cancelling at {}".format(resumed.session.skipped, partial))
+    finally:
+        bpy.set_call_latency(0.0)
+
+    return {
+        "materials": materials,
+        "objects": len(reference[2]),
+        "budget_ms": budget_ms,
+        "one_shot_s": one_shot_s,
+        "stepped_s": stepped_s,
+        "longest_step_ms": longest * 1000.0,
+        "steps": steps,
+        "partial": partial,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=5000)
+    parser.add_argument("--budget-ms", type=float, default=30.0)
+    parser.add_argument("--latency-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.budget_ms, args.latency_us)
+    print("{materials} materials on {objects} objects, identical node trees, images and slots".format(**result))
+    print("  one-shot import   {one_shot_s:7.2f}s blocking".format(**result))
+    print("  stepped import    {stepped_s:7.2f}s in {steps} steps, longest step {longest_step_ms:.1f} ms "
+          "(budget {budget_ms:.0f} ms)".format(**result))
+    print("  cancelled after {partial} materials, next import skipped them and finished the rest".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+材质库基准：把导出文件收录到 Blender_Omat.MaterialLibrary，再只导入选中对象或名称匹配的材质。
+
+    python benchmarks/bench_library.py [--materials 20000] [--objects-per-material 2] [--selected 20]
+
+对比从导出文件完整导入和从材质库选择性导入的耗时与创建的材质数。选中的对象中一部分带
+Blender 的 .001 后缀；检查选择性导入的节点树与完整导入相同，选中对象的材质槽与导出一致，
+未选中的对象不被改动。
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+from bench_apply import snapshot
+
+PATTERN = "Mat_1?"  # 名称模式导入时选择的材质
+
+
+def build_objects(object_names, suffixed):
+    """创建空网格对象，suffixed 中的对象名加 .001 后缀，返回 {导出对象名: 对象}。"""
+    objects = {}
+    for name in object_names:
+        blender_name = name + ".001" if name in suffixed else name
+        objects[name] = bpy.data.objects.new(blender_name, bpy.data.meshes.new(blender_name))
+    return objects
+
+
+def import_job(path, **kwargs):
+    start = time.perf_counter()
+    job = Blender_Omat.ImportJob(path, **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        job.run()
+    return time.perf_counter() - start, job
+
+
+def run(materials=20000, objects_per_material=2, selected=20, workdir=None, seed=0):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_library_")
+    path = os.path.join(workdir, "octane_material_info.jsonl")
+    synthetic.write_export(path, materials, objects_per_material, export_format="jsonl",
+                           cache_dir=os.path.join(workdir, "gradients"))
+    assignments = []
+    Blender_Omat.parse_material_info(path, assignments)
+    expected = dict(Blender_Omat.group_assignments(assignments))
+
+    library_path = os.path.join(workdir, "material_library.sqlite")
+    start = time.perf_counter()
+    with Blender_Omat.MaterialLibrary(library_path) as library:
+        library.ingest(path)
+    ingest_s = time.perf_counter() - start
+    start = time.perf_counter()
+    with Blender_Omat.MaterialLibrary(library_path) as library:
+        if library.ingest(path) is not None:
+            raise AssertionError("unchanged export was ingested again")
+    reingest_s = time.perf_counter() - start
+
+    # 完整导入：解析整个导出并创建所有材质
+    bpy.reset()
+    full_s, full_job = import_job(path)
+    reference = {mat.name: snapshot(mat) for mat in bpy.data.materials}
+
+    # 选中对象导入：只创建这些对象使用的材质，只写这些对象的材质槽
+    rng = random.Random(seed)
+    chosen = rng.sample(sorted(expected), selected)
+    bpy.reset()
+    objects = build_objects(chosen, set(chosen[::3]))
+    bystander = bpy.data.objects.new(chosen[0], bpy.data.meshes.new(chosen[0]))
+    start = time.perf_counter()
+    with Blender_Omat.MaterialLibrary(library_path) as library:
+        plans, selection = library.select(object_names=[obj.name for obj in objects.values()])
+    query_s = time.perf_counter() - start
+    assigner = Blender_Omat.ObjectAssigner('SUFFIX', candidates=list(objects.values()))
+    import_s, _ = import_job(library_path, session=Blender_Omat.ImportSession(assigner=assigner),
+                             plans=plans, assignments=selection)
+    wanted = {mat_name for name in chosen for mat_name in expected[name]}
+    if {mat.name for mat in bpy.data.materials} != wanted:
+        raise AssertionError("selective import created other materials")
+    for mat in bpy.data.materials:
+        if snapshot(mat) != reference[mat.name]:
+            raise AssertionError("different node tree for {}".format(mat.name))
+    for name, obj in objects.items():
+        if [slot.material.name for slot in obj.material_slots] != expected[name]:
+            raise AssertionError("wrong slots on {}".format(obj.name))
+    if len(bystander.material_slots):
+        raise AssertionError("unselected object {} was assigned".format(bystander.name))
+
+    # 名称模式导入
+    bpy.reset()
+    start = time.perf_counter()
+    with Blender_Omat.MaterialLibrary(library_path) as library:
+        plans, selection = library.select(pattern=PATTERN)
+    pattern_query_s = time.perf_counter() - start
+    pattern_s, _ = import_job(library_path, plans=plans, assignments=selection)
+    if not plans:
+        raise AssertionError("no materials match {}".format(PATTERN))
+    if any(snapshot(mat) != reference[mat.name] for mat in bpy.data.materials):
+        raise AssertionError("different node trees for pattern import")
+
+    return {
+        "materials": materials,
+        "objects": len(expected),
+        "selected": selected,
+        "pattern": PATTERN,
+        "export_mb": os.path.getsize(path) / 1048576.0,
+        "library_mb": os.path.getsize(library_path) / 1048576.0,
+        "ingest_s": ingest_s,
+        "reingest_s": reingest_s,
+        "full_s": full_s,
+        "full_materials": len(full_job.plans),
+        "query_s": query_s,
+        "import_s": import_s,
+        "selected_materials": len(wanted),
+        "pattern_query_s": pattern_query_s,
+        "pattern_s": pattern_s,
+        "pattern_materials": len(plans),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=20000)
+    parser.add_argument("--objects-per-material", type=int, default=2)
+    parser.add_argument("--selected", type=int, default=20)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.objects_per_material, args.selected)
+    print("{materials} materials on {objects} objects, export {export_mb:.1f} MB, library {library_mb:.1f} MB".format(
+        **result))
+    print("  ingest {ingest_s:.2f}s, unchanged export skipped in {reingest_s:.3f}s".format(**result))
+    print("  full import               {full_s:7.3f}s  {full_materials} materials".format(**result))
+    print("  {selected} selected objects     {total:7.3f}s  {selected_materials} materials "
+          "(query {query_s:.3f}s), identical node trees".format(total=result["query_s"] + result["import_s"], **result))
+    print("  pattern {pattern:<17} {total:7.3f}s  {pattern_materials} materials (query {pattern_query_s:.3f}s)".format(
+        total=result["pattern_query_s"] + result["pattern_s"], **result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Live Link 基准：Cinema_Omat.LiveLinkSender 通过本机TCP推送到 Blender_Omat.LiveLinkServer，两边都用替身。
+
+    python benchmarks/bench_live_link.py [--materials 500] [--edits 20] [--burst 30]
+
+测量首次推送、单个材质修改后到Blender中应用完成的延迟，以及连续快速修改时的合并效果；
+作为对比，也给出整文件导出再导入一次的耗时。每次修改后检查Blender材质的指纹与最新记录一致。
+没有修改时再收集一次记录不能读取任何材质参数，修改一个材质后只重建它的记录（记录参数读取次数）。
+另用 Cinema_Omat.LiveLinkMessage 模拟C4D的消息：几次 EVMSG_CHANGE 之后的一次 MSG_TIMER 推送一次，
+没有 EVMSG_CHANGE 的 MSG_TIMER 不推送。
+连续修改期间记录不断到达，每 LIVE_LINK_MAX_DELAY 秒最多应用一次；两次推送的间隔超过 LIVE_LINK_DEBOUNCE
+（单核上线程争用时会发生）也会提前应用一次，停止后再应用一次：检查应用次数不超过这个上限且少于推送次数。另记录 tick() 占用主线程的最长时间（贴图预取在工作线程中，不计入）。
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import tempfile
+import threading
+import time
+
+import _paths  # noqa: F401
+import bpy
+import c4d
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+
+tick_times = []
+
+
+def tick(server):
+    start = time.perf_counter()
+    interval = server.tick()
+    tick_times.append(time.perf_counter() - start)
+    return interval
+
+
+def pump(server, done, timeout=10.0):
+    """模拟Blender的事件循环：按 tick() 返回的间隔调用它，直到 done() 为真。"""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise AssertionError("live link did not apply the update in time")
+        time.sleep(tick(server))
+
+
+def blender_fingerprint(name):
+    mat = bpy.data.materials.get(name)
+    return mat.get(Blender_Omat.FINGERPRINT_PROPERTY) if mat is not None else None
+
+
+def expected_fingerprint(sender, objects, name):
+    for _, record, _ in sender.CollectRecords(objects):
+        if record["name"] == name:
+            return Blender_Omat.material_plan(Blender_Omat.record_to_material(record))["fingerprint"]
+
+
+def edit(material, value):
+    material[c4d.OCT_MATERIAL_ROUGHNESS_FLOAT] = value
+
+
+def collect_param_gets(sender, objects):
+    c4d.call_counts["param.get"] = 0
+    sender.CollectRecords(objects)
+    return c4d.call_counts["param.get"]
+
+
+def check_message_plugin(server, sender, objects, mats):
+    """按C4D的方式驱动 LiveLinkMessage，返回修改后从 MSG_TIMER 到Blender应用完成的耗时。"""
+    c4d.documents.active_document = c4d.BaseDocument(objects, mats)
+    plugin = Cinema_Omat.LiveLinkMessage(sender)
+    pushes = []
+    push = sender.Push
+    sender.Push = lambda objects: pushes.append(None) or push(objects)
+    try:
+        plugin.CoreMessage(c4d.MSG_TIMER, None)  # 启动后的第一次推送，材质都没有变化
+        for i in range(3):
+            edit(mats[1], 0.1 * i)
+            plugin.CoreMessage(c4d.EVMSG_CHANGE, None)
+        expected = expected_fingerprint(sender, objects, "Mat_1")
+        start = time.perf_counter()
+        plugin.CoreMessage(c4d.MSG_TIMER, None)
+        pump(server, lambda: blender_fingerprint("Mat_1") == expected)
+        timer_s = time.perf_counter() - start
+        plugin.CoreMessage(c4d.MSG_TIMER, None)
+    finally:
+        sender.Push = push
+    if len(pushes) != 2 or plugin.failed:
+        raise AssertionError("message plugin pushed {} times for one startup and one batch of edits".format(len(pushes)))
+    return timer_s
+
+
+def run(materials=500, edits=20, burst=30, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_live_link_")
+    objects, mats = synthetic.build_scene(materials)
+    Cinema_Omat.gradient_cache = Cinema_Omat.GradientCache(os.path.join(workdir, "gradients"))
+    bpy.reset()
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        server = Blender_Omat.LiveLinkServer(port=0)
+        server.start()
+        sender = Cinema_Omat.LiveLinkSender(port=server.port, state_path=os.path.join(workdir, "state.json"))
+        try:
+            start = time.perf_counter()
+            sent, total = sender.Push(objects)
+            pump(server, lambda: server.applied >= total and not server.pending)
+            initial_s = time.perf_counter() - start
+            idle_gets = collect_param_gets(sender, objects)
+            if idle_gets:
+                raise AssertionError("collecting unchanged materials read {} parameters".format(idle_gets))
+            edit(mats[0], 0.5)
+            edit_gets = collect_param_gets(sender, objects)
+
+            latencies = []
+            sent_per_edit = []
+            for i in range(edits):
+                index = i * 7 % len(mats)
+                name = "Mat_{}".format(index)
+                edit(mats[index], i / float(edits))
+                expected = expected_fingerprint(sender, objects, name)
+                start = time.perf_counter()
+                sent_per_edit.append(sender.Push(objects)[0])
+                pump(server, lambda: blender_fingerprint(name) == expected)
+                latencies.append(time.perf_counter() - start)
+
+            # 连续快速修改同一个材质：后台线程每10ms推送一次，主线程同时运行计时器
+            applied_before = server.applied
+            burst_start = time.perf_counter()
+            pushed = []
+            def burst_edits():
+                for i in range(burst):
+                    edit(mats[0], 0.5 + i / (2.0 * burst))
+                    sender.Push(objects)
+                    pushed.append(time.perf_counter())
+                    time.sleep(0.01)
+            thread = threading.Thread(target=burst_edits)
+            thread.start()
+            while thread.is_alive():
+                time.sleep(tick(server))
+            burst_s = time.perf_counter() - burst_start
+            expected = expected_fingerprint(sender, objects, "Mat_0")
+            pump(server, lambda: blender_fingerprint("Mat_0") == expected)
+            burst_applies = server.applied - applied_before
+            pauses = sum(1 for a, b in zip(pushed, pushed[1:]) if b - a >= Blender_Omat.LIVE_LINK_DEBOUNCE)
+            burst_limit = math.floor(burst_s / Blender_Omat.LIVE_LINK_MAX_DELAY) + pauses + 2
+            if not burst_applies <= min(burst_limit, burst - 1):
+                raise AssertionError("{} applies for {} edits in {:.2f}s (at most {} expected)".format(
+                    burst_applies, burst, burst_s, burst_limit))
+            timer_s = check_message_plugin(server, sender, objects, mats)
+        finally:
+            server.stop()
+
+        export_path = os.path.join(workdir, "octane_material_info.jsonl")
+        bpy.reset()
+        start = time.perf_counter()
+        Cinema_Omat.ExportMaterials(objects, export_path, "jsonl")
+        Blender_Omat.apply_material_properties(Blender_Omat.parse_material_info(export_path), "")
+        file_round_trip_s = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "materials": total,
+        "initial_sent": sent,
+        "initial_s": initial_s,
+        "edits": edits,
+        "sent_per_edit": max(sent_per_edit),
+        "edit_param_gets": edit_gets,
+        "timer_s": timer_s,
+        "latency_p50": latencies[len(latencies) // 2],
+        "latency_max": latencies[-1],
+        "burst": burst,
+        "burst_applies": burst_applies,
+        "burst_s": burst_s,
+        "burst_limit": burst_limit,
+        "burst_pauses": pauses,
+        "longest_tick_ms": max(tick_times) * 1000.0,
+        "budget_ms": Blender_Omat.FRAME_BUDGET_MS,
+        "file_round_trip_s": file_round_trip_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=500)
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=30)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.edits, args.burst)
+    print("initial push     {initial_sent}/{materials} materials in {initial_s:.2f}s".format(**result))
+    print("single edit      p50 {latency_p50:.3f}s  max {latency_max:.3f}s  "
+          "({sent_per_edit} record sent per edit, {edit_param_gets} parameters read)".format(**result))
+    print("burst of {burst:<6}  {burst_applies} applies in Blender over {burst_s:.2f}s "
+          "(at most {burst_limit}, {burst_pauses} pauses between pushes)".format(**result))
+    print("message plugin   edits applied {timer_s:.3f}s after the timer message".format(**result))
+    print("longest tick     {longest_tick_ms:.1f} ms (budget {budget_ms} ms)".format(**result))
+    print("file round trip  {file_round_trip_s:.2f}s (full export + parse + apply into an empty scene)".format(**result))
+
+
+if __name__ == "__main__":
+    main()
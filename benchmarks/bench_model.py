@@ -0,0 +1,162 @@
+"""
+解析结果内存模型基准：parse_material_info 的耗时、保留内存和峰值内存，以及之后生成计划和应用材质的耗时。
+
+    python benchmarks/bench_model.py [--materials 20000] [--before old_Blender_Omat.py]
+
+--before 指定另一个版本的 Blender_Omat.py（例如 git show <提交>:Blender_Omat.py > old.py），
+在同一批导出文件上并排比较。保留内存是解析结果仍被引用时 tracemalloc 统计的大小；
+耗时在不带 tracemalloc 的第二次解析上测量。
+
+每个格式都检查 MaterialRecord 生成的计划与原来按属性字典（MaterialRecord.as_dict()）生成的计划相同；
+指定 --before 时还检查两个版本生成的计划相同。指纹的计算方式不同，不参与比较。
+"""
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+
+FORMATS = ("text", "jsonl")
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location("Blender_Omat_before", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def dict_resolve_channel(properties, prop):
+    """原 resolve_channel：从属性字典中按 "<通道> <字段>" 键取值，作为对照。"""
+    image_texture_file = properties.get(f'{prop} Image Texture File')
+    if image_texture_file:
+        return 'texture', image_texture_file
+    if f'{prop} Link' in properties:
+        shader_name = properties.get(f'{prop} Shader Name', '').lower()
+        if '渐变' in shader_name:
+            ramp = properties.get(f'{prop} Gradient Ramp')
+            if ramp:
+                return 'gradient', ramp
+            gradient_path = properties.get(f'{prop} Gradient Image Path')
+            if gradient_path:
+                return 'texture', gradient_path
+        elif '颜色' in shader_name or 'color' in shader_name:
+            color_value = properties.get(f'{prop} Color (Link)')
+            if color_value:
+                return 'value', Blender_Omat.parse_vector(color_value)
+        return None, None
+    if f'{prop} Color' in properties:
+        color = Blender_Omat.parse_vector(properties[f'{prop} Color'])
+        if color == [0, 0, 0] and f'{prop} Float' in properties:
+            return 'value', float(properties[f'{prop} Float'])
+        return 'value', color
+    if f'{prop} Float' in properties:
+        return 'value', float(properties[f'{prop} Float'])
+    return None, None
+
+
+def dict_material_plan(name, properties):
+    """原 material_plan 中除指纹以外的部分。"""
+    transmission = properties.get('Transmission Float')
+    return {
+        "name": name,
+        "channels": {prop: dict(zip(("input", "kind", "value"), (input_name,) + dict_resolve_channel(properties, prop)))
+                     for prop, input_name in Blender_Omat.CHANNEL_MAPPING.items()},
+        "specular": 'specular' in properties.get('Type', '').lower(),
+        "transmission": None if transmission is None else float(transmission),
+        "blend_method": 'HASHED' if 'Opacity Float' in properties or 'Opacity Color' in properties else None,
+    }
+
+
+def comparable(plan):
+    """去掉指纹、元组转为列表后的计划。"""
+    plan = {key: value for key, value in plan.items() if key not in ("fingerprint", "channel_fingerprints")}
+    return json.loads(json.dumps(plan))
+
+
+def check_equivalent(parsed, plans, before_plans=None):
+    expected = [comparable(dict_material_plan(name, record.as_dict())) for name, record in parsed.items()]
+    if [comparable(plan) for plan in plans] != expected:
+        raise AssertionError("MaterialRecord plans differ from the property dict path")
+    if before_plans is not None and [comparable(plan) for plan in before_plans] != expected:
+        raise AssertionError("plans differ from the --before version")
+
+
+def measure(module, path):
+    """先在 tracemalloc 下解析一次统计内存，再不带 tracemalloc 计时。"""
+    gc.collect()
+    tracemalloc.start()
+    parsed = module.parse_material_info(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del parsed
+
+    gc.collect()
+    start = time.perf_counter()
+    parsed = module.parse_material_info(path)
+    parse_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plans = module.plan_materials(parsed)
+    plan_s = time.perf_counter() - start
+
+    bpy.reset()
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module.apply_material_plans(plans)
+    apply_s = time.perf_counter() - start
+    return {
+        "materials": len(parsed),
+        "parse_s": parse_s,
+        "retained_mb": retained / 1048576.0,
+        "peak_mb": peak / 1048576.0,
+        "plan_s": plan_s,
+        "apply_s": apply_s,
+        "plans": plans,
+    }
+
+
+def run(materials=20000, before=None, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_model_")
+    modules = [("current", Blender_Omat)]
+    if before:
+        modules.insert(0, ("before", load_module(before)))
+    results = []
+    for export_format in FORMATS:
+        path = os.path.join(workdir, "octane_material_info." + export_format)
+        synthetic.write_export(path, materials, export_format=export_format, cache_dir=os.path.join(workdir, "gradients"))
+        measured = {}
+        for label, module in modules:
+            result = measured[label] = measure(module, path)
+            result.update(format=export_format, version=label)
+            results.append(result)
+        before = measured.pop("before", None)
+        check_equivalent(Blender_Omat.parse_material_info(path), measured["current"].pop("plans"),
+                         before and before.pop("plans"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=20000)
+    parser.add_argument("--before", help="another Blender_Omat.py to compare against")
+    args = parser.parse_args()
+
+    for result in run(args.materials, args.before):
+        print("  {format:<6} {version:<8} parse {parse_s:6.2f}s  retained {retained_mb:7.1f} MB  "
+              "peak {peak_mb:7.1f} MB  plan {plan_s:6.2f}s  apply {apply_s:6.2f}s".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+解析吞吐量基准：对比流式状态机解析器与原来的 readlines() 定长跳行解析器。
+
+    python benchmarks/bench_parse.py [--materials 1000 10000] [--repeat 5]
+
+输出 MB/s、materials/s 以及 tracemalloc 统计的峰值内存；耗时取 --repeat 次中最快的一次。
+另用不含 ColorCorrection 的导出检查两个解析器逐个材质的结果相同（旧解析器按固定行数
+处理 ColorCorrection，会把嵌套着色器的字段记到通道上，这正是替换它的原因）。
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import _paths  # noqa: F401
+import Blender_Omat
+import synthetic
+
+
+def legacy_parse_material_info(file_path, assignments=None):
+    """原 parse_material_info 的实现（整文件读入、按固定行数跳过ColorCorrection），作为对照。"""
+    materials = {}
+    current_material = None
+    current_shader = None
+    color_correction_skip = False  # 跳过标志
+    in_assignments = False
+
+    with open(file_path, 'r', encoding='utf-8') as file:
+        lines = file.readlines()
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+
+            # 对象-材质对应关系段
+            if line == "Material Assignments:":
+                in_assignments = True
+                current_material = None
+            elif in_assignments:
+                if line == "#####":
+                    in_assignments = False
+                elif line.startswith("Assignment:") and assignments is not None:
+                    assignments.append(Blender_Omat.parse_assignment(line))
+            # 匹配Material行
+            elif line.startswith("Material Name:"):
+                current_material = line.split(":", 1)[1].strip()
+                materials[current_material] = {}
+                current_shader = None
+                color_correction_skip = False
+            elif current_material:
+                if ": " in line:
+                    key, value = line.split(":", 1)
+                    key = key.strip()
+                    value = value.strip()
+
+                    if 'Link' in key:
+                        current_shader = key.split()[0]
+                        materials[current_material][key] = value
+                    elif current_shader and (key.startswith('Shader Name') or key.startswith('Shader Type') or key.startswith('Image Texture') or key.startswith('Gradient') or key.startswith('Color')):
+                        materials[current_material][f"{current_shader} {key}"] = value
+                    else:
+                        materials[current_material][key] = value
+
+                    # 检查ColorCorrection节点，如果匹配则向下跳4行获取ImageTexture、颜色或向下跳9行获取渐变信息
+                    if line.startswith("Shader Name: ColorCorrection"):
+                        color_correction_skip = True
+                        i += 4  # 跳过4行获取ImageTexture或颜色信息
+                        texture_line = lines[i].strip()
+
+                        # 如果存在ImageTexture节点
+                        if texture_line.startswith("Image Texture File:"):
+                            image_texture_file = texture_line.split(":", 1)[1].strip()
+                            materials[current_material][f"{current_shader} Image Texture File"] = image_texture_file
+                        # 否则尝试解析颜色信息
+                        elif texture_line.startswith("Color:"):
+                            color_value = texture_line.split(":", 1)[1].strip()
+                            materials[current_material][f"{current_shader} Color (Link)"] = color_value
+                        # 如果存在渐变，则向下跳9行
+                        elif texture_line.startswith("Gradient:"):
+                            i += 9  # 跳过9行获取渐变信息
+                            gradient_value_line = lines[i].strip()
+                            if gradient_value_line.startswith("Gradient Image Path:"):
+                                gradient_path = gradient_value_line.split(":", 1)[1].strip()
+                                materials[current_material][f"{current_shader} Gradient Image Path"] = gradient_path
+
+                        color_correction_skip = False
+                        i += 1  # 移动到下一个有效行继续解析
+                        continue
+
+                elif color_correction_skip:
+                    # 检查当前行是否包含ImageTexture、颜色或渐变的文件路径
+                    if line.startswith("Image Texture File:"):
+                        materials[current_material][f"{current_shader} Image Texture File"] = line.split(":", 1)[1].strip()
+                    elif line.startswith("Color:"):
+                        materials[current_material][f"{current_shader} Color (Link)"] = line.split(":", 1)[1].strip()
+                    elif line.startswith("Gradient Image Path:"):
+                        materials[current_material][f"{current_shader} Gradient Image Path"] = line.split(":", 1)[1].strip()
+                    color_correction_skip = False
+
+            i += 1
+
+    return materials
+
+
+def legacy_records(materials):
+    """
+    把旧解析器的属性字典转换为 MaterialRecord，以便与流式解析器比较。旧解析器把 "Object Name" 等
+    头部字段记在前一个材质上（第一个材质的头部丢失），这里移到它们之后的材质；色标数据仍是JSON字符串。
+    """
+    records = {}
+    header = {}
+    for name, properties in materials.items():
+        record = records[name] = Blender_Omat.MaterialRecord(name)
+        for key, value in header.items():
+            record.set_extra(key, value)
+        header = {}
+        for key, value in properties.items():
+            if key in Blender_Omat.MATERIAL_HEADER_KEYS:
+                header[key] = value
+            else:
+                record.set(key, json.loads(value) if key.endswith("Gradient Ramp") else value)
+    return records
+
+
+def check_equivalent(file_path):
+    streaming = Blender_Omat.parse_material_info(file_path)
+    legacy = legacy_records(legacy_parse_material_info(file_path))
+    # 第一个材质的头部字段旧解析器没有记录
+    first = next(iter(streaming.values()))
+    for key in Blender_Omat.MATERIAL_HEADER_KEYS:
+        first.extra.pop(key, None)
+    if list(streaming) != list(legacy):
+        raise AssertionError("parsers found different materials")
+    for name, record in streaming.items():
+        if record != legacy[name]:
+            raise AssertionError("parsers disagree on {}".format(name))
+
+
+def streaming_parse(file_path):
+    count = 0
+    for _ in Blender_Omat.iter_material_info(file_path):
+        count += 1
+    return count
+
+
+def legacy_parse(file_path):
+    return len(legacy_parse_material_info(file_path))
+
+
+def measure(parse, file_path, repeat=5):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = parse(file_path)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size_mb = os.path.getsize(file_path) / (1024.0 * 1024.0)
+    return {
+        "materials": count,
+        "seconds": elapsed,
+        "mb_per_s": size_mb / elapsed if elapsed else float("inf"),
+        "materials_per_s": count / elapsed if elapsed else float("inf"),
+        "peak_mb": peak / (1024.0 * 1024.0),
+    }
+
+
+def run(sizes=(1000, 10000), repeat=5, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_parse_")
+    results = []
+    for materials in sizes:
+        path = os.path.join(workdir, "octane_material_info_{}.txt".format(materials))
+        synthetic.write_export(path, materials)
+        plain_path = os.path.join(workdir, "octane_material_info_{}_plain.txt".format(materials))
+        synthetic.write_export(plain_path, materials, color_corrections=0.0)
+        check_equivalent(plain_path)
+        results.append({
+            "size": materials,
+            "file_mb": os.path.getsize(path) / (1024.0 * 1024.0),
+            "legacy": measure(legacy_parse, path, repeat),
+            "streaming": measure(streaming_parse, path, repeat),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for result in run(args.materials, args.repeat):
+        print("{size} materials ({file_mb:.1f} MB)".format(**result))
+        for name in ("legacy", "streaming"):
+            print("  {:<9}  {mb_per_s:7.1f} MB/s  {materials_per_s:9.0f} materials/s  peak {peak_mb:6.2f} MB".format(
+                name, **result[name]))
+
+
+if __name__ == "__main__":
+    main()
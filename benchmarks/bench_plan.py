@@ -0,0 +1,97 @@
+"""
+材质计划批量转换基准：用 Blender_Omat.convert_exports 的进程池把多个镜头的导出文件转换为计划文件。
+
+    python benchmarks/bench_plan.py [--shots 16] [--materials 2000] [--workers 4]
+
+每个镜头一个子目录，导出文件名相同，计划文件写在 --output 目录中相同的相对位置。
+先用1个进程、再用 --workers 个进程转换；最后在 bpy 替身上分别从导出文件和计划文件导入
+第一个镜头，比较节点树是否一致，以及主线程上解析和生成计划的耗时。
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+from bench_apply import snapshot
+
+
+def write_shots(workdir, shots, materials):
+    root = os.path.join(workdir, "shots")
+    for shot in range(shots):
+        shot_dir = os.path.join(root, "shot_{:03d}".format(shot))
+        os.makedirs(shot_dir)
+        synthetic.write_export(os.path.join(shot_dir, "octane_material_info.jsonl"), materials,
+                               export_format="jsonl", seed=shot, cache_dir=os.path.join(workdir, "gradients"))
+    return root
+
+
+def convert(root, output_dir, workers):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        converted, failed = Blender_Omat.convert_exports([root], output_dir, workers)
+    if failed:
+        raise AssertionError("conversion failed: {}".format(failed))
+    return time.perf_counter() - start, converted
+
+
+def import_file(path):
+    bpy.reset()
+    job = Blender_Omat.ImportJob(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        job.run()
+    stages = job.session.stats.stages
+    return stages.get("parse", 0.0) + stages.get("plan", 0.0), {mat.name: snapshot(mat) for mat in bpy.data.materials}
+
+
+def run(shots=16, materials=2000, workers=Blender_Omat.PLAN_WORKERS, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_plan_")
+    root = write_shots(workdir, shots, materials)
+    output_dir = os.path.join(workdir, "plans")
+
+    serial_s, _ = convert(root, output_dir, 1)
+    parallel_s, converted = convert(root, output_dir, workers)
+
+    export_path = os.path.join(root, "shot_000", "octane_material_info.jsonl")
+    export_s, from_export = import_file(export_path)
+    plan_s, from_plan = import_file(converted[export_path][0])
+    if from_export != from_plan:
+        raise AssertionError("importing the plan built different node trees")
+
+    return {
+        "shots": shots,
+        "materials": materials,
+        "workers": workers,
+        "cpus": os.cpu_count(),
+        "serial_s": serial_s,
+        "parallel_s": parallel_s,
+        "export_s": export_s,
+        "plan_s": plan_s,
+        "export_mb": os.path.getsize(export_path) / 1048576.0,
+        "plan_mb": os.path.getsize(converted[export_path][0]) / 1048576.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shots", type=int, default=16)
+    parser.add_argument("--materials", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=Blender_Omat.PLAN_WORKERS)
+    args = parser.parse_args()
+
+    result = run(args.shots, args.materials, args.workers)
+    print("{shots} shots x {materials} materials, {workers} workers on {cpus} CPUs".format(**result))
+    print("  convert  1 process   {serial_s:7.2f}s".format(**result))
+    print("  convert  {workers} processes {parallel_s:7.2f}s  ({speedup:.1f}x)".format(
+        speedup=result["serial_s"] / result["parallel_s"], **result))
+    print("  import shot_000: parse + plan {export_s:.3f}s from export ({export_mb:.1f} MB), "
+          "{plan_s:.3f}s from plan ({plan_mb:.1f} MB), identical node trees".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+贴图预取基准：在模拟慢速目录（网络共享盘）上对比主线程逐个检查贴图与线程池预取。
+
+    python benchmarks/bench_prefetch.py [--materials 500] [--textures 200] [--latency-ms 5]
+
+--latency-ms 为贴图目录下每次文件系统操作（exists、realpath、open）注入的延迟。
+两种方式生成的节点树会逐一比对。
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+from bench_apply import snapshot
+
+
+def write_png_header(path, width, height):
+    """只写 PNG 签名和 IHDR 块，足够让文件头读取得到尺寸。"""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr)
+        file.write(struct.pack(">I", zlib.crc32(b"IHDR" + ihdr)))
+
+
+@contextlib.contextmanager
+def slow_directory(root, latency):
+    """给 root 下路径的 exists / realpath / open 注入延迟，模拟远程存储。"""
+    exists, realpath, open_ = os.path.exists, os.path.realpath, builtins.open
+
+    def slow(func):
+        def wrapper(path, *args, **kwargs):
+            if isinstance(path, str) and path.startswith(root):
+                time.sleep(latency)
+            return func(path, *args, **kwargs)
+        return wrapper
+
+    os.path.exists, os.path.realpath, Blender_Omat.open = slow(exists), slow(realpath), slow(open_)
+    try:
+        yield
+    finally:
+        os.path.exists, os.path.realpath = exists, realpath
+        del Blender_Omat.open
+
+
+def apply(materials, prefetch):
+    bpy.reset()
+    session = Blender_Omat.ImportSession()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        plans = Blender_Omat.plan_materials(materials)
+        if prefetch:
+            session.prefetch(plans)
+        Blender_Omat.apply_material_plans(plans, session)
+    elapsed = time.perf_counter() - start
+    return elapsed, session, {mat.name: snapshot(mat) for mat in bpy.data.materials}
+
+
+def run(materials=500, textures=200, latency_ms=5.0, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_prefetch_")
+    texture_dir = os.path.join(workdir, "textures")
+    os.makedirs(texture_dir)
+    # 一半贴图缺失，缺失的路径同样要付出一次延迟
+    for i in range(0, textures, 2):
+        write_png_header(os.path.join(texture_dir, "tex_{:05d}.png".format(i)), 2048, 1024)
+
+    path = os.path.join(workdir, "octane_material_info.jsonl")
+    synthetic.write_export(path, materials, export_format="jsonl", texture_dir=texture_dir, texture_pool=textures,
+                           cache_dir=os.path.join(workdir, "gradients"))
+    parsed = Blender_Omat.parse_material_info(path)
+
+    with slow_directory(texture_dir, latency_ms / 1000.0):
+        serial_s, _, serial = apply(parsed, prefetch=False)
+        prefetch_s, session, prefetched = apply(parsed, prefetch=True)
+
+    if serial != prefetched:
+        raise AssertionError("prefetched import differs from serial import")
+
+    infos = session.images.prefetched.values()
+    return {
+        "materials": len(parsed),
+        "paths": len(infos),
+        "missing": sum(1 for info in infos if not info.exists),
+        "headers": sum(1 for info in infos if info.width),
+        "serial_s": serial_s,
+        "prefetch_s": prefetch_s,
+        "prefetch_stage_s": session.stats.stages["prefetch"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=500)
+    parser.add_argument("--textures", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.textures, args.latency_ms)
+    print("{materials} materials, {paths} texture paths ({missing} missing, {headers} headers read), "
+          "identical node trees".format(**result))
+    print("  serial    {serial_s:7.2f}s".format(**result))
+    print("  prefetch  {prefetch_s:7.2f}s  (prefetch stage {prefetch_stage_s:.2f}s)".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+代理贴图基准：在进程池中为大贴图生成缩小的副本，再次导入时从缓存复用，并统计节省的像素内存。
+
+    python benchmarks/bench_proxy.py [--textures 8] [--resolution 2048] [--size 1024] [--workers 4]
+
+贴图是真实的8位RGBA PNG（行过滤交替使用 None 和 Up）。没有 OpenImageIO / PIL 时
+由 Blender_Omat 的纯Python后备缩放，耗时远高于Blender中的实际情况。
+导入后检查所有图像节点都指向代理，切换到原图后都指向原图。
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import operator
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+
+
+def write_texture(path, resolution, seed):
+    """写 resolution x resolution 的RGBA PNG，奇数行用 Up 过滤。"""
+    stride = resolution * 4
+    base = bytes((x * 7 + seed * 31) & 255 for x in range(stride + 256))
+    compressor = Blender_Omat.zlib.compressobj(6)
+    chunks = []
+    prev = bytes(stride)
+    for y in range(resolution):
+        row = base[y % 256:y % 256 + stride]
+        if y % 2:
+            chunks.append(compressor.compress(b"\x02" + bytes(map(operator.and_, map(operator.sub, row, prev),
+                                                                   itertools.repeat(255)))))
+        else:
+            chunks.append(compressor.compress(b"\x00" + row))
+        prev = row
+    chunks.append(compressor.flush())
+    header = Blender_Omat.struct.pack(">IIBBBBB", resolution, resolution, 8, 6, 0, 0, 0)
+    with open(path, "wb") as file:
+        file.write(Blender_Omat.PNG_SIGNATURE + Blender_Omat.png_chunk(b"IHDR", header)
+                   + Blender_Omat.png_chunk(b"IDAT", b"".join(chunks)) + Blender_Omat.png_chunk(b"IEND", b""))
+
+
+def import_with_proxies(materials, size, cache_dir, workers):
+    bpy.reset()
+    session = Blender_Omat.ImportSession(proxy_size=size)
+    session.proxies = Blender_Omat.TextureProxyCache(size, cache_dir, workers=workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        plans = Blender_Omat.plan_materials(materials)
+        session.prefetch(plans)
+        session.images.proxies.update(session.build_proxies())
+        Blender_Omat.apply_material_plans(plans, session)
+    return time.perf_counter() - start, session
+
+
+def pixel_bytes(paths):
+    total = 0
+    for path in paths:
+        _, width, height, channels = Blender_Omat.read_image_header(path)
+        total += width * height * channels
+    return total
+
+
+def run(materials=200, textures=8, resolution=2048, size=1024, workers=Blender_Omat.PROXY_WORKERS, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_proxy_")
+    texture_dir = os.path.join(workdir, "textures")
+    cache_dir = os.path.join(workdir, "proxies")
+    os.makedirs(texture_dir)
+    for i in range(textures):
+        write_texture(os.path.join(texture_dir, "tex_{:05d}.png".format(i)), resolution, i)
+
+    path = os.path.join(workdir, "octane_material_info.jsonl")
+    synthetic.write_export(path, materials, export_format="jsonl", texture_dir=texture_dir, texture_pool=textures,
+                           textures=0.9, cache_dir=os.path.join(workdir, "gradients"))
+    parsed = Blender_Omat.parse_material_info(path)
+
+    cold_s, cold = import_with_proxies(parsed, size, cache_dir, workers)
+    warm_s, warm = import_with_proxies(parsed, size, cache_dir, workers)
+
+    images = [img for img in bpy.data.images if Blender_Omat.PROXY_SOURCE_PROPERTY in img]
+    if not images or any(img.filepath != img[Blender_Omat.PROXY_PATH_PROPERTY] for img in images):
+        raise AssertionError("image nodes do not point at proxies")
+    switched = Blender_Omat.set_texture_resolution(True)
+    if any(img.filepath != img[Blender_Omat.PROXY_SOURCE_PROPERTY] for img in images):
+        raise AssertionError("switch to full resolution missed images")
+
+    return {
+        "materials": len(parsed),
+        "textures": textures,
+        "resolution": resolution,
+        "size": size,
+        "workers": workers,
+        "cold_s": cold_s,
+        "cold_proxy_s": cold.stats.stages["proxies"],
+        "generated": cold.proxies.generated,
+        "warm_s": warm_s,
+        "warm_proxy_s": warm.stats.stages["proxies"],
+        "reused": warm.proxies.reused,
+        "images": len(images),
+        "switched": switched,
+        "full_mb": pixel_bytes(img[Blender_Omat.PROXY_SOURCE_PROPERTY] for img in images) / 1048576.0,
+        "proxy_mb": pixel_bytes(img[Blender_Omat.PROXY_PATH_PROPERTY] for img in images) / 1048576.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=200)
+    parser.add_argument("--textures", type=int, default=8)
+    parser.add_argument("--resolution", type=int, default=2048)
+    parser.add_argument("--size", type=int, default=1024, choices=Blender_Omat.TEXTURE_PROXY_SIZES)
+    parser.add_argument("--workers", type=int, default=Blender_Omat.PROXY_WORKERS)
+    args = parser.parse_args()
+    if args.resolution <= args.size:
+        parser.error("--resolution must be larger than --size, smaller textures are kept at full size")
+
+    result = run(args.materials, args.textures, args.resolution, args.size, args.workers)
+    print("{materials} materials, {textures} textures at {resolution}px -> {size}px proxies, "
+          "{workers} worker processes".format(**result))
+    print("  cold import  {cold_s:7.2f}s  (proxies {cold_proxy_s:.2f}s, {generated} generated)".format(**result))
+    print("  warm import  {warm_s:7.2f}s  (proxies {warm_proxy_s:.2f}s, {reused} reused)".format(**result))
+    print("  pixel memory {full_mb:7.1f} MB full resolution -> {proxy_mb:.1f} MB proxies "
+          "({images} images, {switched} switched back to full resolution)".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+重新导入基准：先导入一批材质，修改其中的通道后在同一个 bpy 替身会话中再次导入，与全新导入比较。
+
+    python benchmarks/bench_reimport.py [--materials 2000]
+
+每个材质按下标轮流使用 EDITS 中的一种修改：增删 Normal / Bump（两者都接到 Principled 的 Normal 输入）、
+去掉或加上 Opacity（决定混合模式）、改为 Specular 类型（影响 Transmission）以及修改 Roughness。
+检查重新导入后每个材质的连线、输入默认值、图像和混合模式与直接导入修改后记录的结果相同。
+"""
+import argparse
+import contextlib
+import copy
+import io
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+
+Channel = Blender_Omat.Channel
+
+
+def texture_channel(path):
+    record = Blender_Omat.ChannelRecord()
+    record.image = path
+    return record
+
+
+def value_channel(value):
+    record = Blender_Omat.ChannelRecord()
+    record.float = value
+    return record
+
+
+def set_channels(**channels):
+    def edit(material, textures):
+        for name, kind in channels.items():
+            index = Channel[name.upper()]
+            if kind is None:
+                material.channels[index] = None
+            elif kind == 'texture':
+                material.channels[index] = texture_channel(textures[(index + len(material.name)) % len(textures)])
+            else:
+                material.channels[index] = value_channel(kind)
+    return edit
+
+
+def set_type(type_name):
+    def edit(material, textures):
+        material.extra['Type'] = type_name
+    return edit
+
+
+# (导入前, 修改后)：导入前的记录先按第一项调整，再按第二项修改后重新导入
+EDITS = [
+    (set_channels(normal='texture', bump='texture'), set_channels(bump=None)),
+    (set_channels(normal='texture', bump='texture'), set_channels(normal=None)),
+    (set_channels(normal='texture', bump='texture'), set_channels(normal=None, bump=None)),
+    (set_channels(normal='texture', bump=None), set_channels(bump='texture')),
+    (set_channels(normal=None, bump='texture'), set_channels(normal='texture')),
+    (set_channels(normal='texture', bump='texture'), set_channels(roughness=0.25)),
+    (set_channels(opacity=0.5), set_channels(opacity=None)),
+    (set_channels(opacity=None), set_channels(opacity=0.5)),
+    (set_type("Glossy"), set_type("Specular")),
+    (set_type("Specular"), set_type("Glossy")),
+]
+
+
+def edited(materials, step, textures):
+    """materials 的副本，第 i 个材质按 EDITS[i % len(EDITS)] 的前 step+1 项修改。"""
+    result = {}
+    for i, (name, material) in enumerate(materials.items()):
+        material = copy.deepcopy(material)
+        for edit in EDITS[i % len(EDITS)][:step + 1]:
+            edit(material, textures)
+        result[name] = material
+    return result
+
+
+def node_state(mat):
+    """节点树中与位置无关的部分：节点、连线、输入默认值、图像，以及混合和阴影模式。"""
+    tree = mat.node_tree
+    nodes = sorted(
+        (node.name, node.type, node.image.filepath if node.image else None,
+         tuple(repr(socket.default_value) for socket in node.inputs))
+        for node in tree.nodes)
+    links = sorted((l.from_node.name, l.from_socket.name, l.to_node.name, l.to_socket.name) for l in tree.links)
+    return nodes, links, mat.blend_method, mat.shadow_method
+
+
+def apply(materials):
+    session = Blender_Omat.ImportSession()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        Blender_Omat.apply_material_properties(materials, "", session)
+    return time.perf_counter() - start, session
+
+
+def run(materials=2000, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_reimport_")
+    texture_dir = os.path.join(workdir, "textures")
+    os.makedirs(texture_dir)
+    textures = [os.path.join(texture_dir, "tex_{:05d}.png".format(i)) for i in range(50)]
+    for texture in textures:
+        open(texture, "wb").close()
+
+    path = os.path.join(workdir, "octane_material_info.jsonl")
+    synthetic.write_export(path, materials, export_format="jsonl", texture_dir=texture_dir, texture_pool=50,
+                           cache_dir=os.path.join(workdir, "gradients"))
+    parsed = Blender_Omat.parse_material_info(path)
+    before, after = edited(parsed, 0, textures), edited(parsed, 1, textures)
+
+    bpy.reset()
+    initial_s, _ = apply(before)
+    reimport_s, session = apply(after)
+    reimported = {mat.name: node_state(mat) for mat in bpy.data.materials}
+    if session.updated != len(after):
+        raise AssertionError("{} of {} edited materials were updated".format(session.updated, len(after)))
+
+    bpy.reset()
+    fresh_s, _ = apply(after)
+    for mat in bpy.data.materials:
+        if node_state(mat) != reimported[mat.name]:
+            raise AssertionError("re-imported {} differs from a fresh import".format(mat.name))
+
+    return {
+        "materials": len(parsed),
+        "edits": len(EDITS),
+        "initial_s": initial_s,
+        "reimport_s": reimport_s,
+        "fresh_s": fresh_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = run(args.materials)
+    print("{materials} materials, {edits} kinds of edits, re-imported node trees match a fresh import".format(**result))
+    print("  initial import   {initial_s:7.3f}s".format(**result))
+    print("  re-import        {reimport_s:7.3f}s".format(**result))
+    print("  fresh import     {fresh_s:7.3f}s".format(**result))
+
+
+if __name__ == "__main__":
+    main()
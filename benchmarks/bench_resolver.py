@@ -0,0 +1,130 @@
+"""
+贴图重定位基准：导出中的贴图路径在本机不存在（C4D 那边的 Windows 路径），由 Blender_Omat.TextureResolver
+在搜索目录中按文件名找到替代文件。
+
+    python benchmarks/bench_resolver.py [--materials 2000] [--textures 400] [--decoys 20000]
+
+搜索目录中贴图分散在多个子目录里，另有 --decoys 个无关文件。每10个贴图中有一个在另一个目录中有同名文件
+（应选末尾目录与原路径相同的一个），一个不存在；代理贴图缓存目录中有所有贴图的同名文件，不能被选中。
+检查：贴图都存在时导入不建立索引；找到的文件、没找到的贴图和选中的候选都符合预期；
+第二次导入使用缓存的索引，不重新扫描。
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+
+C4D_TEXTURE_DIR = "C:\\Projects\\Shot\\textures"
+
+
+def touch(path):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    open(path, "wb").close()
+
+
+def build_library(root, textures, decoys):
+    """写搜索目录，返回 {小写文件名: 应找到的路径}（不存在的贴图不在其中）。"""
+    expected = {}
+    for i in range(textures):
+        name = "tex_{:05d}.png".format(i)
+        if i % 10 == 9:
+            touch(os.path.join(root, "proxies", name))  # 只有代理缓存中有，不能用
+            continue
+        path = os.path.join(root, "set_{}".format(i % 4), "textures", name)
+        touch(path)
+        expected[name] = path
+        if i % 10 == 0:
+            touch(os.path.join(root, "archive", "old", name))  # 同名但末尾目录不同
+        touch(os.path.join(root, "proxies", name))
+    for i in range(decoys):
+        touch(os.path.join(root, "decoys", "d{:02d}".format(i % 50), "decoy_{:06d}.png".format(i)))
+    return expected
+
+
+def import_job(path, search_roots, index_path):
+    bpy.reset()
+    job = Blender_Omat.ImportJob(path, search_roots)
+    resolver = job.session.resolver
+    resolver.index_path = index_path
+    resolver.excluded = [os.path.realpath(os.path.join(root, "proxies")) for root in search_roots]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        job.run()
+        job.finish()
+    return time.perf_counter() - start, resolver
+
+
+def run(materials=2000, textures=400, decoys=20000, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_resolver_")
+    library = os.path.realpath(os.path.join(workdir, "library"))
+    expected = build_library(library, textures, decoys)
+    # 与默认设置一样，索引写在导出目录中，而导出目录本身也是搜索目录
+    export_dir = os.path.join(workdir, "exports")
+    os.makedirs(export_dir)
+    index_path = os.path.join(export_dir, "texture_index.json")
+
+    # 贴图路径都存在：不需要索引
+    local = os.path.join(export_dir, "local.jsonl")
+    synthetic.write_export(local, materials, export_format="jsonl", texture_dir=os.path.join(library, "set_0", "textures"),
+                           texture_pool=1, cache_dir=os.path.join(workdir, "gradients"))
+    local_s, resolver = import_job(local, [library], index_path)
+    if resolver.index is not None or os.path.exists(index_path):
+        raise AssertionError("texture index built although every texture exists")
+
+    path = os.path.join(export_dir, "relocated.jsonl")
+    synthetic.write_export(path, materials, export_format="jsonl", texture_dir=C4D_TEXTURE_DIR, texture_pool=textures,
+                           cache_dir=os.path.join(workdir, "gradients"))
+    results = {"materials": materials, "textures": textures, "decoys": decoys, "local_s": local_s}
+    for label in ("cold", "cached"):
+        seconds, resolver = import_job(path, [library], index_path)
+        if resolver.index is None:
+            raise AssertionError("texture index was not built")
+        if (label == "cached") != (not resolver.rescanned):
+            raise AssertionError("{} import rescanned {}".format(label, resolver.rescanned))
+        for original, found in resolver.resolved.items():
+            if found != expected.get(Blender_Omat.texture_basename(original)):
+                raise AssertionError("{} resolved to {}".format(original, found))
+        for original in resolver.unresolved:
+            if Blender_Omat.texture_basename(original) in expected:
+                raise AssertionError("{} was not resolved".format(original))
+        if not resolver.resolved or not resolver.unresolved or not resolver.ambiguous:
+            raise AssertionError("export did not cover found, missing and ambiguous textures")
+        for img in bpy.data.images:
+            if img.filepath not in expected.values() and not img.filepath.startswith(os.path.join(workdir, "gradients")):
+                raise AssertionError("image loaded from {}".format(img.filepath))
+        results[label] = {
+            "seconds": seconds,
+            "index_s": resolver.index_seconds,
+            "resolved": len(resolver.resolved),
+            "ambiguous": len(resolver.ambiguous),
+            "unresolved": len(resolver.unresolved),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    parser.add_argument("--textures", type=int, default=400)
+    parser.add_argument("--decoys", type=int, default=20000)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.textures, args.decoys)
+    print("{materials} materials, {textures} textures, {decoys} other files in the search root".format(**result))
+    print("  all textures present  {local_s:7.3f}s  no index built".format(**result))
+    for label in ("cold", "cached"):
+        print("  {:<6} index          {seconds:7.3f}s  index {index_s:.3f}s, {resolved} relocated "
+              "({ambiguous} ambiguous), {unresolved} not found".format(label, **result[label]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+着色器图遍历基准：深的 ColorCorrection 链和被大量通道、材质共享的着色器，使用 c4d 替身。
+
+    python benchmarks/bench_shader_graph.py [--materials 2000] [--depth 20] [--shared 16]
+
+对比原来逐通道递归的 GetShaderInfo / GetShaderRecord 与 ShaderCache：
+导出耗时、参数读取次数和文件大小，并检查 Blender 端解析结果一致。
+另外验证超出递归深度的长链和环都能导出。
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import c4d
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+CHANNEL_LINKS = ("OCT_MATERIAL_DIFFUSE_LINK", "OCT_MATERIAL_ROUGHNESS_LINK", "OCT_MATERIAL_BUMP_LINK")
+
+
+def legacy_get_shader_record(shader, obj_name, material_name, channel_name):
+    """原 GetShaderRecord：每次调用都重新读取参数，递归进入 ColorCorrection 的输入。"""
+    shader_name = shader.GetName()
+    shader_type = shader.GetType()
+    record = {"name": shader_name, "type": shader_type}
+    if shader_type == synthetic.SHADER_GRADIENT:
+        path = Cinema_Omat.save_gradient_image(shader[c4d.SLA_GRADIENT_GRADIENT], obj_name, material_name, channel_name)
+        if path:
+            record["gradient_image"] = path
+    elif shader_type == synthetic.SHADER_COLOR:
+        record["color"] = Cinema_Omat.PlainValue(shader[c4d.COLORSHADER_COLOR])
+    elif shader_type == synthetic.SHADER_IMAGE:
+        record["image"] = Cinema_Omat.PlainValue(shader[c4d.IMAGETEXTURE_FILE])
+    if shader_name == "ColorCorrection":
+        link_shader = shader[c4d.COLORCOR_TEXTURE_LNK]
+        if isinstance(link_shader, c4d.BaseShader):
+            record["input"] = legacy_get_shader_record(link_shader, obj_name, material_name, "ColorCorrection_Link")
+    return record
+
+
+@contextlib.contextmanager
+def legacy_traversal():
+    original = Cinema_Omat.GetShaderRecord, Cinema_Omat.ShaderReferences
+    Cinema_Omat.GetShaderRecord = legacy_get_shader_record
+    Cinema_Omat.ShaderReferences = lambda record, emitted, write: record
+    try:
+        yield
+    finally:
+        Cinema_Omat.GetShaderRecord, Cinema_Omat.ShaderReferences = original
+
+
+def color_correction_chain(depth, leaf):
+    shader = leaf
+    for _ in range(depth):
+        shader = synthetic.make_shader(synthetic.SHADER_COLOR_CORRECTION, "ColorCorrection", COLORCOR_TEXTURE_LNK=shader)
+    return shader
+
+
+def build_scene(materials, depth, shared):
+    """每个材质的 Diffuse、Roughness 和 Bump 都链接到 shared 个共享的深链之一。"""
+    objects, mats = synthetic.build_scene(materials)
+    builder = synthetic.SceneBuilder(seed=1)
+    pool = [color_correction_chain(depth, builder.image_shader()) for _ in range(shared)]
+    for index, mat in enumerate(mats):
+        for offset, param in enumerate(CHANNEL_LINKS):
+            mat[getattr(c4d, param)] = pool[(index + offset) % shared]
+    return objects
+
+
+def export(objects, path, export_format):
+    c4d.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        Cinema_Omat.ExportMaterials(objects, path, export_format)
+    return {
+        "seconds": time.perf_counter() - start,
+        "param_gets": c4d.call_counts["param.get"],
+        "bytes": os.path.getsize(path),
+    }
+
+
+def run(materials=2000, depth=20, shared=16, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_shader_graph_")
+    Cinema_Omat.gradient_cache = Cinema_Omat.GradientCache(os.path.join(workdir, "gradients"))
+    objects = build_scene(materials, depth, shared)
+    results = {}
+
+    legacy_path = os.path.join(workdir, "legacy.jsonl")
+    with legacy_traversal():
+        results["legacy"] = export(objects, legacy_path, "jsonl")
+    cached_path = os.path.join(workdir, "cached.jsonl")
+    results["cached"] = export(objects, cached_path, "jsonl")
+    results["cached"]["cache"] = Cinema_Omat.shader_cache.Summary()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if Blender_Omat.parse_material_info(legacy_path) != Blender_Omat.parse_material_info(cached_path):
+            raise AssertionError("shader references change the imported materials")
+
+    # 远超递归深度的链，以及两个互相链接的 ColorCorrection
+    long_chain = os.path.join(workdir, "long_chain.jsonl")
+    deep = sys.getrecursionlimit() * 2
+    objects, mats = synthetic.build_scene(1)
+    mats[0][c4d.OCT_MATERIAL_DIFFUSE_LINK] = color_correction_chain(deep, synthetic.SceneBuilder().image_shader())
+    export(objects, long_chain, "jsonl")
+    first = synthetic.make_shader(synthetic.SHADER_COLOR_CORRECTION, "ColorCorrection")
+    second = synthetic.make_shader(synthetic.SHADER_COLOR_CORRECTION, "ColorCorrection", COLORCOR_TEXTURE_LNK=first)
+    first[c4d.COLORCOR_TEXTURE_LNK] = second
+    mats[0][c4d.OCT_MATERIAL_DIFFUSE_LINK] = first
+    cycle_paths = [os.path.join(workdir, "cycle." + export_format) for export_format in ("jsonl", "text")]
+    for path in cycle_paths:
+        export(objects, path, os.path.splitext(path)[1][1:])
+    with contextlib.redirect_stdout(io.StringIO()):
+        for path in [long_chain] + cycle_paths:
+            if len(Blender_Omat.parse_material_info(path)) != 1:
+                raise AssertionError("could not import " + os.path.basename(path))
+    results["long_chain_depth"] = deep
+    results["cycles"] = Cinema_Omat.shader_cache.cycles
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--shared", type=int, default=16)
+    args = parser.parse_args()
+
+    result = run(args.materials, args.depth, args.shared)
+    print("{} materials x {} channels, {} shared chains of depth {}, identical import".format(
+        args.materials, len(CHANNEL_LINKS), args.shared, args.depth))
+    for name in ("legacy", "cached"):
+        print("  {:<7} {seconds:7.2f}s  param.get={param_gets:<8} {bytes:>12,} bytes".format(name, **result[name]))
+    print("  " + result["cached"]["cache"])
+    print("chain of depth {long_chain_depth} exported and imported; cycle detected {cycles} time(s)".format(**result))
+
+
+if __name__ == "__main__":
+    main()
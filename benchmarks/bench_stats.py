@@ -0,0 +1,107 @@
+"""
+导入统计基准：Blender_Omat.main 不写报告，与写导入报告并开启 cProfile 的导入对比，使用 bpy 替身。
+
+    python benchmarks/bench_stats.py [--materials 2000]
+
+两次导入同一个导出文件（部分贴图缺失），检查节点树和图像完全相同，报告中的计数与 bpy 替身记录的
+RNA 调用次数（nodes.new、links.new、material.copy、images.load）和导入结果一致，各阶段耗时之和不超过总耗时。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import _paths  # noqa: F401
+import bpy
+import Blender_Omat
+import synthetic
+from bench_apply import snapshot
+
+
+def import_once(write_profile):
+    bpy.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        session = Blender_Omat.main(write_profile, write_profile)
+    elapsed = time.perf_counter() - start
+    state = {mat.name: snapshot(mat) for mat in bpy.data.materials}
+    images = sorted(img.filepath for img in bpy.data.images)
+    return elapsed, session, state, images, dict(bpy.call_counts)
+
+
+def run(materials=2000, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="omat_stats_")
+    texture_dir = os.path.join(workdir, "textures")
+    os.makedirs(texture_dir)
+    # 贴图池中每5个缺1个
+    for i in range(50):
+        if i % 5:
+            open(os.path.join(texture_dir, "tex_{:05d}.png".format(i)), "wb").close()
+    path = os.path.join(workdir, Blender_Omat.EXPORT_FILE_NAMES[0])
+    synthetic.write_export(path, materials, export_format="jsonl", texture_dir=texture_dir, texture_pool=50,
+                           cache_dir=os.path.join(workdir, "gradients"))
+
+    export_dir = Blender_Omat.EXPORT_DIR
+    Blender_Omat.EXPORT_DIR = workdir
+    try:
+        plain_s, _, plain_state, plain_images, _ = import_once(False)
+        profiled_s, session, state, images, calls = import_once(True)
+    finally:
+        Blender_Omat.EXPORT_DIR = export_dir
+
+    if state != plain_state or images != plain_images:
+        raise AssertionError("import with a profile differs from a plain import")
+    report_path = os.path.splitext(path)[0] + "_import_profile.json"
+    with open(report_path, encoding='utf-8') as f:
+        report = json.load(f)
+    if not os.path.exists(report["cprofile"]):
+        raise AssertionError("cProfile output missing")
+
+    counters = report["counters"]
+    # use_nodes 为每个逐个节点构建的材质先建好默认的两个节点和一条连线，导入器随后清空重建，不计入
+    built = len(state) - calls.get("material.copy", 0)
+    expected = {
+        "materials": len(state),
+        "nodes": calls.get("nodes.new", 0) - 2 * built,
+        "links": calls.get("links.new", 0) - built,
+        "template copies": calls.get("material.copy", 0),
+        "image loads": calls.get("images.load", 0),
+        "missing files": session.images.missing,
+    }
+    for name, value in expected.items():
+        if counters.get(name, 0) != value:
+            raise AssertionError("counter {}: {} reported, {} expected".format(name, counters.get(name), value))
+    if report["materials"]["created"] != len(state):
+        raise AssertionError("{} materials reported created".format(report["materials"]["created"]))
+    if not session.images.missing:
+        raise AssertionError("no missing textures counted")
+    if sum(report["stages"].values()) > profiled_s:
+        raise AssertionError("stage times exceed the import time")
+
+    return {
+        "materials": len(state),
+        "plain_s": plain_s,
+        "profiled_s": profiled_s,
+        "stages": report["stages"],
+        "counters": counters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = run(args.materials)
+    print("{materials} materials, identical node trees with and without a profile".format(**result))
+    print("  plain import          {plain_s:7.3f}s".format(**result))
+    print("  profile and cProfile  {profiled_s:7.3f}s".format(**result))
+    print("  stages   " + ", ".join("{} {:.3f}s".format(name, s) for name, s in result["stages"].items()))
+    print("  counters " + ", ".join("{} {}".format(value, name) for name, value in result["counters"].items()))
+
+
+if __name__ == "__main__":
+    main()
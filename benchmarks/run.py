@@ -0,0 +1,182 @@
+"""
+离线基准套件：在 c4d / bpy 替身上运行导出、解析、渐变烘焙和材质构建，
+记录耗时、峰值内存（tracemalloc）和调用次数，并与 JSON 基线比较。
+
+    python benchmarks/run.py                       # 默认规模 10 和 1000 个材质
+    python benchmarks/run.py --sizes 10 1000 100000
+    python benchmarks/run.py --update-baseline     # 把本次结果写成基线
+
+基线默认保存在 benchmarks/baseline.json（与机器相关，不提交）。存在基线时，
+耗时或峰值内存超过基线 (1 + tolerance) 倍、或任何调用次数增加，都算回归，退出码为 1。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import _paths
+import bpy
+import c4d
+import Blender_Omat
+import Cinema_Omat
+import synthetic
+
+DEFAULT_BASELINE = os.path.join(_paths.BENCH_DIR, "baseline.json")
+GRADIENT_SAMPLES = 50
+# 绝对值低于这些阈值的差异视为噪声
+MIN_SECONDS_DELTA = 0.05
+MIN_PEAK_MB_DELTA = 1.0
+
+
+def case_export(size, workdir):
+    objects, _ = synthetic.build_scene(size, texture_dir=os.path.join(workdir, "textures"))
+    path = os.path.join(workdir, "export_{}.jsonl".format(size))
+
+    def run():
+        Cinema_Omat.gradient_cache = Cinema_Omat.GradientCache(tempfile.mkdtemp(dir=workdir))
+        Cinema_Omat.ExportMaterials(objects, path, "jsonl")
+    return run
+
+
+def make_case_parse(export_format):
+    def case_parse(size, workdir):
+        path = os.path.join(workdir, "parse_{}.{}".format(size, export_format))
+        synthetic.write_export(path, size, export_format=export_format, cache_dir=os.path.join(workdir, "gradients"))
+        return lambda: Blender_Omat.parse_material_info(path)
+    return case_parse
+
+
+def case_gradient_bake(size, workdir):
+    builder = synthetic.SceneBuilder(gradient_pool=min(size, GRADIENT_SAMPLES))
+    gradients = builder.gradient_pool
+
+    def run():
+        for gradient in gradients:
+            Cinema_Omat.GradientToBitmap(gradient, Cinema_Omat.GRADIENT_RESOLUTION,
+                                         Cinema_Omat.GRADIENT_RESOLUTION, c4d.SLA_GRADIENT_TYPE_2D_U)
+    return run
+
+
+def case_apply(size, workdir):
+    texture_dir = os.path.join(workdir, "apply_textures_{}".format(size))
+    os.makedirs(texture_dir)
+    for i in range(50):
+        open(os.path.join(texture_dir, "tex_{:05d}.png".format(i)), "wb").close()
+    path = os.path.join(workdir, "apply_{}.jsonl".format(size))
+    synthetic.write_export(path, size, export_format="jsonl", texture_dir=texture_dir, texture_pool=50,
+                           cache_dir=os.path.join(workdir, "gradients"))
+    materials = Blender_Omat.parse_material_info(path)
+
+    def run():
+        bpy.reset()
+        Blender_Omat.apply_material_properties(materials, "")
+    return run
+
+
+CASES = {
+    "export": case_export,
+    "parse_text": make_case_parse("text"),
+    "parse_jsonl": make_case_parse("jsonl"),
+    "gradient_bake": case_gradient_bake,
+    "apply": case_apply,
+}
+
+
+def measure(run):
+    """运行两次：一次计时并统计调用次数，一次在 tracemalloc 下取峰值内存。"""
+    bpy.call_counts.clear()
+    c4d.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        calls = dict(bpy.call_counts)
+        calls.update(c4d.call_counts)
+
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {"seconds": seconds, "peak_mb": peak / (1024.0 * 1024.0), "calls": calls}
+
+
+def run_suite(sizes, cases=None):
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="omat_bench_")
+    for size in sizes:
+        for name in cases or CASES:
+            with contextlib.redirect_stdout(io.StringIO()):
+                run = CASES[name](size, workdir)
+            key = "{}@{}".format(name, size)
+            results[key] = measure(run)
+            print("  {:<22} {seconds:8.3f}s  peak {peak_mb:8.2f} MB  {n} calls".format(
+                key, n=sum(results[key]["calls"].values()), **results[key]))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """返回回归说明列表。"""
+    regressions = []
+    for key, base in sorted(baseline.get("results", {}).items()):
+        now = current["results"].get(key)
+        if now is None:
+            continue
+        if now["seconds"] > base["seconds"] * (1 + tolerance) and now["seconds"] - base["seconds"] > MIN_SECONDS_DELTA:
+            regressions.append("{}: time {:.3f}s -> {:.3f}s".format(key, base["seconds"], now["seconds"]))
+        if now["peak_mb"] > base["peak_mb"] * (1 + tolerance) and now["peak_mb"] - base["peak_mb"] > MIN_PEAK_MB_DELTA:
+            regressions.append("{}: peak memory {:.2f} MB -> {:.2f} MB".format(key, base["peak_mb"], now["peak_mb"]))
+        for call, count in sorted(now["calls"].items()):
+            if count > base["calls"].get(call, 0):
+                regressions.append("{}: {} calls {} -> {}".format(key, call, base["calls"].get(call, 0), count))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", help="write this run's results to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    current = run_suite(args.sizes, args.cases)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+        print("Baseline written to {}".format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at {}; run with --update-baseline to create one.".format(args.baseline))
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(current, baseline, args.tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    if not regressions:
+        print("No regressions against {}".format(args.baseline))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,583 @@
+"""
+Blender bpy 的替身模块，足以在Blender之外导入并运行 Blender_Omat。
+
+只模拟插件用到的数据结构（材质、节点树、图像），并在 call_counts 中记录
+nodes.new / links.new / images.load 等RNA调用的次数，供基准测试统计。
+"""
+import collections
+import copy as _copy
+import os
+import time
+import types as _types
+
+call_counts = collections.Counter()
+
+# 模拟每次RNA调用的开销（秒），基准测试可用 set_call_latency 设置
+call_latency = 0.0
+
+
+def set_call_latency(seconds):
+    global call_latency
+    call_latency = seconds
+
+
+def _rna_call(name):
+    call_counts[name] += 1
+    if call_latency:
+        end = time.perf_counter() + call_latency
+        while time.perf_counter() < end:
+            pass
+
+# 节点类型 -> (输入 [(名称, 类型)], 输出 [(名称, 类型)])
+PRINCIPLED_INPUTS = [
+    ("Base Color", "RGBA"), ("Metallic", "VALUE"), ("Roughness", "VALUE"), ("IOR", "VALUE"),
+    ("Alpha", "VALUE"), ("Normal", "VECTOR"), ("Weight", "VALUE"), ("Subsurface Weight", "VALUE"),
+    ("Subsurface Radius", "VECTOR"), ("Subsurface Scale", "VALUE"), ("Subsurface IOR", "VALUE"),
+    ("Subsurface Anisotropy", "VALUE"), ("Specular IOR Level", "VALUE"), ("Specular Tint", "RGBA"),
+    ("Anisotropic", "VALUE"), ("Anisotropic Rotation", "VALUE"), ("Tangent", "VECTOR"),
+    ("Transmission Weight", "VALUE"), ("Coat Weight", "VALUE"), ("Coat Roughness", "VALUE"),
+    ("Coat IOR", "VALUE"), ("Coat Tint", "RGBA"), ("Coat Normal", "VECTOR"), ("Sheen Weight", "VALUE"),
+    ("Sheen Roughness", "VALUE"), ("Sheen Tint", "RGBA"), ("Emission Color", "RGBA"),
+    ("Emission Strength", "VALUE"), ("Thin Film Thickness", "VALUE"), ("Thin Film IOR", "VALUE"),
+]
+
+NODE_SOCKETS = {
+    "ShaderNodeBsdfPrincipled": (PRINCIPLED_INPUTS, [("BSDF", "SHADER")]),
+    "ShaderNodeOutputMaterial": ([("Surface", "SHADER"), ("Volume", "SHADER"), ("Displacement", "VECTOR")], []),
+    "ShaderNodeTexImage": ([("Vector", "VECTOR")], [("Color", "RGBA"), ("Alpha", "VALUE")]),
+    "ShaderNodeNormalMap": ([("Strength", "VALUE"), ("Color", "RGBA")], [("Normal", "VECTOR")]),
+    "ShaderNodeBump": ([("Strength", "VALUE"), ("Distance", "VALUE"), ("Height", "VALUE"), ("Normal", "VECTOR")],
+                       [("Normal", "VECTOR")]),
+    "ShaderNodeValToRGB": ([("Fac", "VALUE")], [("Color", "RGBA"), ("Alpha", "VALUE")]),
+    "ShaderNodeTexCoord": ([], [("Generated", "VECTOR"), ("Normal", "VECTOR"), ("UV", "VECTOR"),
+                                ("Object", "VECTOR"), ("Camera", "VECTOR"), ("Window", "VECTOR"),
+                                ("Reflection", "VECTOR")]),
+    "ShaderNodeSeparateXYZ": ([("Vector", "VECTOR")], [("X", "VALUE"), ("Y", "VALUE"), ("Z", "VALUE")]),
+}
+
+DEFAULT_VALUES = {"RGBA": (0.8, 0.8, 0.8, 1.0), "VALUE": 0.0, "VECTOR": (0.0, 0.0, 0.0), "SHADER": None}
+
+
+class IDPropertyMixin(object):
+    """ID数据块的自定义属性（mat["key"] = value）。"""
+
+    def __getitem__(self, key):
+        return self._id_props[key]
+
+    def __setitem__(self, key, value):
+        self._id_props[key] = value
+
+    def __delitem__(self, key):
+        del self._id_props[key]
+
+    def __contains__(self, key):
+        return key in self._id_props
+
+    def get(self, key, default=None):
+        return self._id_props.get(key, default)
+
+    def keys(self):
+        return self._id_props.keys()
+
+
+class NodeSocket(object):
+    def __init__(self, node, name, type, identifier=None):
+        self.node = node
+        self.name = name
+        self.type = type
+        self.identifier = identifier or name
+        self._default_value = DEFAULT_VALUES.get(type)
+        self.links = []
+
+    @property
+    def default_value(self):
+        return self._default_value
+
+    @default_value.setter
+    def default_value(self, value):
+        _rna_call("socket.default_value")
+        self._default_value = value
+
+    @property
+    def is_linked(self):
+        return bool(self.links)
+
+
+class SocketCollection(object):
+    def __init__(self, sockets):
+        self._sockets = sockets
+        self._by_name = {}
+        for socket in sockets:
+            self._by_name.setdefault(socket.name, socket)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._sockets[key]
+        return self._by_name[key]
+
+    def __contains__(self, key):
+        return key in self._by_name
+
+    def __iter__(self):
+        return iter(self._sockets)
+
+    def __len__(self):
+        return len(self._sockets)
+
+    def get(self, key, default=None):
+        return self._by_name.get(key, default)
+
+
+class ColorRampElement(object):
+    def __init__(self, position, color):
+        self.position = position
+        self.color = color
+
+
+class ColorRampElements(object):
+    def __init__(self):
+        self._elements = [ColorRampElement(0.0, (0.0, 0.0, 0.0, 1.0)), ColorRampElement(1.0, (1.0, 1.0, 1.0, 1.0))]
+
+    def new(self, position):
+        element = ColorRampElement(position, (0.0, 0.0, 0.0, 1.0))
+        self._elements.append(element)
+        self._elements.sort(key=lambda e: e.position)
+        return element
+
+    def remove(self, element):
+        self._elements.remove(element)
+
+    def __getitem__(self, index):
+        return self._elements[index]
+
+    def __iter__(self):
+        return iter(list(self._elements))
+
+    def __len__(self):
+        return len(self._elements)
+
+
+class ColorRamp(object):
+    def __init__(self):
+        self.elements = ColorRampElements()
+        self.interpolation = 'LINEAR'
+        self.color_mode = 'RGB'
+
+
+class Node(object):
+    def __init__(self, type, name):
+        self.bl_idname = type
+        self.type = type
+        self.name = name
+        self.label = ""
+        self.location = (0.0, 0.0)
+        self._image = None
+        self.interpolation = 'Linear'
+        self.extension = 'REPEAT'
+        inputs, outputs = NODE_SOCKETS.get(type, ([], []))
+        self.inputs = SocketCollection([NodeSocket(self, n, t) for n, t in inputs])
+        self.outputs = SocketCollection([NodeSocket(self, n, t) for n, t in outputs])
+        if type == "ShaderNodeValToRGB":
+            self.color_ramp = ColorRamp()
+
+    @property
+    def image(self):
+        return self._image
+
+    @image.setter
+    def image(self, image):
+        """图像节点是图像的用户，像Blender一样维护 Image.users。"""
+        if self._image is not None:
+            self._image._users -= 1
+        if image is not None:
+            image._users += 1
+        self._image = image
+
+    def _clone(self):
+        clone = Node(self.type, self.name)
+        for attr in ("label", "location", "image", "interpolation", "extension"):
+            setattr(clone, attr, getattr(self, attr))
+        for mine, theirs in zip(list(self.inputs) + list(self.outputs), list(clone.inputs) + list(clone.outputs)):
+            theirs._default_value = mine._default_value
+        if hasattr(self, "color_ramp"):
+            clone.color_ramp = _copy.deepcopy(self.color_ramp)
+        return clone
+
+
+class Nodes(object):
+    def __init__(self, tree):
+        self._tree = tree
+        self._nodes = []
+
+    def new(self, type):
+        _rna_call("nodes.new")
+        name = type.replace("ShaderNode", "")
+        existing = set(node.name for node in self._nodes)
+        unique, index = name, 1
+        while unique in existing:
+            unique = "{}.{:03d}".format(name, index)
+            index += 1
+        node = Node(type, unique)
+        self._nodes.append(node)
+        return node
+
+    def remove(self, node):
+        _rna_call("nodes.remove")
+        for link in list(self._tree.links):
+            if link.from_node is node or link.to_node is node:
+                self._tree.links.remove(link)
+        node.image = None
+        self._nodes.remove(node)
+
+    def clear(self):
+        _rna_call("nodes.clear")
+        self._tree.links.clear()
+        for node in self._nodes:
+            node.image = None
+        del self._nodes[:]
+
+    def get(self, name, default=None):
+        for node in self._nodes:
+            if node.name == name:
+                return node
+        return default
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._nodes[key]
+        node = self.get(key)
+        if node is None:
+            raise KeyError(key)
+        return node
+
+    def __iter__(self):
+        return iter(list(self._nodes))
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+class NodeLink(object):
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket.node
+        self.to_node = to_socket.node
+
+
+class Links(object):
+    def __init__(self):
+        self._links = []
+
+    def new(self, from_socket, to_socket):
+        _rna_call("links.new")
+        for link in list(to_socket.links):
+            self.remove(link)
+        link = NodeLink(from_socket, to_socket)
+        from_socket.links.append(link)
+        to_socket.links.append(link)
+        self._links.append(link)
+        return link
+
+    def remove(self, link):
+        link.from_socket.links.remove(link)
+        link.to_socket.links.remove(link)
+        self._links.remove(link)
+
+    def clear(self):
+        for link in list(self._links):
+            self.remove(link)
+
+    def __iter__(self):
+        return iter(list(self._links))
+
+    def __len__(self):
+        return len(self._links)
+
+
+class NodeTree(object):
+    def __init__(self):
+        self.links = Links()
+        self.nodes = Nodes(self)
+
+    def _clone(self):
+        """复制节点树（Blender中 Material.copy 在C里完成，这里不计入RNA调用）。"""
+        clone = NodeTree()
+        mapping = {}
+        for node in self.nodes:
+            mapping[node] = node._clone()
+            clone.nodes._nodes.append(mapping[node])
+        for link in self.links:
+            from_node, to_node = mapping[link.from_node], mapping[link.to_node]
+            from_socket = from_node.outputs[list(link.from_node.outputs).index(link.from_socket)]
+            to_socket = to_node.inputs[list(link.to_node.inputs).index(link.to_socket)]
+            new_link = NodeLink(from_socket, to_socket)
+            from_socket.links.append(new_link)
+            to_socket.links.append(new_link)
+            clone.links._links.append(new_link)
+        return clone
+
+
+class ID(IDPropertyMixin):
+    def __init__(self, name):
+        self._name = name
+        self._collection = None
+        self.users = 0
+        self.use_fake_user = False
+        self._id_props = {}
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if self._collection is not None:
+            self._collection._rename(self, value)
+        else:
+            self._name = value
+
+
+class Material(ID):
+    def __init__(self, name):
+        super(Material, self).__init__(name)
+        self.node_tree = None
+        self.blend_method = 'OPAQUE'
+        self.shadow_method = 'OPAQUE'
+        self._use_nodes = False
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self._use_nodes = value
+        if value and self.node_tree is None:
+            self.node_tree = NodeTree()
+            principled = self.node_tree.nodes.new("ShaderNodeBsdfPrincipled")
+            principled.name = "Principled BSDF"
+            output = self.node_tree.nodes.new("ShaderNodeOutputMaterial")
+            output.name = "Material Output"
+            self.node_tree.links.new(principled.outputs["BSDF"], output.inputs["Surface"])
+
+    def copy(self):
+        _rna_call("material.copy")
+        clone = Material(self.name)
+        clone.blend_method = self.blend_method
+        clone.shadow_method = self.shadow_method
+        clone._use_nodes = self._use_nodes
+        clone._id_props = _copy.deepcopy(self._id_props)
+        if self.node_tree is not None:
+            clone.node_tree = self.node_tree._clone()
+        return data.materials._add(clone, self.name)
+
+
+class Image(ID):
+    def __init__(self, name, filepath, size=(1024, 1024), channels=4, is_float=False):
+        self._users = 0  # 引用它的图像节点数
+        super(Image, self).__init__(name)
+        self.filepath = filepath
+        self.size = size
+        self.channels = channels
+        self.is_float = is_float
+        self.has_data = True
+
+    @property
+    def users(self):
+        return self._users + (1 if self.use_fake_user else 0)
+
+    @users.setter
+    def users(self, value):
+        self._users = value
+
+
+class IDMaterials(object):
+    """Mesh.materials：网格的材质列表，每一项对应对象的一个材质槽。"""
+
+    def __init__(self):
+        self._materials = []
+
+    def append(self, material):
+        _rna_call("mesh.materials.append")
+        self._materials.append(material)
+
+    def __getitem__(self, index):
+        return self._materials[index]
+
+    def __setitem__(self, index, material):
+        self._materials[index] = material
+
+    def __iter__(self):
+        return iter(list(self._materials))
+
+    def __len__(self):
+        return len(self._materials)
+
+
+class Mesh(ID):
+    def __init__(self, name):
+        super(Mesh, self).__init__(name)
+        self.materials = IDMaterials()
+
+
+class MaterialSlot(object):
+    def __init__(self, obj, index):
+        self._obj = obj
+        self._index = index
+        self.link = 'DATA'
+
+    @property
+    def material(self):
+        return self._obj.data.materials[self._index]
+
+    @material.setter
+    def material(self, material):
+        _rna_call("slot.material")
+        self._obj.data.materials[self._index] = material
+
+
+class Object(ID):
+    def __init__(self, name, data=None):
+        super(Object, self).__init__(name)
+        self.data = data
+        self.type = 'MESH' if isinstance(data, Mesh) else 'EMPTY'
+
+    @property
+    def material_slots(self):
+        if self.data is None:
+            return []
+        return [MaterialSlot(self, index) for index in range(len(self.data.materials))]
+
+
+class Collection(object):
+    """bpy.data 中的数据块集合：按名称索引，重名时像Blender一样加 .001 后缀。"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._items = collections.OrderedDict()
+
+    def _unique_name(self, name):
+        if name not in self._items:
+            return name
+        index = 1
+        while "{}.{:03d}".format(name, index) in self._items:
+            index += 1
+        return "{}.{:03d}".format(name, index)
+
+    def _add(self, item, name):
+        item._name = self._unique_name(name)
+        item._collection = self
+        self._items[item._name] = item
+        return item
+
+    def _rename(self, item, name):
+        del self._items[item._name]
+        item._name = self._unique_name(name)
+        self._items[item._name] = item
+
+    def new(self, name, *args, **kwargs):
+        _rna_call("{}.new".format(self._factory.__name__.lower()))
+        return self._add(self._factory(name, *args, **kwargs), name)
+
+    def remove(self, item, do_unlink=True):
+        _rna_call("{}.remove".format(self._factory.__name__.lower()))
+        del self._items[item.name]
+        item._collection = None
+
+    # 按名称查找也是一次RNA调用（Blender中逐个比较名称），迭代不计
+    def get(self, name, default=None):
+        _rna_call("{}.get".format(self._factory.__name__.lower()))
+        return self._items.get(name, default)
+
+    def __getitem__(self, name):
+        _rna_call("{}.get".format(self._factory.__name__.lower()))
+        return self._items[name]
+
+    def __contains__(self, name):
+        _rna_call("{}.get".format(self._factory.__name__.lower()))
+        return name in self._items
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        self._items.clear()
+
+
+class ImageCollection(Collection):
+    def load(self, filepath, check_existing=False):
+        _rna_call("images.load")
+        if check_existing:
+            for img in self._items.values():
+                if img.filepath == filepath:
+                    return img
+        if not os.path.exists(filepath):
+            raise RuntimeError("Error: Cannot read file '{}'".format(filepath))
+        return self._add(Image(os.path.basename(filepath), filepath), os.path.basename(filepath))
+
+
+class Scene(IDPropertyMixin):
+    def __init__(self, name="Scene"):
+        self.name = name
+        self._id_props = {}
+
+
+def _property(kind):
+    def factory(**kwargs):
+        return (kind, kwargs)
+    factory.__name__ = kind
+    return factory
+
+
+class Operator(object):
+    def report(self, type, message):
+        print("{}: {}".format(", ".join(sorted(type)), message))
+
+
+class Panel(object):
+    pass
+
+
+class Timers(object):
+    """bpy.app.timers：只登记回调，由测试代码自己调用。"""
+
+    def __init__(self):
+        self.functions = []
+
+    def register(self, function, first_interval=0, persistent=False):
+        self.functions.append(function)
+
+    def unregister(self, function):
+        self.functions.remove(function)
+
+    def is_registered(self, function):
+        return function in self.functions
+
+
+def reset():
+    """清空所有数据块和调用计数。"""
+    data.materials.clear()
+    data.images.clear()
+    data.objects.clear()
+    data.meshes.clear()
+    call_counts.clear()
+
+
+types = _types.SimpleNamespace(Operator=Operator, Panel=Panel, Material=Material, Image=Image, Object=Object,
+                               Mesh=Mesh, Scene=Scene)
+props = _types.SimpleNamespace(**{kind: _property(kind) for kind in (
+    "BoolProperty", "IntProperty", "FloatProperty", "StringProperty", "EnumProperty", "CollectionProperty",
+    "PointerProperty")})
+app = _types.SimpleNamespace(timers=Timers())
+utils = _types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+path = _types.SimpleNamespace(abspath=lambda p: os.path.abspath(p[2:] if p.startswith("//") else p))
+data = _types.SimpleNamespace(
+    materials=Collection(Material),
+    images=ImageCollection(Image),
+    objects=Collection(Object),
+    meshes=Collection(Mesh),
+)
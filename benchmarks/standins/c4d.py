@@ -0,0 +1,395 @@
+"""
+Cinema 4D 的最小替身模块，只实现基准测试用到的API。
+
+使用方法：把 benchmarks/standins 加到 sys.path 最前面，然后照常 ``import Cinema_Omat``。
+参数读取、像素写入等调用次数记录在 call_counts 中。
+"""
+import collections
+import pickle
+import sys
+import time
+import types
+import zlib
+
+call_counts = collections.Counter()
+
+
+def reset():
+    call_counts.clear()
+
+SLA_GRADIENT_TYPE_2D_U = 2000
+SLA_GRADIENT_TYPE_2D_V = 2001
+SLA_GRADIENT_GRADIENT = 1000
+COLORMODE_RGB = 7
+PIXELCNT_0 = 0
+FILTER_JPG = 1104
+Xbitmap = 5833
+GETACTIVEOBJECTFLAGS_CHILDREN = 2
+
+_constants = {}
+
+
+def __getattr__(name):
+    """
+    其余的参数ID（OCT_MATERIAL_DIFFUSE_LINK 等）按名称的哈希分配整数，
+    与访问顺序无关，保存的文档在另一个进程中载入时参数ID不变。
+    """
+    if name.isupper():
+        return _constants.setdefault(name, 100000 + zlib.crc32(name.encode("ascii")) % 100000000)
+    raise AttributeError(name)
+
+
+class Vector(object):
+    def __init__(self, x=0.0, y=None, z=None):
+        self.x = float(x)
+        self.y = float(x if y is None else y)
+        self.z = float(x if z is None else z)
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __repr__(self):
+        return "Vector({}, {}, {})".format(self.x, self.y, self.z)
+
+
+class Gradient(object):
+    def __init__(self, knots=None):
+        self._knots = list(knots or [])
+
+    def InsertKnot(self, col, brightness=1.0, pos=0.0, bias=0.5, index=0):
+        self._knots.append({"col": col, "brightness": brightness, "pos": pos,
+                            "bias": bias, "index": index, "interpolation": 0})
+
+    def GetKnotCount(self):
+        return len(self._knots)
+
+    def GetKnot(self, index):
+        call_counts["gradient.GetKnot"] += 1
+        return dict(self._knots[index])
+
+    def __repr__(self):
+        return "<c4d.Gradient object at {:#x}>".format(id(self))
+
+
+class BaseList2D(object):
+    _next_guid = 1
+
+    def __init__(self, type_id=0, name=""):
+        self._type = type_id
+        self._name = name
+        self._data = {}
+        self._dirty = 0
+        self._shaders = []  # 着色器分支：InsertShader 插入的着色器
+        self._guid = BaseList2D._next_guid
+        BaseList2D._next_guid += 1
+
+    def __getitem__(self, param):
+        call_counts["param.get"] += 1
+        return self._data.get(param)
+
+    def __setitem__(self, param, value):
+        self._data[param] = value
+        self._dirty += 1
+
+    def GetDirty(self, flags):
+        return self._dirty
+
+    def InsertShader(self, shader):
+        shader._owner = self
+        self._shaders.insert(0, shader)
+
+    def GetFirstShader(self):
+        return self._shaders[0] if self._shaders else None
+
+    def GetName(self):
+        return self._name
+
+    def SetName(self, name):
+        self._name = name
+
+    def GetType(self):
+        return self._type
+
+    def GetGUID(self):
+        return self._guid
+
+    def GetUp(self):
+        return None
+
+
+class BaseShader(BaseList2D):
+    _owner = None
+
+    def GetNext(self):
+        siblings = self._owner._shaders if self._owner is not None else [self]
+        index = siblings.index(self) + 1
+        return siblings[index] if index < len(siblings) else None
+
+    def GetDown(self):
+        return self.GetFirstShader()
+
+    def __repr__(self):
+        return "<c4d.BaseShader object called {}/Shader with ID {} at {:#x}>".format(
+            self._name, self._type, id(self))
+
+
+class BaseMaterial(BaseList2D):
+    def __repr__(self):
+        return "<c4d.BaseMaterial object called {}/Material with ID {} at {:#x}>".format(
+            self._name, self._type, id(self))
+
+
+class BaseTag(BaseList2D):
+    pass
+
+
+class TextureTag(BaseTag):
+    def __init__(self, material=None):
+        super(TextureTag, self).__init__(5616, "Material")
+        self._material = material
+
+    def GetMaterial(self):
+        return self._material
+
+    def SetMaterial(self, material):
+        self._material = material
+
+    def GetMl(self):
+        return "Matrix()"
+
+    def GetPos(self):
+        return Vector(0.0)
+
+    def GetRot(self):
+        return Vector(0.0)
+
+    def GetScale(self):
+        return Vector(1.0)
+
+
+class LayerObject(BaseList2D):
+    def __init__(self, name="Layer"):
+        super(LayerObject, self).__init__(100004801, name)
+
+
+class BaseObject(BaseList2D):
+    def __init__(self, type_id=5100, name="Object"):
+        super(BaseObject, self).__init__(type_id, name)
+        self._tags = []
+        self._up = None
+        self._down = None
+        self._next = None
+        self._pred = None
+        self._layer = None
+
+    def GetTags(self):
+        return list(self._tags)
+
+    def InsertTag(self, tag):
+        self._tags.insert(0, tag)
+
+    def GetDown(self):
+        call_counts["object.GetDown"] += 1
+        return self._down
+
+    def GetNext(self):
+        call_counts["object.GetNext"] += 1
+        return self._next
+
+    def GetPred(self):
+        return self._pred
+
+    def GetUp(self):
+        return self._up
+
+    def InsertUnder(self, parent):
+        """插入为 parent 的第一个子对象。"""
+        self._up = parent
+        self._next = parent._down
+        if self._next is not None:
+            self._next._pred = self
+        parent._down = self
+
+    def InsertAfter(self, pred):
+        self._up = pred._up
+        self._pred = pred
+        self._next = pred._next
+        if self._next is not None:
+            self._next._pred = self
+        pred._next = self
+
+    def GetLayerObject(self, doc):
+        return self._layer
+
+    def SetLayerObject(self, layer):
+        self._layer = layer
+
+    def __getstate__(self):
+        """层级链接不随对象保存，由 BaseDocument 按列表恢复，避免 pickle 沿链表深度递归。"""
+        return dict(self.__dict__, _up=None, _down=None, _next=None, _pred=None)
+
+
+class BaseDocument(BaseList2D):
+    def __init__(self, objects=None, materials=None):
+        super(BaseDocument, self).__init__(110059, "Untitled")
+        self._objects = list(objects or [])
+        self._materials = list(materials or [])
+        self._first = None
+
+    def GetActiveObjects(self, flags):
+        return list(self._objects)
+
+    def GetMaterials(self):
+        return list(self._materials)
+
+    def InsertMaterial(self, material):
+        self._materials.insert(0, material)
+
+    def GetFirstObject(self):
+        return self._first
+
+    def InsertObject(self, obj, parent=None, pred=None):
+        """与 C4D 相同：有 pred 时插在它后面，否则作为 parent（或文档顶层）的第一个对象。"""
+        if pred is not None:
+            obj.InsertAfter(pred)
+        elif parent is not None:
+            obj.InsertUnder(parent)
+        else:
+            obj._next = self._first
+            if self._first is not None:
+                self._first._pred = obj
+            self._first = obj
+
+    def __getstate__(self):
+        """SaveDocument 用 pickle 保存文档：层级展开为 (对象, 父对象序号, 前一个兄弟序号) 列表。"""
+        objects, links, index = [], [], {}
+        stack = [(self._first, None)]
+        while stack:
+            obj, parent = stack.pop()
+            pred = None
+            while obj is not None:
+                index[id(obj)] = len(objects)
+                objects.append(obj)
+                links.append((parent, pred))
+                if obj._down is not None:
+                    stack.append((obj._down, index[id(obj)]))
+                pred = index[id(obj)]
+                obj = obj._next
+        return dict(self.__dict__, _first=None, _hierarchy=(objects, links))
+
+    def __setstate__(self, state):
+        objects, links = state.pop("_hierarchy")
+        self.__dict__.update(state)
+        for obj, (parent, pred) in zip(objects, links):
+            self.InsertObject(obj, parent=None if parent is None else objects[parent],
+                              pred=None if pred is None else objects[pred])
+
+
+class BaseBitmap(object):
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.pixels = bytearray()
+
+    def Init(self, width, height, depth=24):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 3)
+        return True
+
+    def GetBw(self):
+        return self.width
+
+    def GetBh(self):
+        return self.height
+
+    def SetPixel(self, x, y, r, g, b):
+        call_counts["bitmap.SetPixel"] += 1
+        o = (y * self.width + x) * 3
+        self.pixels[o:o + 3] = bytes((r, g, b))
+        return True
+
+    def GetPixel(self, x, y):
+        o = (y * self.width + x) * 3
+        return list(self.pixels[o:o + 3])
+
+    def SetPixelCnt(self, x, y, cnt, buffer, inc, dstmode, flags):
+        call_counts["bitmap.SetPixelCnt"] += 1
+        o = (y * self.width + x) * 3
+        self.pixels[o:o + cnt * inc] = bytes(buffer[0:cnt * inc])
+        return True
+
+    def Save(self, name, format, data=None, savebits=0):
+        call_counts["bitmap.Save"] += 1
+        with open(name, "wb") as f:
+            f.write(bytes(self.pixels))
+        return 1
+
+
+class ByteSeq(bytearray):
+    def __init__(self, buf, size):
+        super(ByteSeq, self).__init__(size)
+        if buf is not None:
+            self[0:len(buf)] = buf
+
+
+bitmaps = types.ModuleType("c4d.bitmaps")
+bitmaps.BaseBitmap = BaseBitmap
+
+storage = types.ModuleType("c4d.storage")
+storage.ByteSeq = ByteSeq
+
+gui = types.ModuleType("c4d.gui")
+gui.MessageDialog = lambda text, type=0: print(text)
+
+documents = types.ModuleType("c4d.documents")
+documents.BaseDocument = BaseDocument
+documents.active_document = BaseDocument()
+documents.GetActiveDocument = lambda: documents.active_document
+
+
+def _save_document(doc, name, saveflags=0, format=0):
+    """替身的 .c4d 文件是 pickle 的 BaseDocument。"""
+    with open(name, "wb") as f:
+        pickle.dump(doc, f, pickle.HIGHEST_PROTOCOL)
+    return True
+
+
+def _load_document(name, loadflags, thread=None):
+    """与 C4D 相同，无法载入时返回 None；文档的 _load_delay 秒数模拟载入很慢的文档。"""
+    call_counts["documents.LoadDocument"] += 1
+    try:
+        with open(name, "rb") as f:
+            doc = pickle.load(f)
+    except (IOError, OSError, pickle.UnpicklingError, EOFError):
+        return None
+    time.sleep(getattr(doc, "_load_delay", 0))
+    return doc
+
+
+class MessageData(object):
+    def GetTimer(self):
+        return 0
+
+    def CoreMessage(self, id, bc):
+        return True
+
+
+plugins = types.ModuleType("c4d.plugins")
+plugins.MessageData = MessageData
+plugins.registered = {}
+
+
+def _register_message_plugin(id, str, info, dat):
+    plugins.registered[id] = dat
+    return True
+
+
+plugins.RegisterMessagePlugin = _register_message_plugin
+
+documents.SaveDocument = _save_document
+documents.LoadDocument = _load_document
+documents.KillDocument = lambda doc: None
+
+for _module in (bitmaps, storage, gui, documents, plugins):
+    sys.modules[_module.__name__] = _module
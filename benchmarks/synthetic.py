@@ -0,0 +1,178 @@
+"""
+合成 octane_material_info 导出文件的生成器。
+
+在 c4d 替身模块上搭一个假场景，再调用真正的 Cinema_Omat.ExportMaterials 写文件，
+因此生成的文件格式总是与导出脚本保持一致。
+
+    python benchmarks/synthetic.py out.txt --materials 10000 --textures 0.5 --gradients 0.1
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+
+import _paths  # noqa: F401
+import c4d
+import Cinema_Omat
+
+SHADER_GRADIENT = 1011100
+SHADER_COLOR = 5832
+SHADER_IMAGE = 1029508
+SHADER_COLOR_CORRECTION = 1011130
+
+
+def make_shader(type_id, name, **params):
+    shader = c4d.BaseShader(type_id, name)
+    for param, value in params.items():
+        shader[getattr(c4d, param)] = value
+        if isinstance(value, c4d.BaseShader):
+            shader.InsertShader(value)
+    return shader
+
+
+def make_gradient(rng):
+    gradient = c4d.Gradient()
+    for pos in sorted(rng.random() for _ in range(rng.randint(2, 4))):
+        gradient.InsertKnot(c4d.Vector(rng.random(), rng.random(), rng.random()), pos=pos)
+    return gradient
+
+
+class SceneBuilder(object):
+    """
+    按给定比例随机生成材质通道：贴图、渐变、ColorCorrection 或常量。
+    所有渐变着色器都使用 gradient_type（默认 2D U，导出为色标）。
+    """
+
+    def __init__(self, textures=0.5, gradients=0.1, color_corrections=0.1,
+                 texture_pool=500, texture_dir="/textures", gradient_pool=8, seed=0,
+                 gradient_type=c4d.SLA_GRADIENT_TYPE_2D_U):
+        self.rng = random.Random(seed)
+        self.textures = textures
+        self.gradients = gradients
+        self.color_corrections = color_corrections
+        self.gradient_type = gradient_type
+        self.texture_paths = [os.path.join(texture_dir, "tex_{:05d}.png".format(i)) for i in range(texture_pool)]
+        self.gradient_pool = [make_gradient(self.rng) for _ in range(gradient_pool)]
+
+    def image_shader(self):
+        return make_shader(SHADER_IMAGE, "ImageTexture", IMAGETEXTURE_FILE=self.rng.choice(self.texture_paths))
+
+    def linked_shader(self):
+        """按比例返回一个着色器，或返回None表示使用常量。"""
+        r = self.rng.random()
+        if r < self.textures:
+            return self.image_shader()
+        r -= self.textures
+        if r < self.gradients:
+            return make_shader(SHADER_GRADIENT, "渐变", SLA_GRADIENT_GRADIENT=self.rng.choice(self.gradient_pool),
+                               SLA_GRADIENT_TYPE=self.gradient_type)
+        r -= self.gradients
+        if r < self.color_corrections:
+            inner = self.image_shader() if self.rng.random() < 0.5 else make_shader(
+                SHADER_COLOR, "颜色", COLORSHADER_COLOR=self.random_color())
+            return make_shader(SHADER_COLOR_CORRECTION, "ColorCorrection", COLORCOR_TEXTURE_LNK=inner)
+        return None
+
+    def random_color(self):
+        return c4d.Vector(self.rng.random(), self.rng.random(), self.rng.random())
+
+    def material(self, index):
+        mat = c4d.BaseMaterial(Cinema_Omat.OCTANE_MATERIAL_TYPE_ID, "Mat.{}".format(index))
+        mat[c4d.OCT_MATERIAL_TYPE] = self.rng.choice(list(Cinema_Omat.OCTANE_MATERIAL_TYPES))
+        mat[c4d.OCT_MAT_USE_EMISSION] = False
+        mat[c4d.OCT_MAT_USE_COLOR] = True
+        mat[c4d.OCT_MATERIAL_DIFFUSE_LINK] = self.linked_shader()
+        mat[c4d.OCT_MATERIAL_DIFFUSE_COLOR] = self.random_color()
+        mat[c4d.OCT_MATERIAL_DIFFUSE_FLOAT] = self.rng.random()
+        mat[c4d.OCT_MAT_USE_ROUGHNESS] = True
+        mat[c4d.OCT_MATERIAL_ROUGHNESS_COLOR] = c4d.Vector(0.0)
+        mat[c4d.OCT_MATERIAL_ROUGHNESS_FLOAT] = self.rng.random()
+        mat[c4d.OCT_MATERIAL_ROUGHNESS_LINK] = self.image_shader() if self.rng.random() < self.textures / 2 else None
+        mat[c4d.OCT_MATERIAL_BUMP_LINK] = self.image_shader() if self.rng.random() < self.textures / 4 else None
+        mat[c4d.OCT_MAT_USE_BUMP] = mat[c4d.OCT_MATERIAL_BUMP_LINK] is not None
+        mat[c4d.OCT_MATERIAL_NORMAL_LINK] = self.image_shader() if self.rng.random() < self.textures / 4 else None
+        mat[c4d.OCT_MAT_USE_NORMAL] = mat[c4d.OCT_MATERIAL_NORMAL_LINK] is not None
+        mat[c4d.OCT_MAT_USE_OPACITY] = False
+        mat[c4d.OCT_MATERIAL_OPACITY_COLOR] = c4d.Vector(0.0)
+        mat[c4d.OCT_MATERIAL_OPACITY_FLOAT] = 1.0
+        mat[c4d.OCT_MATERIAL_TRANSMISSION_COLOR] = c4d.Vector(0.0)
+        mat[c4d.OCT_MATERIAL_TRANSMISSION_FLOAT] = 0.0
+        for value in list(mat._data.values()):  # 与C4D一样，材质链接的着色器插在材质的着色器分支中
+            if isinstance(value, c4d.BaseShader):
+                mat.InsertShader(value)
+        return mat
+
+
+def build_scene(materials=100, objects_per_material=1, **options):
+    """返回 (对象列表, 材质列表)，每个材质挂在 objects_per_material 个对象上。"""
+    builder = SceneBuilder(**options)
+    mats = [builder.material(i) for i in range(materials)]
+    objects = []
+    for i, mat in enumerate(mats):
+        for j in range(objects_per_material):
+            obj = c4d.BaseObject(5100, "Object_{}_{}".format(i, j))
+            obj.InsertTag(c4d.TextureTag(mat))
+            objects.append(obj)
+    return objects, mats
+
+
+def build_document(materials=100, objects_per_material=1, group_size=10, layers=("Layer",), **options):
+    """
+    把 build_scene 的对象每 group_size 个放进一个空对象组，按顺序轮流分配到各层，
+    返回 (文档, 对象列表)。文档的层级遍历顺序与对象列表顺序相同（组对象除外）。
+    """
+    objects, mats = build_scene(materials, objects_per_material, **options)
+    doc = c4d.BaseDocument(materials=mats)
+    layer_objects = [c4d.LayerObject(name) for name in layers]
+    group = last_group = last_child = None
+    for index, obj in enumerate(objects):
+        obj.SetLayerObject(layer_objects[index % len(layer_objects)])
+        if index % group_size == 0:
+            group = c4d.BaseObject(5140, "Group_{}".format(index // group_size))
+            doc.InsertObject(group, pred=last_group)
+            last_group, last_child = group, None
+        doc.InsertObject(obj, parent=group, pred=last_child)
+        last_child = obj
+    doc._objects = objects
+    return doc, objects
+
+
+def write_export(path, materials=100, objects_per_material=1, cache_dir=None, export_format="text",
+                 compression=None, **options):
+    """
+    生成场景并用 Cinema_Omat 导出到 path，渐变图像写入 cache_dir（默认临时目录）。
+    export_format 为 Cinema_Omat.EXPORT_WRITERS 中的一种，compression 为 None、"gzip" 或 "zstd"。
+    """
+    objects, _ = build_scene(materials, objects_per_material, **options)
+    Cinema_Omat.gradient_cache = Cinema_Omat.GradientCache(cache_dir or tempfile.mkdtemp(prefix="omat_gradients_"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        Cinema_Omat.ExportMaterials(objects, path, export_format, compression)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--materials", type=int, default=1000)
+    parser.add_argument("--objects-per-material", type=int, default=1)
+    parser.add_argument("--textures", type=float, default=0.5)
+    parser.add_argument("--gradients", type=float, default=0.1)
+    parser.add_argument("--color-corrections", type=float, default=0.1)
+    parser.add_argument("--texture-pool", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", default="text", choices=sorted(Cinema_Omat.EXPORT_WRITERS))
+    parser.add_argument("--compression", choices=sorted(Cinema_Omat.COMPRESSION_SUFFIXES))
+    args = parser.parse_args()
+
+    write_export(args.output, args.materials, args.objects_per_material, export_format=args.format,
+                 compression=args.compression,
+                 textures=args.textures, gradients=args.gradients,
+                 color_corrections=args.color_corrections,
+                 texture_pool=args.texture_pool, seed=args.seed)
+    print("Wrote {} ({} bytes)".format(args.output, os.path.getsize(args.output)))
+
+
+if __name__ == "__main__":
+    main()